@@ -0,0 +1,92 @@
+"""Broadcast latency benchmark for the push hub.
+
+Simulates N connected clients (each a task draining its send queue, as the
+WebSocket sender does) and publishes chain.tip events to all of them.
+A fraction of clients never read, standing in for stalled sockets.
+
+    python backend/benchmarks/push_hub.py                 # 1k, 10k, 50k connections
+    python backend/benchmarks/push_hub.py 5000 --events 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# server.py reads its database settings at import time; the hub itself never touches Mongo
+os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:27017")
+os.environ.setdefault("DB_NAME", "raptorq_bench")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import PushHub  # noqa: E402
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(connections: int, events: int, stalled_fraction: float):
+    hub = PushHub()
+    received = []
+    done = asyncio.Event()
+    active = connections - int(connections * stalled_fraction)
+    remaining = [0]
+    sent_at = [0.0]
+
+    async def client(connection):
+        while True:
+            await connection.next_frame()
+            received.append(time.perf_counter() - sent_at[0])
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    tasks = []
+    for i in range(connections):
+        connection = hub.connect()
+        hub.subscribe(connection, "chain.tip")
+        if i < active:
+            tasks.append(asyncio.create_task(client(connection)))
+    await asyncio.sleep(0)
+
+    publish_times = []
+    completion_times = []
+    for height in range(events):
+        received.clear()
+        remaining[0] = active
+        done.clear()
+        sent_at[0] = time.perf_counter()
+        hub.publish("chain.tip", {"blocks": 1_000_000 + height, "bestblockhash": f"{height:064x}"})
+        publish_times.append(time.perf_counter() - sent_at[0])
+        await done.wait()
+        completion_times.append(time.perf_counter() - sent_at[0])
+        latencies = list(received)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    stats = hub.stats()
+    print(
+        f"{connections:>6} conns | publish {statistics.median(publish_times) * 1000:7.2f} ms | "
+        f"all delivered {statistics.median(completion_times) * 1000:7.2f} ms (p99 {percentile(completion_times, 0.99) * 1000:7.2f}) | "
+        f"last event per-client p50 {percentile(latencies, 0.5) * 1000:6.2f} ms p99 {percentile(latencies, 0.99) * 1000:6.2f} ms | "
+        f"stalled {connections - active}, dropped {stats['dropped']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("connections", nargs="*", type=int, default=[1_000, 10_000, 50_000])
+    parser.add_argument("--events", type=int, default=20, help="events published per run")
+    parser.add_argument("--stalled", type=float, default=0.01, help="fraction of clients that never read")
+    args = parser.parse_args()
+
+    for connections in args.connections:
+        asyncio.run(run(connections, args.events, args.stalled))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, BackgroundTasks, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -27,14 +28,34 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 # Remove emergent integration imports - use direct API calls instead
 # from emergentintegrations.llm.openai.image_generation import OpenAIImageGeneration
-import requests
 import time
+import shlex
+from urllib.parse import urlparse
 import subprocess
 import qrcode
 from PIL import Image, ImageDraw
 import io
 import base64
 import random
+import statistics
+import bisect
+import math
+import threading
+import multiprocessing
+import socket
+import hmac
+import functools
+from collections import OrderedDict, deque
+from array import array
+import zipfile
+try:
+    import zmq
+    import zmq.asyncio
+except ImportError:  # ZMQ notifications are optional; polling is used without pyzmq
+    zmq = None
+from pymongo import UpdateOne, ReplaceOne, DeleteOne, ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import ConnectionFailure, OperationFailure, DuplicateKeyError
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -67,6 +88,171 @@ IPFS_API_URL = os.environ.get('IPFS_API_URL', 'https://api.ipfs.raptoreum.com')
 # EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
 GITHUB_API_URL = "https://api.github.com/repos/Raptor3um/raptoreum"
 
+# Raptoreum daemon RPC pool configuration
+RAPTOREUM_RPC_POOL_SIZE = int(os.environ.get('RAPTOREUM_RPC_POOL_SIZE', '16'))  # Keep-alive connections
+RAPTOREUM_RPC_MAX_CONCURRENCY = int(os.environ.get('RAPTOREUM_RPC_MAX_CONCURRENCY', '32'))  # In-flight requests
+RAPTOREUM_RPC_TIMEOUT = float(os.environ.get('RAPTOREUM_RPC_TIMEOUT', '10'))  # Seconds per call
+
+class RaptoreumRPCError(Exception):
+    """Raised when raptoreumd is unreachable or answers with an RPC error"""
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code  # None when the daemon could not be reached at all
+
+class RaptoreumRPCClient:
+    """Shared keep-alive JSON-RPC client for raptoreumd with batch support"""
+
+    def __init__(self, url: str, user: str, password: str,
+                 pool_size: int = RAPTOREUM_RPC_POOL_SIZE,
+                 max_concurrency: int = RAPTOREUM_RPC_MAX_CONCURRENCY,
+                 timeout: float = RAPTOREUM_RPC_TIMEOUT):
+        self.url = url
+        self.auth = aiohttp.BasicAuth(user, password)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._next_id = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # One pooled session for the whole process so TCP connections are reused
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                auth=self.auth,
+                headers={"Content-Type": "application/json"}
+            )
+        return self._session
+
+    def _reserve_ids(self, count: int) -> int:
+        first_id = self._next_id
+        self._next_id += count
+        return first_id
+
+    async def _send(self, payload: Any, timeout: Optional[float]) -> tuple:
+        session = self._get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        async with self._semaphore:
+            try:
+                async with session.post(self.url, data=json.dumps(payload), timeout=client_timeout) as response:
+                    status = response.status
+                    body = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise RaptoreumRPCError(f"raptoreumd unreachable: {e!r}") from e
+
+        if status == 401:
+            raise RaptoreumRPCError("raptoreumd rejected RPC credentials", code=401)
+        return status, body
+
+    async def _post(self, payload: Any, timeout: Optional[float]) -> Any:
+        status, body = await self._send(payload, timeout)
+
+        # raptoreumd answers RPC errors with HTTP 404/500 and a JSON body, so parse regardless of status
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise RaptoreumRPCError(f"Invalid RPC response from raptoreumd (HTTP {status})", code=status)
+
+    @staticmethod
+    def _unwrap(reply: Dict[str, Any]) -> Any:
+        error = reply.get("error")
+        if error:
+            raise RaptoreumRPCError(error.get("message", "RPC error"), code=error.get("code"))
+        return reply.get("result")
+
+    async def call(self, method: str, *params: Any, timeout: Optional[float] = None) -> Any:
+        """Execute a single RPC call"""
+        request_id = self._reserve_ids(1)
+        reply = await self._post(
+            {"jsonrpc": "1.0", "id": request_id, "method": method, "params": list(params)},
+            timeout
+        )
+        return self._unwrap(reply)
+
+    def _batch_payload(self, calls: List[tuple]) -> List[Dict[str, Any]]:
+        first_id = self._reserve_ids(len(calls))
+        return [
+            {"jsonrpc": "1.0", "id": first_id + i, "method": method, "params": list(params)}
+            for i, (method, params) in enumerate(calls)
+        ]
+
+    async def batch(self, calls: List[tuple], timeout: Optional[float] = None) -> List[Any]:
+        """Execute several (method, params) calls in one round trip.
+
+        Results keep the order of ``calls``; an entry that failed on the daemon
+        is returned as a RaptoreumRPCError instance instead of raising.
+        """
+        if not calls:
+            return []
+
+        payload = self._batch_payload(calls)
+        reply = await self._post(payload, timeout)
+        if not isinstance(reply, list):
+            # Whole batch rejected (e.g. daemon too old for batching)
+            self._unwrap(reply)
+            raise RaptoreumRPCError("Unexpected batch response from raptoreumd")
+
+        replies_by_id = {item.get("id"): item for item in reply if isinstance(item, dict)}
+        results = []
+        for request in payload:
+            item = replies_by_id.get(request["id"])
+            if item is None:
+                results.append(RaptoreumRPCError(f"No reply for {request['method']}"))
+                continue
+            try:
+                results.append(self._unwrap(item))
+            except RaptoreumRPCError as e:
+                results.append(e)
+        return results
+
+    async def batch_raw(self, calls: List[tuple], timeout: Optional[float] = None) -> bytes:
+        """Execute a batch and return the undecoded response body.
+
+        Used for large replies (verbose getblock) so JSON parsing can happen
+        off the event loop; replies carry ids in call order but may arrive shuffled.
+        """
+        _, body = await self._send(self._batch_payload(calls), timeout)
+        return body
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+rpc_client = RaptoreumRPCClient(RAPTOREUM_RPC_URL, RAPTOREUM_RPC_USER, RAPTOREUM_RPC_PASS)
+
+def parse_rpc_command(command: str) -> tuple:
+    """Split a console command like 'getblockhash 1000' into an RPC method and typed params"""
+    tokens = shlex.split(command)
+    if not tokens:
+        raise ValueError("Empty RPC command")
+
+    params = []
+    for token in tokens[1:]:
+        try:
+            params.append(json.loads(token))  # Numbers, booleans, JSON objects
+        except ValueError:
+            params.append(token)  # Plain strings such as addresses
+    return tokens[0], params
+
+# The Pro Mode console is unauthenticated, so only read-only chain queries reach the daemon
+RPC_CONSOLE_METHODS = frozenset({
+    "getbestblockhash", "getblock", "getblockchaininfo", "getblockcount", "getblockhash",
+    "getblockheader", "getchaintips", "getdifficulty", "getmempoolinfo", "getrawmempool",
+    "getmininginfo", "getnetworkinfo", "getconnectioncount", "getnettotals", "gettxout",
+    "getrawtransaction", "decoderawtransaction", "decodescript", "validateaddress",
+    "estimatesmartfee", "uptime", "listassets", "getassetdata", "listaddressesbyasset"
+})
+RPC_CONSOLE_SMARTNODE_SUBCOMMANDS = frozenset({"count", "list"})
+
+def check_console_rpc(method: str, params: List[Any]):
+    """Reject anything outside the console allowlist (wallet, key, control and send methods)"""
+    if method in RPC_CONSOLE_METHODS:
+        return
+    if method == "smartnode" and params and params[0] in RPC_CONSOLE_SMARTNODE_SUBCOMMANDS:
+        return
+    raise HTTPException(status_code=403, detail=f"RPC method '{method}' is not available from the console")
+
 # Global system status
 system_status = {
     "blockchain": "healthy",
@@ -108,7 +294,6 @@ class Asset(BaseModel):
     asset_id: str
     metadata: QuantumAssetMetadata
     likes: int = 0
-    liked_by: List[str] = []
     is_ai_generated: bool = False
     ai_prompt: Optional[str] = None
     content_approved: bool = True
@@ -152,11 +337,44 @@ class QRCodeResponse(BaseModel):
     address: str
     wallet_info: Dict[str, Any]
 
+class QRBatchRequest(BaseModel):
+    requests: List[QRCodeRequest]
+    output: str = "zip"  # "zip", "multipart" or "json" (SVG only)
+    image_format: str = "png"  # "png" or "svg"
+
 # Dynamic pricing configuration
 RTM_PRICE_CACHE = {
     "price_usd": 0.0,
+    "sources": [],          # Sources whose median is price_usd
     "last_updated": 0,
-    "cache_duration": 300  # 5 minutes
+    "last_attempt": 0,
+    "cache_duration": 300,  # 5 minutes - price is fresh, refresher runs on this schedule
+    "max_stale": 3600,      # Serve a stale price for up to 1 hour while revalidating
+    "retry_interval": 30    # Minimum gap between refresh attempts after a failure
+}
+RTM_FALLBACK_PRICE_USD = float(os.environ.get('RTM_FALLBACK_PRICE_USD', '0.01'))
+
+# Price oracle sources - override with RTM_PRICE_SOURCES (JSON list), e.g. to point at local stand-in servers.
+# "path" is a dotted lookup into the JSON reply; "hedge" sources are only queried when primaries are slow or failing.
+DEFAULT_PRICE_SOURCES = [
+    {"name": "coingecko", "url": "https://api.coingecko.com/api/v3/simple/price?ids=raptoreum&vs_currencies=usd", "path": "raptoreum.usd"},
+    {"name": "coinpaprika", "url": "https://api.coinpaprika.com/v1/tickers/rtm-raptoreum", "path": "quotes.USD.price"},
+    {"name": "xeggex", "url": "https://api.xeggex.com/api/v2/market/getbysymbol/RTM%2FUSDT", "path": "lastPrice", "hedge": True}
+]
+PRICE_SOURCES = json.loads(os.environ['RTM_PRICE_SOURCES']) if os.environ.get('RTM_PRICE_SOURCES') else DEFAULT_PRICE_SOURCES
+PRICE_HEDGE_DELAY = float(os.environ.get('RTM_PRICE_HEDGE_DELAY', '1.5'))    # Seconds before backup sources are fired
+PRICE_FETCH_DEADLINE = float(os.environ.get('RTM_PRICE_FETCH_DEADLINE', '8'))  # Hard cap for one aggregation round
+PRICE_MIN_QUOTES = int(os.environ.get('RTM_PRICE_MIN_QUOTES', '2'))          # Quotes needed to publish a price
+PRICE_MAX_DEVIATION = float(os.environ.get('RTM_PRICE_MAX_DEVIATION', '0.15'))  # Max relative distance from median
+
+# Result of the last aggregation round, exposed via /price/oracle
+price_oracle_state = {
+    "accepted": {},
+    "rejected": {},
+    "errors": {},
+    "hedged": False,
+    "aggregation_latency_ms": None,
+    "last_round": 0
 }
 
 # Fixed USD prices for services
@@ -169,38 +387,176 @@ USD_PRICES = {
     "advertising_daily": 100.00    # $100 per day for advertising banner
 }
 
-async def get_rtm_price_usd() -> float:
-    """Get current RTM price in USD from CoinGecko"""
+# Wakes the background refresher early when a reader finds the price stale
+price_refresh_event = asyncio.Event()
+
+# Shared outbound HTTP session (connection pooling for third-party APIs)
+http_session: Optional[aiohttp.ClientSession] = None
+
+def get_http_session() -> aiohttp.ClientSession:
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+    return http_session
+
+async def fetch_price_quote(source: Dict[str, Any]) -> float:
+    """Fetch one USD quote from a configured price source"""
+    async with get_http_session().get(source["url"], timeout=aiohttp.ClientTimeout(total=PRICE_FETCH_DEADLINE)) as response:
+        if response.status != 200:
+            raise ValueError(f"HTTP {response.status}")
+        value = await response.json(content_type=None)
+    
+    for part in source["path"].split("."):
+        value = value[int(part)] if isinstance(value, list) else value[part]
+    price = float(value)
+    if price <= 0:
+        raise ValueError(f"Non-positive price {price}")
+    return price
+
+async def fetch_price_quotes(sources: List[Dict[str, Any]], min_quotes: int) -> tuple:
+    """Query price sources concurrently, hedging slow primaries with backup sources.
+
+    Primaries start at once; backups are fired when the primaries haven't
+    produced ``min_quotes`` agreeing quotes within PRICE_HEDGE_DELAY, or as soon
+    as that is no longer possible. The round ends once enough agreeing quotes
+    are in and the hedge delay has passed, when nothing is pending, or at
+    PRICE_FETCH_DEADLINE.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    backups = [source for source in sources if source.get("hedge")]
+    pending = {
+        asyncio.ensure_future(fetch_price_quote(source)): source
+        for source in sources if not source.get("hedge")
+    }
+    quotes, errors = {}, {}
+    hedged = False
+    
     try:
-        current_time = time.time()
-        
-        # Check cache first
-        if (current_time - RTM_PRICE_CACHE["last_updated"]) < RTM_PRICE_CACHE["cache_duration"]:
-            if RTM_PRICE_CACHE["price_usd"] > 0:
-                return RTM_PRICE_CACHE["price_usd"]
-        
-        # Fetch from CoinGecko API
-        url = "https://api.coingecko.com/api/v3/simple/price?ids=raptoreum&vs_currencies=usd"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            price_usd = data.get("raptoreum", {}).get("usd", 0.0)
+        while True:
+            elapsed = loop.time() - started
+            # Only quotes that agree with the median count towards the quorum
+            agreeing = len(aggregate_price_quotes(quotes, PRICE_MAX_DEVIATION)[1]) if quotes else 0
+            if not hedged and backups and agreeing < min_quotes and (
+                elapsed >= PRICE_HEDGE_DELAY or agreeing + len(pending) < min_quotes
+            ):
+                pending.update({asyncio.ensure_future(fetch_price_quote(source)): source for source in backups})
+                hedged = True
             
-            if price_usd > 0:
-                # Update cache
-                RTM_PRICE_CACHE["price_usd"] = price_usd
-                RTM_PRICE_CACHE["last_updated"] = current_time
-                logger.info(f"RTM price updated: ${price_usd}")
-                return price_usd
-        
-        # If API fails, use fallback price
-        logger.warning("Failed to fetch RTM price, using fallback")
-        return 0.01  # Fallback price of $0.01
+            if not pending or elapsed >= PRICE_FETCH_DEADLINE:
+                break
+            if agreeing >= min_quotes and elapsed >= PRICE_HEDGE_DELAY:
+                break
+            
+            wake_at = PRICE_HEDGE_DELAY if elapsed < PRICE_HEDGE_DELAY else PRICE_FETCH_DEADLINE
+            done, _ = await asyncio.wait(pending, timeout=max(0, wake_at - elapsed), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source = pending.pop(task)
+                try:
+                    quotes[source["name"]] = task.result()
+                except Exception as e:
+                    errors[source["name"]] = str(e) or type(e).__name__
+    finally:
+        for task in pending:
+            task.cancel()
+    
+    for source in pending.values():
+        errors.setdefault(source["name"], "timed out")
+    return quotes, errors, hedged
+
+def aggregate_price_quotes(quotes: Dict[str, float], max_deviation: float) -> tuple:
+    """Median of quotes after rejecting those further than max_deviation from the raw median"""
+    raw_median = statistics.median(quotes.values())
+    accepted = {name: price for name, price in quotes.items() if abs(price - raw_median) / raw_median <= max_deviation}
+    rejected = {name: price for name, price in quotes.items() if name not in accepted}
+    price = statistics.median(accepted.values()) if accepted else 0.0
+    return price, accepted, rejected
+
+async def refresh_rtm_price() -> bool:
+    """Aggregate RTM price in USD from all configured sources and update the cache"""
+    RTM_PRICE_CACHE["last_attempt"] = time.time()
+    min_quotes = max(1, min(PRICE_MIN_QUOTES, len(PRICE_SOURCES)))
+    started = time.perf_counter()
+    try:
+        quotes, errors, hedged = await fetch_price_quotes(PRICE_SOURCES, min_quotes)
+        price_usd, accepted, rejected = aggregate_price_quotes(quotes, PRICE_MAX_DEVIATION) if quotes else (0.0, {}, {})
+        
+        price_oracle_state.update({
+            "accepted": accepted,
+            "rejected": rejected,
+            "errors": errors,
+            "hedged": hedged,
+            "aggregation_latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "last_round": time.time()
+        })
+        
+        if len(accepted) >= min_quotes and price_usd > 0:
+            RTM_PRICE_CACHE["price_usd"] = price_usd
+            RTM_PRICE_CACHE["sources"] = sorted(accepted)
+            RTM_PRICE_CACHE["last_updated"] = time.time()
+            logger.info(f"RTM price updated: ${price_usd} from {sorted(accepted)}")
+            return True
+        
+        logger.warning(f"RTM price round without quorum (accepted={accepted}, rejected={rejected}, errors={errors}), keeping cached value")
+        return False
         
     except Exception as e:
         logger.error(f"Error fetching RTM price: {e}")
-        return 0.01  # Fallback price
+        return False
+
+async def rtm_price_refresher():
+    """Background task keeping RTM_PRICE_CACHE current so handlers never wait on the network"""
+    while True:
+        now = time.time()
+        if get_rtm_price_status() == "fresh":
+            interval = RTM_PRICE_CACHE["cache_duration"] - (now - RTM_PRICE_CACHE["last_updated"])
+        else:
+            interval = RTM_PRICE_CACHE["retry_interval"] - (now - RTM_PRICE_CACHE["last_attempt"])
+        
+        # Sleep until the price is due, or until a stale read asks for revalidation
+        price_refresh_event.clear()
+        try:
+            await asyncio.wait_for(price_refresh_event.wait(), timeout=max(0, interval))
+        except asyncio.TimeoutError:
+            pass
+        
+        # Never hammer the price API faster than the retry gap
+        since_attempt = time.time() - RTM_PRICE_CACHE["last_attempt"]
+        if since_attempt < RTM_PRICE_CACHE["retry_interval"]:
+            await asyncio.sleep(RTM_PRICE_CACHE["retry_interval"] - since_attempt)
+        
+        await refresh_rtm_price()
+
+def get_rtm_price_status() -> str:
+    """Cache state of the RTM price: fresh, stale (revalidating) or fallback"""
+    age = time.time() - RTM_PRICE_CACHE["last_updated"]
+    if RTM_PRICE_CACHE["price_usd"] <= 0 or age >= RTM_PRICE_CACHE["max_stale"]:
+        return "fallback"
+    if age >= RTM_PRICE_CACHE["cache_duration"]:
+        return "stale"
+    return "fresh"
+
+def get_rtm_price_source() -> str:
+    """Where the served price comes from; the last round's quotes only count once they were published"""
+    status = get_rtm_price_status()
+    if status == "fallback":
+        return f"Fallback (${RTM_FALLBACK_PRICE_USD})"
+    source = "Median of " + ", ".join(RTM_PRICE_CACHE["sources"])
+    return source if status == "fresh" else source + " (stale, revalidating)"
+
+async def get_rtm_price_usd() -> float:
+    """Get current RTM price in USD from the background-refreshed cache.
+
+    Stale-while-revalidate: a fresh price is returned as is; a stale price
+    (older than cache_duration but within max_stale) is still returned while
+    the refresher is woken up; past max_stale the fallback price is used.
+    """
+    status = get_rtm_price_status()
+    if status != "fresh":
+        price_refresh_event.set()
+    if status == "fallback":
+        return RTM_FALLBACK_PRICE_USD
+    return RTM_PRICE_CACHE["price_usd"]
 
 def calculate_rtm_amount(usd_amount: float, rtm_price_usd: float) -> float:
     """Calculate RTM amount for given USD amount"""
@@ -319,8 +675,12 @@ ENCRYPTED_PAYMENT_ADDRESS = "gAAAAABowefGKoNYe-x8ZSZ1DEBJQ6qcVAjXEch0cSITRD6T2Ef
 SYSTEM_FINGERPRINT = "RaptorQ_Quantum_Secure_2025_Binarai"
 RUNTIME_SALT = "b4f7d8e2a1c9f6e3d7b2a8f5c1e9d4a7b2f8c5e1a9d6b3f7c4e8a1f9d2b5c8"
 
+# Derived-key cache: PBKDF2 runs once per process, later calls only re-check a cheap input fingerprint
+_system_key_cache: Dict[str, Any] = {}
+_system_key_lock = threading.Lock()
+
 def get_system_key() -> bytes:
-    """Generate system-specific decryption key"""
+    """Generate system-specific decryption key (derived once, then served from cache)"""
     try:
         # Create system fingerprint based on multiple factors
         system_info = f"{SYSTEM_FINGERPRINT}:{RUNTIME_SALT}:{__file__}"
@@ -330,28 +690,45 @@ def get_system_key() -> bytes:
             # Set authorization for legitimate instance
             os.environ['RAPTORQ_AUTHORIZED'] = 'true'
         
-        # Generate key from system fingerprint
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=RUNTIME_SALT.encode(),
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(system_info.encode()))
-        return key
+        fingerprint = hashlib.sha256(system_info.encode()).digest()
+        with _system_key_lock:
+            cached_key = _system_key_cache.get("key")
+            if cached_key and hmac.compare_digest(_system_key_cache["fingerprint"], fingerprint):
+                return cached_key
+            
+            # Generate key from system fingerprint
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=RUNTIME_SALT.encode(),
+                iterations=100000,
+            )
+            key = base64.urlsafe_b64encode(kdf.derive(system_info.encode()))
+            
+            # Inputs changed (or first call): drop anything derived from the old key
+            _system_key_cache.clear()
+            _system_key_cache.update(key=key, fingerprint=fingerprint)
+            return key
     except:
         # If key generation fails, app won't work
         raise Exception("System authorization failed")
 
 def decrypt_payment_address() -> str:
-    """Decrypt payment address at runtime"""
+    """Decrypt payment address at runtime (once per derived key)"""
     try:
         key = get_system_key()
+        cached_address = _system_key_cache.get("payment_address")
+        if cached_address and _system_key_cache.get("key") is key:
+            return cached_address
+        
         f = Fernet(key)
         
         # This will only work with the correct system key
-        decrypted = f.decrypt(ENCRYPTED_PAYMENT_ADDRESS.encode())
-        return decrypted.decode()
+        decrypted = f.decrypt(ENCRYPTED_PAYMENT_ADDRESS.encode()).decode()
+        with _system_key_lock:
+            if _system_key_cache.get("key") is key:
+                _system_key_cache["payment_address"] = decrypted
+        return decrypted
     except:
         # If decryption fails, return dummy address that won't work
         return "RTM1DummyAddressForUnauthorizedUse123456789"
@@ -390,8 +767,23 @@ def verify_runtime_integrity():
 if not verify_runtime_integrity():
     print("WARNING: Unauthorized application instance detected")
 
-# Purchase tracking
-advertisement_slots = {
+# Advertising slots seeded into db.advertisement_slots on first start
+def empty_advertisement_slot() -> Dict[str, Any]:
+    return {
+        "active": False,
+        "advertiser_wallet": None,
+        "banner_url": None,
+        "banner_filename": None,
+        "title": None,
+        "description": None,
+        "url": None,
+        "expires_at": None,
+        "clicks": 0,
+        "impressions": 0,
+        "created_at": None
+    }
+
+DEFAULT_ADVERTISEMENT_SLOTS = {
     "header_banner": {
         "active": True,
         "advertiser_wallet": "RRaptorQAdvertiser123456789012345678",
@@ -405,28 +797,9 @@ advertisement_slots = {
         "impressions": 0,
         "created_at": datetime.now(timezone.utc).isoformat()
     },
-    "sidebar_banner": {
-        "active": False,
-        "advertiser_wallet": None,
-        "banner_url": None,
-        "banner_filename": None,
-        "title": None,
-        "description": None,
-        "url": None,
-        "expires_at": None,
-        "clicks": 0,
-        "impressions": 0,
-        "created_at": None
-    }
+    "sidebar_banner": empty_advertisement_slot()
 }
 
-# Advertisement bookings for future dates
-advertisement_bookings = {}  # {date: {slot: booking_info}}
-
-# Purchase tracking
-purchase_database = {}
-user_services = {}  # Track user's active services
-
 class BlockchainPruneRequest(BaseModel):
     mobile: bool = False
     aggressive: bool = False
@@ -527,50 +900,239 @@ def create_quantum_logo() -> Image.Image:
     
     return logo
 
+# Options that affect the rendered image - part of the QR cache key
+QR_RENDER_OPTIONS = {"error_correction": "H", "box_size": 10, "border": 4, "logo": "quantum-v1"}
+
+@functools.lru_cache(maxsize=16)
+def get_quantum_logo(logo_size: int) -> Image.Image:
+    """Quantum wallet logo resized for overlay, drawn and resampled once per size"""
+    return create_quantum_logo().resize((logo_size, logo_size), Image.Resampling.LANCZOS)
+
+def build_qr_code(data: str) -> qrcode.QRCode:
+    """Encode data into a QR symbol using the wallet render options"""
+    # Create QR code instance
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,  # High error correction for logo overlay
+        box_size=QR_RENDER_OPTIONS["box_size"],
+        border=QR_RENDER_OPTIONS["border"],
+    )
+    
+    # Add data to QR code
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr
+
+def render_qr_png(data: str) -> bytes:
+    """Render QR code with quantum wallet logo in center as PNG bytes"""
+    qr = build_qr_code(data)
+    
+    # Create QR code image
+    qr_img = qr.make_image(fill_color="black", back_color="white").convert('RGB')
+    
+    # Calculate logo size (about 10% of QR code size)
+    qr_width, qr_height = qr_img.size
+    logo_size = min(qr_width, qr_height) // 5
+    logo = get_quantum_logo(logo_size)
+    
+    # Calculate position to center the logo
+    logo_pos = ((qr_width - logo_size) // 2, (qr_height - logo_size) // 2)
+    
+    # Paste logo on QR code
+    qr_img.paste(logo, logo_pos, logo)
+    
+    buffer = io.BytesIO()
+    qr_img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+# Vector version of create_quantum_logo() on its 200x200 canvas
+QUANTUM_LOGO_SVG = (
+    '<circle cx="100" cy="100" r="78" fill="#3b82f6" stroke="#8b5cf6" stroke-width="4"/>'
+    '<path d="M100 70L85 100H115ZM100 130L85 100H115Z" fill="#fff"/>'
+    '<circle cx="100" cy="100" r="12" fill="#fff"/>'
+)
+
+def render_qr_svg(data: str) -> bytes:
+    """Render QR code with quantum wallet logo as a compact SVG (one path, one unit per module)"""
+    matrix = build_qr_code(data).get_matrix()  # Includes the quiet-zone border
+    size = len(matrix)
+    
+    # Merge horizontal runs of dark modules into single rectangles
+    path = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if row[x]:
+                run_start = x
+                while x < size and row[x]:
+                    x += 1
+                path.append(f"M{run_start} {y}h{x - run_start}v1h-{x - run_start}z")
+            else:
+                x += 1
+    
+    # Same proportions as the PNG overlay: logo is a fifth of the symbol, centered
+    logo_size = size / 5
+    logo_offset = (size - logo_size) / 2
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{"".join(path)}"/>'
+        f'<g transform="translate({logo_offset:g} {logo_offset:g}) scale({logo_size / 200:g})" shape-rendering="auto">{QUANTUM_LOGO_SVG}</g>'
+        '</svg>'
+    )
+    return svg.encode()
+
+QR_IMAGE_RENDERERS = {"png": render_qr_png, "svg": render_qr_svg}
+QR_IMAGE_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
 def generate_qr_with_logo(data: str, wallet_name: str = "RaptorQ Wallet") -> str:
     """Generate QR code with quantum wallet logo in center"""
     try:
-        # Create QR code instance
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,  # High error correction for logo overlay
-            box_size=10,
-            border=4,
-        )
-        
-        # Add data to QR code
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        # Create QR code image
-        qr_img = qr.make_image(fill_color="black", back_color="white").convert('RGB')
-        
-        # Create logo
-        logo = create_quantum_logo()
-        
-        # Calculate logo size (about 10% of QR code size)
-        qr_width, qr_height = qr_img.size
-        logo_size = min(qr_width, qr_height) // 5
-        logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-        
-        # Calculate position to center the logo
-        logo_pos = ((qr_width - logo_size) // 2, (qr_height - logo_size) // 2)
-        
-        # Paste logo on QR code
-        qr_img.paste(logo, logo_pos, logo)
-        
-        # Convert to base64
-        buffer = io.BytesIO()
-        qr_img.save(buffer, format='PNG')
-        qr_base64 = base64.b64encode(buffer.getvalue()).decode()
-        
-        return qr_base64
+        return base64.b64encode(render_qr_png(data)).decode()
         
     except Exception as e:
         logger.error(f"QR code generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate QR code: {str(e)}")
 
+# QR rendering runs off the event loop in a bounded worker pool
+QR_RENDER_WORKERS = int(os.environ.get('QR_RENDER_WORKERS', '4'))
+QR_RENDER_MAX_PENDING = int(os.environ.get('QR_RENDER_MAX_PENDING', '64'))  # Renders queued or running
+qr_render_executor = ThreadPoolExecutor(max_workers=QR_RENDER_WORKERS, thread_name_prefix="qr-render")
+qr_render_slots = asyncio.Semaphore(QR_RENDER_MAX_PENDING)
+
+async def run_qr_render(func, *args):
+    """Run a QR rendering function in the worker pool, waiting for a free slot when saturated"""
+    async with qr_render_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(qr_render_executor, func, *args)
+
+async def generate_qr_with_logo_async(data: str, wallet_name: str = "RaptorQ Wallet") -> str:
+    """Generate QR code with logo without blocking the event loop"""
+    return await run_qr_render(generate_qr_with_logo, data, wallet_name)
+
+class QRCodeCache:
+    """Content-addressed LRU cache of rendered QR PNGs with a TTL and a memory budget"""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, png)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, png: bytes):
+        if len(png) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, png)
+        self.size_bytes += len(png)
+        while self.size_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, png = self._entries.pop(key)
+        self.size_bytes -= len(png)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+qr_cache = QRCodeCache(
+    max_bytes=int(os.environ.get('QR_CACHE_MAX_BYTES', str(32 * 1024 * 1024))),
+    ttl=float(os.environ.get('QR_CACHE_TTL', '3600'))
+)
+
+def qr_cache_key(payload: str, image_format: str = "png") -> str:
+    """Hash of the final QR payload and render options"""
+    options = QR_RENDER_OPTIONS if image_format == "png" else {**QR_RENDER_OPTIONS, "format": image_format}
+    material = json.dumps([payload, options], sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+def qr_etag(qr_request: QRCodeRequest, image_format: str = "png") -> str:
+    """Strong validator for a rendered QR image; amount and message are kept typed so 0 and None differ"""
+    material = json.dumps([
+        qr_cache_key(build_qr_payload(qr_request), image_format),
+        qr_request.amount,
+        qr_request.message
+    ])
+    return '"' + hashlib.sha256(material.encode()).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: exact match against each listed tag, weak (W/) tags compared by opaque value"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+async def get_qr_image(payload: str, image_format: str = "png") -> bytes:
+    """Rendered QR image for a payload, served from the content-addressed cache when possible"""
+    key = qr_cache_key(payload, image_format)
+    image = qr_cache.get(key)
+    if image is None:
+        image = await run_qr_render(QR_IMAGE_RENDERERS[image_format], payload)
+        qr_cache.put(key, image)
+    return image
+
+def build_qr_payload(qr_request: QRCodeRequest) -> str:
+    """Format the QR data for a Raptoreum address with optional amount and message"""
+    qr_data = qr_request.address
+    
+    # Add amount if specified
+    if qr_request.amount:
+        qr_data += f"?amount={qr_request.amount}"
+    
+    # Add message if specified
+    if qr_request.message:
+        separator = "&" if "?" in qr_data else "?"
+        qr_data += f"{separator}message={qr_request.message}"
+    
+    return qr_data
+
 # Utility Functions
+# Shared process pool for CPU-bound work (block decoding, bulk message crypto).
+# Workers are spawned, not forked: forking the running server would copy its event loop,
+# executor threads and held locks into the child. Submit only top-level functions.
+CPU_POOL_WORKERS = int(os.environ.get('CPU_POOL_WORKERS', str(os.cpu_count() or 2)))
+cpu_pool: Optional[ProcessPoolExecutor] = None
+
+def get_cpu_pool() -> ProcessPoolExecutor:
+    global cpu_pool
+    if cpu_pool is None:
+        cpu_pool = ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return cpu_pool
+
 def generate_quantum_signature(data: str) -> str:
     """Generate quantum-resistant signature with SHA3-2048 equivalent strength"""
     timestamp = str(int(time.time()))
@@ -621,30 +1183,43 @@ async def check_content_safety(image_url: str) -> bool:
         # Simulate content check delay
         await asyncio.sleep(0.1)
         
-        # Mock logic - reject if URL contains certain keywords
-        unsafe_keywords = ['nsfw', 'adult', 'explicit', 'inappropriate']
-        return not any(keyword in image_url.lower() for keyword in unsafe_keywords)
+        return is_content_safe(image_url)
     except Exception as e:
         logger.error(f"Content safety check failed: {e}")
         return False  # Err on the side of caution
 
+async def check_content_safety_batch(items: List[str]) -> List[bool]:
+    """Content check for many items in one moderation round trip"""
+    try:
+        # Simulate a single batched moderation call
+        await asyncio.sleep(0.1)
+        
+        return [is_content_safe(item) for item in items]
+    except Exception as e:
+        logger.error(f"Batch content safety check failed: {e}")
+        return [False] * len(items)  # Err on the side of caution
+
+def is_content_safe(content: str) -> bool:
+    # Mock logic - reject if URL contains certain keywords
+    unsafe_keywords = ['nsfw', 'adult', 'explicit', 'inappropriate']
+    return not any(keyword in content.lower() for keyword in unsafe_keywords)
+
 async def check_github_updates() -> UpdateInfo:
     """Check for Raptoreum blockchain updates on GitHub"""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{GITHUB_API_URL}/releases/latest") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    latest_version = data.get("tag_name", "unknown")
-                    current_version = "1.0.0"  # Mock current version
+        async with get_http_session().get(f"{GITHUB_API_URL}/releases/latest") as response:
+            if response.status == 200:
+                data = await response.json()
+                latest_version = data.get("tag_name", "unknown")
+                current_version = "1.0.0"  # Mock current version
                     
-                    return UpdateInfo(
-                        available=latest_version != current_version,
-                        current_version=current_version,
-                        latest_version=latest_version,
-                        changelog=["Quantum security improvements", "InstaSend optimizations"],
-                        download_url=data.get("html_url")
-                    )
+                return UpdateInfo(
+                    available=latest_version != current_version,
+                    current_version=current_version,
+                    latest_version=latest_version,
+                    changelog=["Quantum security improvements", "InstaSend optimizations"],
+                    download_url=data.get("html_url")
+                )
         
         return UpdateInfo(available=False, current_version="1.0.0", latest_version="1.0.0")
     except Exception as e:
@@ -653,6 +1228,7 @@ async def check_github_updates() -> UpdateInfo:
 
 async def self_healing_monitor():
     """Continuous system monitoring and self-healing"""
+    new_blocks = subscribe_new_blocks()
     while True:
         try:
             # Check database connection
@@ -674,7 +1250,9 @@ async def self_healing_monitor():
                 system_status["update_available"] = update_info.available
                 system_status["last_check"] = datetime.now(timezone.utc)
             
-            await asyncio.sleep(30)  # Check every 30 seconds
+            # Warm the daemon status cache as soon as a block lands, otherwise check every 30 seconds
+            if await wait_for_new_block(new_blocks, 30):
+                await get_raptoreum_daemon_status()
             
         except Exception as e:
             logger.error(f"Self-healing monitor error: {e}")
@@ -706,6 +1284,11 @@ async def get_system_status():
     """Get comprehensive system status"""
     return {
         **system_status,
+        "chain_cache": chain_cache.stats(),
+        "address_index": {**address_index_status, "backfill": backfill_status},
+        "asset_registry": asset_registry_status,
+        "chain_notifications": chain_notification_status,
+        "push": push_hub.stats(),
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "platform_support": ["Windows", "Linux", "Mac", "Android", "iOS"],
         "quantum_features": {
@@ -739,43 +1322,237 @@ async def trigger_system_update():
         logger.error(f"Update failed: {e}")
         raise HTTPException(status_code=500, detail=f"Update failed: {str(e)}")
 
+# Trending: exponentially time-decayed likes/views kept as a forward-decayed log score.
+# Each event adds weight * 2^((t - TRENDING_EPOCH) / half-life) in log space, so stored
+# scores never need re-decaying - their order is the same at any later instant.
+# An unlike takes back its like's own contribution using the stored liked_at. Scores are
+# folded in server-side, in the same write as the like/view counters.
+# Changing TRENDING_HALF_LIFE requires reseeding (unset trending_score and restart).
+TRENDING_HALF_LIFE = int(os.environ.get('TRENDING_HALF_LIFE', '86400'))  # Seconds
+TRENDING_VIEW_WEIGHT = float(os.environ.get('TRENDING_VIEW_WEIGHT', '0.1'))  # A like counts 1
+TRENDING_EPOCH = 1704067200  # 2024-01-01T00:00:00Z
+TRENDING_PAGE_SIZE = 20
+TRENDING_MAX_PAGE_SIZE = 100
+
+def trending_time_score(timestamp: Optional[float] = None) -> float:
+    """log-scale growth of a unit event at timestamp relative to the epoch"""
+    if timestamp is None:
+        timestamp = time.time()
+    return (timestamp - TRENDING_EPOCH) * math.log(2) / TRENDING_HALF_LIFE
+
+def trending_event_score(weight: float, timestamp: Optional[float] = None) -> float:
+    return math.log(weight) + trending_time_score(timestamp)
+
+def trending_score_expression(event_score: float, remove: bool = False) -> Dict[str, Any]:
+    """Aggregation expression adding (or taking back) one event in log space without overflow"""
+    if remove:
+        # The remainder always holds at least the creation event; rounding never empties it
+        return {"$let": {
+            "vars": {"difference": {"$subtract": [event_score, {"$ifNull": ["$trending_score", event_score]}]}},
+            "in": {"$cond": [
+                {"$lt": ["$$difference", -1e-9]},
+                {"$add": ["$trending_score", {"$ln": {"$subtract": [1, {"$exp": "$$difference"}]}}]},
+                "$trending_score"
+            ]}
+        }}
+    return {"$let": {
+        "vars": {"score": {"$ifNull": ["$trending_score", event_score]}},
+        "in": {"$let": {
+            "vars": {"high": {"$max": ["$$score", event_score]}},
+            "in": {"$cond": [
+                {"$eq": [{"$ifNull": ["$trending_score", None]}, None]},
+                event_score,
+                {"$add": ["$$high", {"$ln": {"$add": [
+                    {"$exp": {"$subtract": ["$$score", "$$high"]}},
+                    {"$exp": {"$subtract": [event_score, "$$high"]}}
+                ]}}]}
+            ]}
+        }}
+    }}
+
+async def apply_trending_event(asset_id: str, event_score: Optional[float], remove: bool = False,
+                               inc: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+    """Fold one event into an asset's trending score and counters in a single write; None if no asset"""
+    fields = {field: {"$add": [{"$ifNull": [f"${field}", 0]}, amount]} for field, amount in (inc or {}).items()}
+    if event_score is not None:
+        fields["trending_score"] = trending_score_expression(event_score, remove)
+    if not fields:
+        return await db.assets.find_one({"id": asset_id}, {"_id": 0, "likes": 1, "views": 1})
+    asset = await db.assets.find_one_and_update(
+        {"id": asset_id},
+        [{"$set": fields}],
+        projection={"_id": 0, "likes": 1, "views": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if asset is None:
+        return None
+    return {field: asset.get(field, 0) for field in ("likes", "views")}
+
+def trending_score_now(stored_score: Optional[float]) -> float:
+    """Decayed weight as of now (likes-equivalent)"""
+    if stored_score is None:
+        return 0.0
+    return math.exp(min(stored_score - trending_time_score(), 700))
+
+def encode_trending_cursor(asset: Dict[str, Any]) -> str:
+    raw = json.dumps([asset["trending_score"], asset["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_trending_cursor(cursor: str) -> tuple:
+    try:
+        score, asset_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(score), str(asset_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid trending cursor")
+
+async def seed_trending_scores():
+    """Give assets without a trending score one from their like count at creation time (idempotent)"""
+    updates = []
+    async for asset in db.assets.find({"trending_score": {"$exists": False}}, {"_id": 1, "likes": 1, "created_at": 1}):
+        try:
+            created = datetime.fromisoformat(str(asset.get("created_at"))).timestamp()
+        except ValueError:
+            created = time.time()
+        score = trending_event_score(1 + max(asset.get("likes", 0), 0), created)
+        updates.append(UpdateOne({"_id": asset["_id"], "trending_score": {"$exists": False}}, {"$set": {"trending_score": score}}))
+        if len(updates) >= 1000:
+            await db.assets.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await db.assets.bulk_write(updates, ordered=False)
+
+async def toggle_asset_like_record(asset_id: str, wallet_id: str) -> tuple:
+    """Like if not liked, else unlike, as one atomic write to the wallet's asset_likes document.
+
+    Returns (liked, liked_at): the direction this call flipped the like and when that like
+    was made, so an unlike takes back exactly the weight its like added.
+    """
+    key = {"asset_id": asset_id, "wallet_id": wallet_id}
+    now = datetime.now(timezone.utc)
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)  # Mongo keeps ms
+    was_liked = {"$eq": ["$liked", True]}
+    toggle = [{"$set": {
+        "liked": {"$cond": [was_liked, False, True]},
+        "liked_at": {"$cond": [was_liked, "$liked_at", now]}  # An unlike keeps its like's time
+    }}]
+    try:
+        before = await db.asset_likes.find_one_and_update(key, toggle, projection={"_id": 0, "liked": 1, "liked_at": 1}, upsert=True)
+    except DuplicateKeyError:
+        # Two first likes raced to insert; the loser now finds the winner's document
+        before = await db.asset_likes.find_one_and_update(key, toggle, projection={"_id": 0, "liked": 1, "liked_at": 1})
+    if before is not None and before.get("liked"):
+        return False, before.get("liked_at")
+    return True, now
+
 @api_router.post("/assets/like")
 async def like_asset(like_data: AssetLike):
     """Like or unlike an asset"""
     try:
-        asset = await db.assets.find_one({"id": like_data.asset_id})
-        if not asset:
-            raise HTTPException(status_code=404, detail="Asset not found")
-        
-        liked_by = asset.get("liked_by", [])
-        current_likes = asset.get("likes", 0)
-        
-        if like_data.wallet_id in liked_by:
-            # Unlike
-            liked_by.remove(like_data.wallet_id)
-            current_likes = max(0, current_likes - 1)
-            action = "unliked"
-        else:
-            # Like
-            liked_by.append(like_data.wallet_id)
-            current_likes += 1
-            action = "liked"
-        
-        await db.assets.update_one(
-            {"id": like_data.asset_id},
-            {"$set": {"liked_by": liked_by, "likes": current_likes}}
+        liked, liked_at = await toggle_asset_like_record(like_data.asset_id, like_data.wallet_id)
+        
+        # The counter and the trending score move together; both directions use the like's
+        # own time, so an unlike removes exactly what was added
+        asset = await apply_trending_event(
+            like_data.asset_id,
+            trending_event_score(1, liked_at.replace(tzinfo=timezone.utc).timestamp()) if liked_at else None,
+            remove=not liked,
+            inc={"likes": 1 if liked else -1}
         )
+        if asset is None:
+            if liked:
+                await db.asset_likes.update_one(
+                    {"asset_id": like_data.asset_id, "wallet_id": like_data.wallet_id, "liked": True},
+                    {"$set": {"liked": False}}
+                )
+            raise HTTPException(status_code=404, detail="Asset not found")
         
+        action = "liked" if liked else "unliked"
         return {
             "message": f"Asset {action} successfully",
-            "likes": current_likes,
+            "likes": max(asset["likes"], 0),
             "action": action
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Asset like failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to like asset: {str(e)}")
 
+@api_router.post("/assets/{asset_id}/view")
+async def record_asset_view(asset_id: str):
+    """Count an asset view toward its trending score"""
+    try:
+        asset = await apply_trending_event(asset_id, trending_event_score(TRENDING_VIEW_WEIGHT), inc={"views": 1})
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        return {"recorded": True}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Asset view failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to record view: {str(e)}")
+
+@api_router.get("/assets/trending")
+async def get_trending_assets(cursor: Optional[str] = None, limit: int = TRENDING_PAGE_SIZE):
+    """Assets by time-decayed likes and views, read in index order one page at a time"""
+    try:
+        limit = min(max(limit, 1), TRENDING_MAX_PAGE_SIZE)
+        query: Dict[str, Any] = {"trending_score": {"$exists": True}}
+        if cursor:
+            score, asset_id = decode_trending_cursor(cursor)
+            query = {"$or": [
+                {"trending_score": {"$lt": score}},
+                {"trending_score": score, "id": {"$lt": asset_id}}
+            ]}
+        
+        assets_cursor = db.assets.find(
+            query,
+            {"_id": 0, "id": 1, "asset_id": 1, "asset_name": 1, "wallet_id": 1, "metadata.name": 1,
+             "metadata.file_type": 1, "likes": 1, "views": 1, "created_at": 1, "trending_score": 1}
+        ).sort([("trending_score", -1), ("id", -1)]).limit(limit + 1)
+        assets = await assets_cursor.to_list(length=limit + 1)
+        has_more = len(assets) > limit
+        assets = assets[:limit]
+        next_cursor = encode_trending_cursor(assets[-1]) if has_more else None
+        
+        for asset in assets:
+            asset["trending"] = round(trending_score_now(asset.pop("trending_score")), 6)
+            asset.setdefault("views", 0)
+        
+        return {"assets": assets, "next_cursor": next_cursor}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Trending assets failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get trending assets: {str(e)}")
+
+async def migrate_legacy_asset_likes():
+    """Move liked_by arrays from asset documents into asset_likes (idempotent)"""
+    migrated = 0
+    async for asset in db.assets.find({"liked_by.0": {"$exists": True}}, {"id": 1, "liked_by": 1, "created_at": 1}):
+        # seed_trending_scores counts legacy likes at the asset's creation time, so they are dated the same
+        try:
+            liked_at = datetime.fromisoformat(str(asset.get("created_at")))
+        except ValueError:
+            liked_at = datetime.now(timezone.utc)
+        await db.asset_likes.bulk_write([
+            UpdateOne(
+                {"asset_id": asset["id"], "wallet_id": wallet_id},
+                {"$setOnInsert": {"liked": True, "liked_at": liked_at}},
+                upsert=True
+            )
+            for wallet_id in set(asset["liked_by"])
+        ], ordered=False)
+        await db.assets.update_one({"_id": asset["_id"]}, {"$unset": {"liked_by": ""}})
+        migrated += 1
+    if migrated:
+        logger.info(f"Migrated likes for {migrated} assets into asset_likes")
+    # Records written while a like was the existence of its document
+    await db.asset_likes.update_many({"liked": {"$exists": False}}, {"$set": {"liked": True}})
+
 @api_router.post("/messaging/send")
 async def send_quantum_message(message_data: dict):
     """Send quantum-encrypted message"""
@@ -805,7 +1582,9 @@ async def send_quantum_message(message_data: dict):
         
         message_dict = message.dict()
         message_dict['timestamp'] = message_dict['timestamp'].isoformat()
+        await ensure_unread_counters([to_wallet])
         await db.messages.insert_one(message_dict)
+        await increment_unread(to_wallet, 1)
         
         return {
             "message": "Quantum message sent successfully",
@@ -819,12 +1598,178 @@ async def send_quantum_message(message_data: dict):
         logger.error(f"Message send failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to send message: {str(e)}")
 
+# Inbox paging: keyset on (timestamp, id), newest first, with opaque cursors
+INBOX_PAGE_SIZE = 50
+INBOX_MAX_PAGE_SIZE = 200
+
+def encode_inbox_cursor(message: Dict[str, Any]) -> str:
+    raw = json.dumps([message["timestamp"], message["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_inbox_cursor(cursor: str) -> tuple:
+    try:
+        timestamp, message_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(timestamp), str(message_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid inbox cursor")
+
+async def ensure_unread_counters(wallet_ids: List[str]):
+    """Seed missing counters from existing unread messages; runs before any write that moves them.
+
+    A writer's seed completes before its own message write, so a seed that wins the
+    $setOnInsert race can never have counted a message whose increment is still to come.
+    """
+    wallet_ids = list(set(wallet_ids))
+    existing = {counter["_id"] async for counter in db.inbox_counters.find({"_id": {"$in": wallet_ids}}, {"_id": 1})}
+    missing = [wallet_id for wallet_id in wallet_ids if wallet_id not in existing]
+    if not missing:
+        return
+    counts = {
+        row["_id"]: row["unread"] async for row in db.messages.aggregate([
+            {"$match": {"to_wallet": {"$in": missing}, "is_read": False}},
+            {"$group": {"_id": "$to_wallet", "unread": {"$sum": 1}}}
+        ])
+    }
+    await db.inbox_counters.bulk_write([
+        UpdateOne({"_id": wallet_id}, {"$setOnInsert": {"unread": counts.get(wallet_id, 0)}}, upsert=True)
+        for wallet_id in missing
+    ], ordered=False)
+
+async def increment_unread(wallet_id: str, amount: int):
+    """Atomically adjust the per-wallet unread counter (seeded by ensure_unread_counters first)"""
+    await db.inbox_counters.update_one({"_id": wallet_id}, {"$inc": {"unread": amount}}, upsert=True)
+
+async def get_unread_count(wallet_id: str) -> int:
+    counter = await db.inbox_counters.find_one({"_id": wallet_id}, {"unread": 1})
+    if counter is None:
+        # Wallet predates the counter and has had no writes since - seed it now
+        await ensure_unread_counters([wallet_id])
+        counter = await db.inbox_counters.find_one({"_id": wallet_id}, {"unread": 1}) or {}
+    return max(counter.get("unread", 0), 0)
+
+# Bulk messaging: one safety round trip, crypto in the CPU pool, one insert_many
+MESSAGE_BULK_MAX = int(os.environ.get('MESSAGE_BULK_MAX', '1000'))
+MESSAGE_CRYPTO_INLINE_MAX = 16  # Smaller batches skip the process pool round trip
+
+def encrypt_and_sign_messages(items: List[tuple]) -> List[tuple]:
+    """(from_wallet, to_wallet, content) -> (encrypted_content, quantum_signature); runs in the CPU pool"""
+    return [
+        (
+            quantum_encrypt_message(content, to_wallet),
+            generate_quantum_signature(f"{from_wallet}:{to_wallet}:{content}")
+        )
+        for from_wallet, to_wallet, content in items
+    ]
+
+async def run_message_crypto(items: List[tuple]) -> List[tuple]:
+    if len(items) <= MESSAGE_CRYPTO_INLINE_MAX:
+        return encrypt_and_sign_messages(items)
+    
+    # One chunk per worker keeps pickling overhead to a few round trips
+    loop = asyncio.get_running_loop()
+    pool = get_cpu_pool()
+    chunk_size = -(-len(items) // CPU_POOL_WORKERS)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results = await asyncio.gather(*(loop.run_in_executor(pool, encrypt_and_sign_messages, chunk) for chunk in chunks))
+    return [signed for chunk in results for signed in chunk]
+
+@api_router.post("/messaging/send/bulk")
+async def send_quantum_messages_bulk(bulk_data: dict):
+    """Send many quantum-encrypted messages.
+
+    Body: {"from_wallet", "messages": [{"to_wallet", "content"}, ...]}
+    or {"from_wallet", "to_wallets": [...], "content"} for one message to many recipients.
+    """
+    try:
+        from_wallet = bulk_data.get("from_wallet")
+        if bulk_data.get("to_wallets") is not None:
+            entries = [{"to_wallet": to_wallet, "content": bulk_data.get("content")} for to_wallet in bulk_data["to_wallets"]]
+        else:
+            entries = bulk_data.get("messages") or []
+        
+        if not from_wallet or not entries:
+            raise HTTPException(status_code=400, detail="Missing required fields")
+        if len(entries) > MESSAGE_BULK_MAX:
+            raise HTTPException(status_code=400, detail=f"At most {MESSAGE_BULK_MAX} messages per request")
+        
+        rejected = []
+        candidates = []
+        for index, entry in enumerate(entries):
+            if not entry.get("to_wallet") or not entry.get("content"):
+                rejected.append({"index": index, "reason": "Missing required fields"})
+            else:
+                candidates.append((index, entry["to_wallet"], entry["content"]))
+        
+        # Check content safety once per distinct content
+        contents = list(dict.fromkeys(content for _, _, content in candidates))
+        verdicts = dict(zip(contents, await check_content_safety_batch(contents)))
+        accepted = []
+        for index, to_wallet, content in candidates:
+            if verdicts[content]:
+                accepted.append((index, to_wallet, content))
+            else:
+                rejected.append({"index": index, "reason": "Message content violates safety guidelines"})
+        
+        # Encrypt and sign with quantum resistance
+        signed = await run_message_crypto([(from_wallet, to_wallet, content) for _, to_wallet, content in accepted])
+        
+        messages = []
+        unread_increments: Dict[str, int] = {}
+        for (_, to_wallet, _), (encrypted_content, quantum_signature) in zip(accepted, signed):
+            message_dict = QuantumMessage(
+                from_wallet=from_wallet,
+                to_wallet=to_wallet,
+                encrypted_content=encrypted_content,
+                quantum_signature=quantum_signature
+            ).dict()
+            message_dict['timestamp'] = message_dict['timestamp'].isoformat()
+            messages.append(message_dict)
+            unread_increments[to_wallet] = unread_increments.get(to_wallet, 0) + 1
+        
+        if messages:
+            await ensure_unread_counters(list(unread_increments))
+            await db.messages.insert_many(messages, ordered=False)
+            await db.inbox_counters.bulk_write([
+                UpdateOne({"_id": to_wallet}, {"$inc": {"unread": count}}, upsert=True)
+                for to_wallet, count in unread_increments.items()
+            ], ordered=False)
+        
+        return {
+            "message": f"{len(messages)} quantum messages sent successfully",
+            "sent": len(messages),
+            "message_ids": [message["id"] for message in messages],
+            "rejected": sorted(rejected, key=lambda item: item["index"]),
+            "quantum_encrypted": True,
+            "content_verified": True
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk message send failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to send messages: {str(e)}")
+
 @api_router.get("/messaging/inbox/{wallet_id}")
-async def get_messages(wallet_id: str):
-    """Get quantum-encrypted messages for wallet"""
+async def get_messages(wallet_id: str, cursor: Optional[str] = None, limit: int = INBOX_PAGE_SIZE):
+    """Get quantum-encrypted messages for wallet, one page at a time"""
     try:
-        messages_cursor = db.messages.find({"to_wallet": wallet_id}).sort("timestamp", -1)
-        messages = await messages_cursor.to_list(length=50)
+        limit = min(max(limit, 1), INBOX_MAX_PAGE_SIZE)
+        query: Dict[str, Any] = {"to_wallet": wallet_id}
+        if cursor:
+            timestamp, message_id = decode_inbox_cursor(cursor)
+            query["$or"] = [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "id": {"$lt": message_id}}
+            ]
+        
+        # One extra row tells us whether another page exists
+        messages_cursor = db.messages.find(
+            query,
+            {"_id": 0, "id": 1, "from_wallet": 1, "timestamp": 1, "is_read": 1}
+        ).sort([("timestamp", -1), ("id", -1)]).limit(limit + 1)
+        messages = await messages_cursor.to_list(length=limit + 1)
+        has_more = len(messages) > limit
+        messages = messages[:limit]
         
         decrypted_messages = []
         for msg in messages:
@@ -835,17 +1780,52 @@ async def get_messages(wallet_id: str):
                     "from": msg["from_wallet"],
                     "content": "Quantum-encrypted message",  # Placeholder
                     "timestamp": msg["timestamp"],
+                    "is_read": msg.get("is_read", False),
                     "quantum_verified": True
                 })
             except Exception:
                 continue
         
-        return {"messages": decrypted_messages}
+        return {
+            "messages": decrypted_messages,
+            "next_cursor": encode_inbox_cursor(messages[-1]) if has_more else None,
+            "unread_count": await get_unread_count(wallet_id)
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Message retrieval failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get messages: {str(e)}")
 
+@api_router.post("/messaging/inbox/{wallet_id}/read")
+async def mark_messages_read(wallet_id: str, read_request: dict):
+    """Mark messages read: {"message_ids": [...]} or {"all": true}"""
+    try:
+        query: Dict[str, Any] = {"to_wallet": wallet_id, "is_read": False}
+        if not read_request.get("all"):
+            message_ids = read_request.get("message_ids") or []
+            if not message_ids:
+                raise HTTPException(status_code=400, detail="message_ids or all is required")
+            query["id"] = {"$in": message_ids}
+        
+        # Only messages that actually flip to read are subtracted, so concurrent calls can't double count
+        await ensure_unread_counters([wallet_id])
+        result = await db.messages.update_many(query, {"$set": {"is_read": True}})
+        if result.modified_count:
+            await increment_unread(wallet_id, -result.modified_count)
+        
+        return {
+            "marked_read": result.modified_count,
+            "unread_count": await get_unread_count(wallet_id)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to mark messages read: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to mark messages read: {str(e)}")
+
 @api_router.post("/assets/create")
 async def create_quantum_asset(asset_data: dict):
     """Create quantum-resistant asset with Binarai signature"""
@@ -889,6 +1869,7 @@ async def create_quantum_asset(asset_data: dict):
         )
         
         asset_dict = asset.dict()
+        asset_dict['trending_score'] = trending_event_score(1, asset_dict['created_at'].timestamp())
         asset_dict['created_at'] = asset_dict['created_at'].isoformat()
         await db.assets.insert_one(asset_dict)
         
@@ -972,20 +1953,10 @@ async def get_legal_disclaimer():
 async def generate_receive_qr(qr_request: QRCodeRequest):
     """Generate QR code for receiving RTM with wallet logo"""
     try:
-        # Format the QR data for Raptoreum address
-        qr_data = qr_request.address
-        
-        # Add amount if specified
-        if qr_request.amount:
-            qr_data += f"?amount={qr_request.amount}"
+        qr_data = build_qr_payload(qr_request)
         
-        # Add message if specified
-        if qr_request.message:
-            separator = "&" if "?" in qr_data else "?"
-            qr_data += f"{separator}message={qr_request.message}"
-        
-        # Generate QR code with logo
-        qr_base64 = generate_qr_with_logo(qr_data, qr_request.wallet_name)
+        # Generate QR code with logo (cached by payload)
+        qr_base64 = base64.b64encode(await get_qr_image(qr_data)).decode()
         
         # Create response
         return QRCodeResponse(
@@ -1007,15 +1978,141 @@ async def generate_receive_qr(qr_request: QRCodeRequest):
         logger.error(f"QR generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate QR code: {str(e)}")
 
-@api_router.post("/blockchain/prune")
-async def prune_blockchain_data(prune_request: BlockchainPruneRequest):
-    """Prune blockchain data for mobile/storage optimization"""
+QR_BATCH_MAX_ITEMS = int(os.environ.get('QR_BATCH_MAX_ITEMS', '500'))
+QR_BATCH_MAX_CONCURRENT = int(os.environ.get('QR_BATCH_MAX_CONCURRENT', '8'))  # Render slots one batch may hold
+
+async def render_qr_response(qr_request: QRCodeRequest, image_format: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    if image_format not in QR_IMAGE_RENDERERS:
+        raise HTTPException(status_code=400, detail="image_format must be 'png' or 'svg'")
     try:
-        mobile_mode = prune_request.mobile
-        aggressive = prune_request.aggressive
-        
-        # Calculate pruning parameters based on device type
-        if mobile_mode:
+        image = await get_qr_image(build_qr_payload(qr_request), image_format)
+    except Exception as e:
+        logger.error(f"QR render failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate QR code: {str(e)}")
+    return Response(content=image, media_type=QR_IMAGE_MEDIA_TYPES[image_format], headers=headers)
+
+@api_router.post("/qr/render")
+async def render_receive_qr(qr_request: QRCodeRequest, image_format: str = "png"):
+    """Render a receive QR code as a raw PNG or SVG image instead of base64 JSON"""
+    return await render_qr_response(qr_request, image_format)
+
+@api_router.get("/qr/render")
+async def get_receive_qr(request: Request, address: str, amount: Optional[float] = None,
+                         message: Optional[str] = None, image_format: str = "png"):
+    """Cacheable receive QR image; revalidate with If-None-Match for a 304"""
+    qr_request = QRCodeRequest(address=address, amount=amount, message=message)
+    etag = qr_etag(qr_request, image_format)
+    if image_format in QR_IMAGE_RENDERERS and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return await render_qr_response(qr_request, image_format, {"ETag": etag, "Cache-Control": "private, no-cache"})
+
+def qr_batch_filename(index: int, qr_request: QRCodeRequest, image_format: str) -> str:
+    safe_address = "".join(c for c in qr_request.address if c.isalnum())[:64]
+    return f"{index:04d}_{safe_address}.{image_format}"
+
+def build_qr_zip(filenames: List[str], images: List[bytes]) -> bytes:
+    """Pack rendered QR images into a zip archive (stored - PNG is already compressed)"""
+    buffer = io.BytesIO()
+    compression = zipfile.ZIP_STORED if filenames and filenames[0].endswith(".png") else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(buffer, "w", compression=compression) as archive:
+        for filename, image in zip(filenames, images):
+            archive.writestr(filename, image)
+    return buffer.getvalue()
+
+def start_qr_batch_renders(payloads: List[str], image_format: str) -> List[asyncio.Future]:
+    """One render task per payload, at most QR_BATCH_MAX_CONCURRENT running so a batch can't take every slot"""
+    batch_slots = asyncio.Semaphore(QR_BATCH_MAX_CONCURRENT)
+    
+    async def render(payload: str) -> bytes:
+        async with batch_slots:
+            return await get_qr_image(payload, image_format)
+    
+    return [asyncio.ensure_future(render(payload)) for payload in payloads]
+
+async def stream_qr_multipart(batch: QRBatchRequest, payloads: List[str], boundary: str):
+    """Yield multipart/mixed parts in request order as soon as each render finishes"""
+    renders = start_qr_batch_renders(payloads, batch.image_format)
+    try:
+        for index, (qr_request, render) in enumerate(zip(batch.requests, renders)):
+            image = await render
+            headers = (
+                f"--{boundary}\r\n"
+                f"Content-Type: {QR_IMAGE_MEDIA_TYPES[batch.image_format]}\r\n"
+                f"Content-Disposition: attachment; filename=\"{qr_batch_filename(index, qr_request, batch.image_format)}\"\r\n"
+                f"Content-Length: {len(image)}\r\n\r\n"
+            )
+            yield headers.encode() + image + b"\r\n"
+        yield f"--{boundary}--\r\n".encode()
+    finally:
+        # Client went away mid-stream: don't keep rendering for nobody
+        for render in renders:
+            render.cancel()
+
+@api_router.post("/qr/generate/batch")
+async def generate_receive_qr_batch(batch: QRBatchRequest):
+    """Render many receive QR codes in parallel as a zip, a multipart stream or SVG JSON"""
+    if not batch.requests or len(batch.requests) > QR_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch must contain 1-{QR_BATCH_MAX_ITEMS} QR requests")
+    if batch.image_format not in QR_IMAGE_RENDERERS:
+        raise HTTPException(status_code=400, detail="image_format must be 'png' or 'svg'")
+    if batch.output not in ("zip", "multipart", "json"):
+        raise HTTPException(status_code=400, detail="output must be 'zip', 'multipart' or 'json'")
+    if batch.output == "json" and batch.image_format != "svg":
+        raise HTTPException(status_code=400, detail="JSON output is only available for SVG images")
+    
+    payloads = [build_qr_payload(qr_request) for qr_request in batch.requests]
+    
+    if batch.output == "multipart":
+        boundary = f"raptorq-qr-{secrets.token_hex(12)}"
+        return StreamingResponse(
+            stream_qr_multipart(batch, payloads, boundary),
+            media_type=f"multipart/mixed; boundary={boundary}"
+        )
+    
+    try:
+        images = await asyncio.gather(*start_qr_batch_renders(payloads, batch.image_format))
+        
+        if batch.output == "json":
+            return {
+                "qr_codes": [
+                    {
+                        "address": qr_request.address,
+                        "amount": qr_request.amount,
+                        "message": qr_request.message,
+                        "svg": image.decode()
+                    }
+                    for qr_request, image in zip(batch.requests, images)
+                ],
+                "count": len(images),
+                "image_format": "svg"
+            }
+        
+        filenames = [qr_batch_filename(i, r, batch.image_format) for i, r in enumerate(batch.requests)]
+        archive = await run_qr_render(build_qr_zip, filenames, images)
+        return Response(
+            content=archive,
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="raptorq_qr_codes.zip"'}
+        )
+        
+    except Exception as e:
+        logger.error(f"Batch QR generation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate QR codes: {str(e)}")
+
+@api_router.get("/qr/cache/stats")
+async def get_qr_cache_stats():
+    """Get QR code cache hit/miss counters and memory usage"""
+    return qr_cache.stats()
+
+@api_router.post("/blockchain/prune")
+async def prune_blockchain_data(prune_request: BlockchainPruneRequest):
+    """Prune blockchain data for mobile/storage optimization"""
+    try:
+        mobile_mode = prune_request.mobile
+        aggressive = prune_request.aggressive
+        
+        # Calculate pruning parameters based on device type
+        if mobile_mode:
             storage_limit = prune_request.storage_limit_gb or 2  # 2GB for mobile
             retention_days = 7 if aggressive else 14
             pruning_interval = 3600  # 1 hour
@@ -1085,7 +2182,9 @@ async def get_premium_services():
                 "price_usd": binarai_single_price["price_usd"]
             },
             "rtm_market_price": rtm_price,
-            "price_source": "CoinGecko",
+            "price_source": get_rtm_price_source(),
+            "price_aggregation_latency_ms": price_oracle_state["aggregation_latency_ms"],
+            "price_status": get_rtm_price_status(),
             "last_updated": RTM_PRICE_CACHE["last_updated"],
             "payment_methods": ["RTM"],
             "estimated_confirmation_time": "2-5 minutes",
@@ -1096,6 +2195,20 @@ async def get_premium_services():
         logger.error(f"Failed to get premium services: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get services: {str(e)}")
 
+@api_router.get("/price/oracle")
+async def get_price_oracle_status():
+    """Get the RTM price oracle state: sources, outliers and aggregation latency"""
+    return {
+        "price_usd": RTM_PRICE_CACHE["price_usd"],
+        "price_status": get_rtm_price_status(),
+        "last_updated": RTM_PRICE_CACHE["last_updated"],
+        "sources": [source["name"] for source in PRICE_SOURCES],
+        "hedge_sources": [source["name"] for source in PRICE_SOURCES if source.get("hedge")],
+        "min_quotes": PRICE_MIN_QUOTES,
+        "max_deviation": PRICE_MAX_DEVIATION,
+        **price_oracle_state
+    }
+
 # Raptoreum-specific endpoints for production blockchain integration
 @api_router.post("/raptoreum/createasset")
 async def create_raptoreum_asset(asset_request: dict):
@@ -1146,33 +2259,358 @@ async def create_raptoreum_asset(asset_request: dict):
         logger.error(f"Raptoreum asset creation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Asset creation failed: {str(e)}")
 
+# Chain lookup coalescing
+RAPTOREUM_BLOCK_INTERVAL = int(os.environ.get('RAPTOREUM_BLOCK_INTERVAL', '60'))  # Target block time in seconds
+
+class SingleFlightCache:
+    """Coalesce concurrent identical lookups into one upstream call and cache the result.
+
+    Entries live for at most ``ttl`` seconds and are dropped as soon as the
+    local daemon reports a higher block height, so cached chain data never
+    outlives the block it describes. The explorer's network height is tracked
+    separately: while the daemon syncs the two differ by many blocks.
+    """
+
+    def __init__(self, ttl: float, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._results: Dict[str, tuple] = {}  # key -> (expires_at, value)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generation = 0
+        self.block_height = 0  # Local daemon height; drives invalidation
+        self.network_height = 0  # Explorer height; informational only
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, key: str, loader):
+        cached = self._results.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        future = self._inflight.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(self._load(key, loader))
+            self._inflight[key] = future
+        else:
+            self.coalesced += 1
+
+        # Shield so one cancelled caller doesn't cancel the lookup shared by the others
+        return await asyncio.shield(future)
+
+    async def _load(self, key: str, loader):
+        generation = self._generation
+        try:
+            value = await loader()
+            # Don't cache a result that raced with an invalidation
+            if generation == self._generation:
+                self._results.pop(key, None)
+                self._results[key] = (time.monotonic() + self.ttl, value)
+                if self.max_entries is not None and len(self._results) > self.max_entries:
+                    # Insertion order: the first entry is the oldest
+                    del self._results[next(iter(self._results))]
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def discard(self, key: str):
+        """Drop one key after a write; an in-flight load for it won't be cached"""
+        self._results.pop(key, None)
+        if key in self._inflight:
+            self._generation += 1
+
+    def invalidate(self, keep: tuple = ()):
+        self._results = {key: entry for key, entry in self._results.items() if key in keep}
+        self._generation += 1
+
+    def observe_block_height(self, height: int, source_key: Optional[str] = None):
+        """Invalidate everything except ``source_key`` when the local daemon reaches a new block"""
+        if height > self.block_height:
+            if self.block_height:
+                self.invalidate(keep=(source_key,))
+            self.block_height = height
+
+    def observe_network_height(self, height: int):
+        self.network_height = max(self.network_height, height)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "block_height": self.block_height,
+            "network_height": self.network_height,
+            "cached_keys": len(self._results),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "ttl_seconds": self.ttl
+        }
+
+chain_cache = SingleFlightCache(ttl=RAPTOREUM_BLOCK_INTERVAL)
+
+# Purchases, premium services and ad slots live in Mongo so every worker sees the same state;
+# records_cache absorbs repeated reads for a few seconds
+RECORD_CACHE_TTL = float(os.environ.get('RECORD_CACHE_TTL', '5'))
+PURCHASE_PENDING_RETENTION = int(os.environ.get('PURCHASE_PENDING_RETENTION', '86400'))  # Seconds unpaid purchases outlive their expiry
+PURCHASE_AMOUNT_SALT_MAX = 99999  # Satoshis added to a quote so each pending purchase has its own amount
+
+records_cache = SingleFlightCache(ttl=RECORD_CACHE_TTL, max_entries=1024)
+
+async def get_purchase(purchase_id: str) -> Optional[Dict[str, Any]]:
+    return await records_cache.get(
+        f"purchase:{purchase_id}",
+        lambda: db.purchases.find_one({"_id": purchase_id}, {"_id": 0})
+    )
+
+async def update_purchase(purchase_id: str, condition: Dict[str, Any], update: Dict[str, Any]) -> bool:
+    """Conditionally update a purchase; False if another request got there first"""
+    result = await db.purchases.update_one({"_id": purchase_id, **condition}, update)
+    records_cache.discard(f"purchase:{purchase_id}")
+    return result.modified_count > 0
+
+async def get_user_service_records(wallet_address: str) -> Dict[str, Dict[str, Any]]:
+    async def load():
+        return {
+            record["service_id"]: record
+            async for record in db.user_services.find({"user_wallet": wallet_address}, {"_id": 0})
+        }
+    return await records_cache.get(f"services:{wallet_address}", load)
+
+def service_is_active(service_record: Optional[Dict[str, Any]]) -> bool:
+    if not service_record or not service_record.get("is_active", False):
+        return False
+    expires_at = service_record.get("expires_at")
+    if expires_at:
+        try:
+            return datetime.now(timezone.utc) <= datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+        except ValueError:
+            return False
+    return True
+
+async def get_advertisement_slots_state() -> Dict[str, Dict[str, Any]]:
+    async def load():
+        return {slot.pop("_id"): slot async for slot in db.advertisement_slots.find({})}
+    return await records_cache.get("advertisement_slots", load)
+
+async def seed_advertisement_slots():
+    """Insert the default ad slots once; later starts leave existing slots untouched"""
+    for slot_name, slot_data in DEFAULT_ADVERTISEMENT_SLOTS.items():
+        await db.advertisement_slots.update_one({"_id": slot_name}, {"$setOnInsert": slot_data}, upsert=True)
+
+# Leases: chain writers run in one worker at a time; another takes over when its lease lapses
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+LEASE_TTL = float(os.environ.get('LEASE_TTL', '30'))
+held_leases: set = set()
+
+async def acquire_lease(name: str) -> bool:
+    """Take or renew a lease; False while another live worker holds it"""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.leases.update_one(
+            {"_id": name, "$or": [{"owner": WORKER_ID}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": WORKER_ID, "expires_at": now + timedelta(seconds=LEASE_TTL)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        held_leases.discard(name)
+        return False
+    held_leases.add(name)
+    return True
+
+async def release_lease(name: str):
+    held_leases.discard(name)
+    await db.leases.delete_one({"_id": name, "owner": WORKER_ID})
+
+async def hold_lease(name: str, coroutines: List[Any]):
+    """Run coroutines under an acquired lease, renewing it; they are cancelled as soon as a renewal fails"""
+    tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+    try:
+        while True:
+            await asyncio.sleep(LEASE_TTL / 3)
+            try:
+                if not await acquire_lease(name):
+                    logger.warning(f"Lost the {name} lease to another worker")
+                    return
+            except Exception as e:
+                logger.error(f"Failed to renew the {name} lease: {e}")
+                return
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def run_under_lease(name: str, coroutines_factory):
+    """Keep competing for a lease and run coroutines_factory()'s coroutines whenever this worker holds it"""
+    while True:
+        try:
+            acquired = await acquire_lease(name)
+        except Exception as e:
+            logger.error(f"Failed to acquire the {name} lease: {e}")
+            acquired = False
+        if acquired:
+            logger.info(f"Worker {WORKER_ID} took the {name} lease")
+            await hold_lease(name, coroutines_factory())
+        await asyncio.sleep(LEASE_TTL / 3)
+
+# Mongo index management: declared once, provisioned idempotently at startup
+MESSAGE_WATCH_STATE_RETENTION = 7 * 24 * 3600  # Drop state no worker has saved to in a week
+MONGO_INDEXES = [
+    # (collection, keys, options)
+    ("messages", [("to_wallet", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)], {}),
+    ("messages", [("id", ASCENDING)], {"unique": True}),
+    ("messages", [("timestamp", ASCENDING), ("id", ASCENDING)], {}),
+    ("assets", [("id", ASCENDING)], {"unique": True}),
+    ("chain_assets", [("updated_height", ASCENDING)], {}),
+    ("assets", [("asset_id", ASCENDING)], {}),
+    ("assets", [("wallet_id", ASCENDING), ("created_at", DESCENDING)], {}),
+    ("assets", [("trending_score", DESCENDING), ("id", DESCENDING)], {}),
+    ("asset_likes", [("asset_id", ASCENDING), ("wallet_id", ASCENDING)], {"unique": True}),
+    ("asset_holders", [("asset", ASCENDING), ("address", ASCENDING)], {"unique": True}),
+    ("asset_holders", [("asset", ASCENDING), ("balance", DESCENDING), ("address", ASCENDING)], {}),
+    ("utxos", [("address", ASCENDING), ("spent_height", ASCENDING), ("height", DESCENDING)], {}),
+    ("utxos", [("height", ASCENDING)], {}),
+    ("utxos", [("spent_height", ASCENDING)], {}),
+    ("address_history", [("address", ASCENDING), ("txid", ASCENDING)], {"unique": True}),
+    ("address_history", [("address", ASCENDING), ("height", DESCENDING)], {}),
+    ("address_history", [("height", ASCENDING)], {}),
+    ("purchases", [("user_wallet", ASCENDING)], {}),
+    # One pending purchase per amount, so a payment identifies its purchase
+    ("purchases", [("price_sat", ASCENDING)], {"unique": True, "partialFilterExpression": {"status": "pending_payment"}}),
+    ("purchases", [("expires_at", ASCENDING)], {}),
+    # TTL: unpaid purchases are removed PURCHASE_PENDING_RETENTION after they expire (field is unset once paid)
+    ("purchases", [("pending_expires_at", ASCENDING)], {"expireAfterSeconds": PURCHASE_PENDING_RETENTION}),
+    ("watch_state", [("updated_at", ASCENDING)], {"expireAfterSeconds": MESSAGE_WATCH_STATE_RETENTION}),
+    ("user_services", [("user_wallet", ASCENDING), ("service_id", ASCENDING)], {"unique": True}),
+    ("user_services", [("expires_at", ASCENDING)], {}),
+    ("advertisement_slots", [("advertiser_wallet", ASCENDING)], {}),
+    ("advertisement_slots", [("expires_at", ASCENDING)], {}),
+    ("advertisement_bookings", [("date", ASCENDING), ("slot", ASCENDING)], {"unique": True}),
+]
+
+# Representative shapes of the hot queries, checked with explain() for collection scans
+HOT_QUERIES = [
+    ("inbox", "messages", {"to_wallet": ""}, {"timestamp": -1, "id": -1}),
+    ("asset_by_id", "assets", {"id": ""}, None),
+    ("trending_assets", "assets", {"trending_score": {"$exists": True}}, {"trending_score": -1, "id": -1}),
+    ("asset_holders", "asset_holders", {"asset": ""}, {"balance": -1, "address": 1}),
+    ("wallet_utxos", "utxos", {"address": "", "spent_height": None}, {"height": -1}),
+    ("wallet_history", "address_history", {"address": ""}, {"height": -1}),
+    ("pending_payment", "purchases", {"price_sat": 0, "status": "pending_payment"}, None),
+    ("user_services", "user_services", {"user_wallet": ""}, None),
+    ("advertiser_slots", "advertisement_slots", {"advertiser_wallet": "", "active": True}, None),
+]
+
+INDEX_OPTION_FIELDS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+async def drop_outdated_indexes(collection: str, keys: List[tuple], options: Dict[str, Any], existing: Dict[str, Any]):
+    """Drop indexes on the same keys that were created with other options (create_index would conflict)"""
+    for name, spec in list(existing.items()):
+        if list(spec["key"]) != keys:
+            continue
+        if any(spec.get(field) != options.get(field) for field in INDEX_OPTION_FIELDS):
+            logger.warning(f"Replacing index {name} on {collection}: declared options changed")
+            await db[collection].drop_index(name)
+            del existing[name]
+
+async def ensure_mongo_indexes() -> Dict[str, List[str]]:
+    """Create every declared index; existing identical indexes are a no-op, outdated ones are replaced"""
+    created: Dict[str, List[str]] = {}
+    existing: Dict[str, Dict[str, Any]] = {}
+    for collection, keys, options in MONGO_INDEXES:
+        try:
+            if collection not in existing:
+                existing[collection] = await db[collection].index_information()
+            await drop_outdated_indexes(collection, keys, options, existing[collection])
+            name = await db[collection].create_index(keys, **options)
+            created.setdefault(collection, []).append(name)
+        except ConnectionFailure:
+            raise  # No point trying the rest against an unreachable server
+        except Exception as e:
+            # e.g. duplicates blocking a unique index, or an existing index with other options
+            logger.error(f"Failed to create index {keys} on {collection}: {e}")
+    return created
+
+def plan_stages(plan: Any) -> List[str]:
+    """All stage names in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+async def check_query_plans() -> Dict[str, Dict[str, Any]]:
+    """Explain each hot query and flag the ones whose winning plan is a COLLSCAN"""
+    plans = {}
+    for name, collection, query, sort in HOT_QUERIES:
+        command = {"find": collection, "filter": query}
+        if sort:
+            command["sort"] = sort
+        try:
+            explained = await db.command({"explain": command, "verbosity": "queryPlanner"})
+            stages = plan_stages(explained.get("queryPlanner", {}).get("winningPlan", {}))
+            plans[name] = {"collection": collection, "stages": stages, "collscan": "COLLSCAN" in stages}
+            if "COLLSCAN" in stages:
+                logger.warning(f"Query '{name}' on {collection} falls back to COLLSCAN")
+        except Exception as e:
+            plans[name] = {"collection": collection, "error": str(e)}
+    return plans
+
+@api_router.get("/system/query-plans")
+async def get_query_plans():
+    """Get explain() results for the hot queries"""
+    try:
+        plans = await check_query_plans()
+        return {
+            "plans": plans,
+            "collscans": [name for name, plan in plans.items() if plan.get("collscan")]
+        }
+    except Exception as e:
+        logger.error(f"Failed to check query plans: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to check query plans: {str(e)}")
+
+async def get_chain_height() -> int:
+    """Current local chain height from the coalesced daemon status"""
+    daemon_status = await get_raptoreum_daemon_status()
+    return daemon_status.get("current_block", 0)
+
 async def get_real_raptoreum_block_height():
-    """Get actual current Raptoreum network block height"""
+    """Get actual current Raptoreum network block height (coalesced, cached per block)"""
+    height = await chain_cache.get("mainnet_block_height", fetch_real_raptoreum_block_height)
+    chain_cache.observe_network_height(height)
+    return height
+
+async def fetch_real_raptoreum_block_height():
+    """Fetch current Raptoreum network block height from the explorer"""
     try:
         # Try multiple Raptoreum APIs to get real block height
-        import aiohttp
-        async with aiohttp.ClientSession() as session:
-            # Try Raptoreum explorer API first
-            try:
-                async with session.get('https://explorer.raptoreum.com/api/status', timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        block_height = data.get('info', {}).get('blocks', 0)
-                        if block_height > 0:
-                            return block_height
-            except:
-                pass
+        session = get_http_session()
+        # Try Raptoreum explorer API first
+        try:
+            async with session.get('https://explorer.raptoreum.com/api/status', timeout=10) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    block_height = data.get('info', {}).get('blocks', 0)
+                    if block_height > 0:
+                        return block_height
+        except:
+            pass
             
-            # Try alternative Raptoreum API
-            try:
-                async with session.get('https://explorer.raptoreum.com/api/sync', timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        block_height = data.get('blockChainHeight', 0)
-                        if block_height > 0:
-                            return block_height
-            except:
-                pass
+        # Try alternative Raptoreum API
+        try:
+            async with session.get('https://explorer.raptoreum.com/api/sync', timeout=10) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    block_height = data.get('blockChainHeight', 0)
+                    if block_height > 0:
+                        return block_height
+        except:
+            pass
                 
     except Exception as e:
         # External API not available - use realistic fallback
@@ -1203,6 +2641,10 @@ async def get_real_raptoreum_block_height():
 @api_router.get("/raptoreum/blockchain-info")
 async def get_raptoreum_blockchain_info():
     """Get real-time Raptoreum blockchain information with live data"""
+    return await chain_cache.get("blockchain_info", load_raptoreum_blockchain_info)
+
+async def load_raptoreum_blockchain_info():
+    """Build blockchain information from the daemon status"""
     try:
         # Get daemon status for consistent data
         daemon_status = await get_raptoreum_daemon_status()
@@ -1215,6 +2657,7 @@ async def get_raptoreum_blockchain_info():
         
         # Get current timestamp for realistic data
         current_time = datetime.now(timezone.utc)
+        time_diff = (current_time - datetime(2024, 9, 1, tzinfo=timezone.utc)).total_seconds()  # Since network checkpoint
         
         # Convert percentage to decimal for verification progress
         verification_progress = sync_progress_percent / 100
@@ -1286,19 +2729,12 @@ async def get_raptoreum_blockchain_info():
         logger.error(f"Blockchain info retrieval failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get blockchain info: {str(e)}")
 
-@api_router.post("/raptoreum/rpc")
-async def execute_raptoreum_rpc(rpc_request: dict):
-    """Execute Raptoreum RPC commands for Pro Mode console"""
-    try:
-        command = rpc_request.get("command", "").strip()
-        wallet_address = rpc_request.get("wallet_address")
-        current_time = datetime.now(timezone.utc)
-        
-        # Simulate RPC command execution
-        # In production, this would connect to actual Raptoreum Core daemon
-        
-        if command == "help":
-            result = """
+async def simulate_raptoreum_rpc(command: str) -> Any:
+    """Simulated console responses used when raptoreumd is not reachable"""
+    current_time = datetime.now(timezone.utc)
+    
+    if command == "help":
+        result = """
 Available Raptoreum RPC Commands:
 == Blockchain ==
 getblockchaininfo        getblockcount           getbestblockhash
@@ -1318,74 +2754,136 @@ smartnode stop          smartnode create
 
 == Network ==
 getpeerinfo             getnetworkinfo          ping
-            """
-            
-        elif command == "getblockchaininfo":
-            result = await get_raptoreum_blockchain_info()
-            
-        elif command == "getwalletinfo":
-            # Get real wallet info from daemon (not fake data)
-            wallet_balance = 0.0  # Real starting balance for new wallets
-            
-            result = {
-                "walletname": "RaptorQ_Production_Wallet",
-                "walletversion": 169900,
-                "balance": wallet_balance,  # Real balance, not fake 5000
-                "unconfirmed_balance": 0.0,
-                "immature_balance": 0.0,
-                "txcount": 0,  # Real transaction count for new wallet
-                "keypoololdest": int(current_time.timestamp()) - 3600,
-                "keypoolsize": 1000,
-                "keypoolsize_hd_internal": 1000,
-                "unlocked_until": 0,
-                "paytxfee": 0.001,
-                "hdmasterkeyid": f"rtm_prod_{secrets.token_hex(16)}",
-                "daemon_connected": True,
-                "network": "mainnet"
-            }
-            
-        elif command == "listassets":
+        """
+        
+    elif command == "getblockchaininfo":
+        result = await get_raptoreum_blockchain_info()
+        
+    elif command == "getwalletinfo":
+        # Get real wallet info from daemon (not fake data)
+        wallet_balance = 0.0  # Real starting balance for new wallets
+        
+        result = {
+            "walletname": "RaptorQ_Production_Wallet",
+            "walletversion": 169900,
+            "balance": wallet_balance,  # Real balance, not fake 5000
+            "unconfirmed_balance": 0.0,
+            "immature_balance": 0.0,
+            "txcount": 0,  # Real transaction count for new wallet
+            "keypoololdest": int(current_time.timestamp()) - 3600,
+            "keypoolsize": 1000,
+            "keypoolsize_hd_internal": 1000,
+            "unlocked_until": 0,
+            "paytxfee": 0.001,
+            "hdmasterkeyid": f"rtm_prod_{secrets.token_hex(16)}",
+            "daemon_connected": True,
+            "network": "mainnet"
+        }
+        
+    elif command == "listassets":
+        result = [
+            {"name": "RTM_GOLD", "qty": 1000000, "units": 8, "reissuable": True},
+            {"name": "QUANTUM_NFT", "qty": 1, "units": 0, "reissuable": False},
+            {"name": "RTM_SHARES", "qty": 5000000, "units": 8, "reissuable": True}
+        ]
+        
+    elif command.startswith("smartnode"):
+        if "list" in command:
             result = [
-                {"name": "RTM_GOLD", "qty": 1000000, "units": 8, "reissuable": True},
-                {"name": "QUANTUM_NFT", "qty": 1, "units": 0, "reissuable": False},
-                {"name": "RTM_SHARES", "qty": 5000000, "units": 8, "reissuable": True}
+                {"alias": "RaptorQ-Node-01", "addr": "45.32.123.45:10226", "status": "ENABLED"},
+                {"alias": "RaptorQ-Node-02", "addr": "158.69.45.123:10226", "status": "PRE_ENABLED"}
             ]
+        elif "status" in command:
+            result = {"status": "Smartnode successfully started"}
+        else:
+            result = {"status": "Smartnode command processed"}
             
-        elif command.startswith("smartnode"):
-            if "list" in command:
-                result = [
-                    {"alias": "RaptorQ-Node-01", "addr": "45.32.123.45:10226", "status": "ENABLED"},
-                    {"alias": "RaptorQ-Node-02", "addr": "158.69.45.123:10226", "status": "PRE_ENABLED"}
-                ]
-            elif "status" in command:
-                result = {"status": "Smartnode successfully started"}
-            else:
-                result = {"status": "Smartnode command processed"}
-                
-        elif command == "getpeerinfo":
-            result = [
-                {"id": 1, "addr": "192.168.1.100:10226", "version": 70208, "subver": "/RaptoreumCore:1.5.0/"},
-                {"id": 2, "addr": "45.32.156.78:10226", "version": 70208, "subver": "/RaptoreumCore:1.5.0/"}
-            ]
+    elif command == "getpeerinfo":
+        result = [
+            {"id": 1, "addr": "192.168.1.100:10226", "version": 70208, "subver": "/RaptoreumCore:1.5.0/"},
+            {"id": 2, "addr": "45.32.156.78:10226", "version": 70208, "subver": "/RaptoreumCore:1.5.0/"}
+        ]
+        
+    else:
+        result = f"Unknown command: {command}. Type 'help' for available commands."
+    
+    return result
+
+@api_router.post("/raptoreum/rpc")
+async def execute_raptoreum_rpc(rpc_request: dict):
+    """Execute Raptoreum RPC commands for Pro Mode console"""
+    try:
+        started = time.perf_counter()
+        
+        # Batch mode: {"commands": ["getblockcount", "getbestblockhash"]} in a single daemon round trip
+        commands = rpc_request.get("commands")
+        if commands:
+            parsed = [parse_rpc_command(str(c).strip()) for c in commands]
+            for method, params in parsed:
+                check_console_rpc(method, params)
+            try:
+                replies = await rpc_client.batch(parsed)
+                source = "daemon"
+            except RaptoreumRPCError as e:
+                if e.code is not None:
+                    raise
+                replies = [await simulate_raptoreum_rpc(str(c).strip()) for c in commands]
+                source = "simulated"
             
+            results = []
+            for command, reply in zip(commands, replies):
+                if isinstance(reply, RaptoreumRPCError):
+                    results.append({"command": command, "success": False, "error": str(reply), "code": reply.code})
+                else:
+                    results.append({"command": command, "success": True, "result": reply})
+            
+            return {
+                "success": True,
+                "results": results,
+                "source": source,
+                "execution_time": f"{time.perf_counter() - started:.3f}s",
+                "blockchain": "Raptoreum",
+                "rpc_version": "1.5.0"
+            }
+        
+        command = rpc_request.get("command", "").strip()
+        wallet_address = rpc_request.get("wallet_address")
+        
+        if command == "help":
+            result = await simulate_raptoreum_rpc(command)
+            source = "local"
         else:
-            result = f"Unknown command: {command}. Type 'help' for available commands."
+            try:
+                method, params = parse_rpc_command(command)
+                check_console_rpc(method, params)
+                result = await rpc_client.call(method, *params)
+                source = "daemon"
+            except RaptoreumRPCError as e:
+                if e.code is not None:
+                    # Daemon answered with an RPC error - surface it to the console
+                    raise
+                result = await simulate_raptoreum_rpc(command)
+                source = "simulated"
         
         return {
             "success": True,
             "command": command,
             "result": result,
-            "execution_time": "0.125s",
+            "source": source,
+            "execution_time": f"{time.perf_counter() - started:.3f}s",
             "blockchain": "Raptoreum",
             "rpc_version": "1.5.0"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"RPC command execution failed: {e}")
         return {
             "success": False,
             "command": rpc_request.get("command", ""),
             "error": str(e),
+            "code": getattr(e, "code", None),
             "execution_time": "0.001s"
         }
 
@@ -1420,85 +2918,342 @@ async def get_owned_smartnodes(wallet_address: str):
         logger.error(f"Failed to get owned smartnodes: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get smartnodes: {str(e)}")
 
-async def get_real_raptoreum_smartnodes():
-    """Attempt to get real smartnodes from Raptoreum network"""
-    try:
-        # Try to connect to Raptoreum public API for real smartnode data
-        import aiohttp
-        async with aiohttp.ClientSession() as session:
-            # Attempt to get real smartnode list from Raptoreum explorer/API
-            async with session.get('https://explorer.raptoreum.com/api/smartnodes', timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('smartnodes', [])
-    except Exception as e:
-        # External API not available - use fallback (normal for production)
-        pass
-    
-    # Fallback to realistic simulated network data based on actual Raptoreum specs
-    current_time = datetime.now(timezone.utc)
-    network_smartnodes = []
-    
-    # Simulate realistic smartnode IPs and data from actual network
+# Smartnode registry: the full deterministic list, refreshed per block into column arrays
+SMARTNODE_REFRESH_INTERVAL = float(os.environ.get('SMARTNODE_REFRESH_INTERVAL', '120'))  # Seconds without a block
+SMARTNODE_MAX_PAGE_SIZE = 5000
+SMARTNODE_SORT_KEYS = ("rank", "last_paid", "registered_height", "ip", "payee", "status")
+SMARTNODE_DELTA_HISTORY = int(os.environ.get('SMARTNODE_DELTA_HISTORY', '120'))  # Versions kept for delta sync
+SMARTNODE_NETWORK_SIZE = 1266  # Used only for the simulated list when neither daemon nor explorer answers
+
+def split_smartnode_service(service: str) -> tuple:
+    """'1.2.3.4:10226' / '[::1]:10226' -> (ip, port)"""
+    host, _, port = (service or "").rpartition(":")
+    if not host:
+        return service or "", 10226
+    return host.strip("[]"), int(port) if port.isdigit() else 10226
+
+def normalize_smartnode(entry: Dict[str, Any], outpoint: Optional[str] = None) -> Dict[str, Any]:
+    """One node from `smartnode list json`, `protx list registered true` or the explorer, in a single shape"""
+    state = entry.get("state", {})
+    if "service" in state or "address" in entry:
+        ip, port = split_smartnode_service(state.get("service") or entry.get("address"))
+    else:
+        ip, port = entry.get("ip", ""), entry.get("port", 10226)
+    if state:
+        status = "POSE_BANNED" if state.get("PoSeBanHeight", -1) > 0 else "ENABLED"
+    else:
+        status = entry.get("status", "UNKNOWN")
+    if not outpoint and "collateralHash" in entry:
+        outpoint = f"{entry['collateralHash']}-{entry.get('collateralIndex', 0)}"
+    return {
+        "protx_hash": entry.get("proTxHash") or entry.get("protx_hash") or outpoint or f"{ip}:{port}",
+        "outpoint": outpoint or entry.get("outpoint"),
+        "ip": ip,
+        "port": port,
+        "payee": state.get("payoutAddress") or entry.get("payee", ""),
+        "status": status,
+        "last_paid": entry.get("lastpaidtime", entry.get("last_paid", 0)),
+        "last_paid_block": state.get("lastPaidHeight", entry.get("lastpaidblock", 0)),
+        "registered_height": state.get("registeredHeight", entry.get("registered_height", 0)),
+        "pose_penalty": state.get("PoSePenalty", entry.get("posepenalty", 0)),
+        "collateral_address": entry.get("collateraladdress") or state.get("collateralAddress", "")
+    }
+
+def simulated_smartnodes() -> List[Dict[str, Any]]:
+    """Stable stand-in for the network list (same nodes on every call) when no source is reachable"""
     real_ips = [
         "144.76.47.65", "95.217.161.135", "78.46.102.85", "135.148.138.33",
         "167.86.99.25", "45.32.123.45", "149.28.67.89", "207.148.22.155",
         "104.238.137.199", "45.76.88.44", "108.61.201.33", "149.28.155.77"
     ]
+    now = int(time.time())
+    nodes = []
+    for i in range(SMARTNODE_NETWORK_SIZE):
+        seeded = random.Random(i)
+        nodes.append({
+            "protx_hash": hashlib.sha256(f"smartnode-{i}".encode()).hexdigest(),
+            "outpoint": None,
+            "ip": real_ips[i % len(real_ips)],
+            "port": 10226,
+            "payee": "R" + hashlib.sha256(f"payee-{i}".encode()).hexdigest()[:33],
+            "status": seeded.choice(["ENABLED", "ENABLED", "ENABLED", "PRE_ENABLED", "POSE_BANNED"]),
+            "last_paid": now - now % 86400 - seeded.randint(0, 86400),
+            "last_paid_block": 0,
+            "registered_height": seeded.randint(100000, 340000),
+            "pose_penalty": 0,
+            "collateral_address": ""
+        })
+    return nodes
+
+async def fetch_smartnode_list() -> tuple:
+    """(nodes, source): raptoreumd first, then the public explorer, then the simulated list"""
+    try:
+        listing = await rpc_client.call("smartnode", "list", "json")
+        return [normalize_smartnode(entry, outpoint) for outpoint, entry in listing.items()], "raptoreumd"
+    except RaptoreumRPCError as e:
+        if e.code is not None and e.code != 401:
+            # Daemon answered but without the smartnode RPC; the deterministic list is in protx
+            try:
+                listing = await rpc_client.call("protx", "list", "registered", True)
+                return [normalize_smartnode(entry) for entry in listing], "raptoreumd"
+            except RaptoreumRPCError:
+                pass
     
-    # Generate realistic network smartnodes (1,266 nodes as per explorer)
-    # Limit to 50 smartnodes for API performance, but report total count as 1266
-    smartnode_count = min(50, 1266)  # Limit for performance
-    for i in range(smartnode_count):
-        smartnode = {
-            "rank": i + 1,
-            "ip": real_ips[i % len(real_ips)],  # Cycle through real IPs
-            "port": 10226,  # Standard Raptoreum port
-            "payee": f"R{secrets.token_hex(16)}{secrets.token_hex(8)}",  # Real RTM address format
-            "status": random.choice(["ENABLED", "ENABLED", "ENABLED", "PRE_ENABLED", "NEW_START_REQUIRED"]),
-            "activeseconds": random.randint(86400, 2592000),  # 1 day to 30 days realistic
-            "lastseen": int(current_time.timestamp()) - random.randint(0, 1800),  # Last 30 minutes
-            "protocol": 70208,  # Current Raptoreum protocol
-            "version": "1.5.0-quantum",
-            "quantum_enhanced": True,  # All nodes quantum enhanced
-            "earnings_24h": round(random.uniform(4.5, 6.2), 2),  # Realistic RTM earnings
-            "total_earnings": round(random.uniform(1245.67, 8456.78), 2),
-            "collateral": 1800000,  # 1.8M RTM collateral
-            "last_paid": int(current_time.timestamp()) - random.randint(0, 86400)
-        }
-        network_smartnodes.append(smartnode)
+    try:
+        async with get_http_session().get('https://explorer.raptoreum.com/api/smartnodes') as response:
+            if response.status == 200:
+                data = await response.json()
+                nodes = data.get('smartnodes', [])
+                if nodes:
+                    return [normalize_smartnode(entry) for entry in nodes], "explorer"
+    except Exception:
+        pass  # External API not available - use fallback
     
-    return network_smartnodes
+    return simulated_smartnodes(), "simulated"
+
+class SmartnodeRegistry:
+    """Immutable-per-refresh smartnode snapshot: column arrays, presorted orders and status counts.
+
+    Every load that changes a node or the payment order bumps ``version`` and
+    records what changed, so clients can catch up with ``delta(since)`` instead of
+    refetching the list. Versions only mean something within one ``epoch``: each
+    worker process keeps its own registry.
+    """
+
+    def __init__(self):
+        self.epoch = secrets.token_hex(8)
+        self.version = 0
+        # (version, {protx_hash: (change, record)}, payment order moved)
+        self.history: deque = deque(maxlen=SMARTNODE_DELTA_HISTORY)
+        self.by_hash: Dict[str, Dict[str, Any]] = {}
+        self.records: List[Dict[str, Any]] = []
+        self.ips: List[str] = []
+        self.status_codes = array('H')
+        self.statuses: List[str] = []
+        self.rows_by_status: Dict[str, array] = {}
+        self.rows_by_payee: Dict[str, array] = {}
+        self.orders: Dict[str, array] = {}
+        self.status_counts: Dict[str, int] = {}
+        self.source: Optional[str] = None
+        self.updated_at: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def load(self, nodes: List[Dict[str, Any]], source: str):
+        # Payment queue position: enabled nodes first, longest unpaid first
+        nodes = sorted(nodes, key=lambda n: (
+            n["status"] != "ENABLED",
+            max(n["last_paid_block"] or 0, n["registered_height"] or 0),
+            n["last_paid"] or 0,
+            n["protx_hash"]
+        ))
+        records = []
+        statuses: List[str] = []
+        status_codes = array('H')
+        rows_by_status: Dict[str, array] = {}
+        rows_by_payee: Dict[str, array] = {}
+        for row, node in enumerate(nodes):
+            records.append({**node, "rank": row + 1})
+            if node["status"] not in rows_by_status:
+                rows_by_status[node["status"]] = array('I')
+                statuses.append(node["status"])
+            status_codes.append(statuses.index(node["status"]))
+            rows_by_status[node["status"]].append(row)
+            rows_by_payee.setdefault(node["payee"], array('I')).append(row)
+        
+        columns = {
+            "rank": None,  # Rows are already in rank order
+            "last_paid": [n["last_paid"] or 0 for n in nodes],
+            "registered_height": [n["registered_height"] or 0 for n in nodes],
+            "ip": [n["ip"] for n in nodes],
+            "payee": [n["payee"] for n in nodes],
+            "status": [n["status"] for n in nodes]
+        }
+        orders = {
+            key: array('I', range(len(nodes)) if column is None else sorted(range(len(nodes)), key=column.__getitem__))
+            for key, column in columns.items()
+        }
+        
+        # Rank moves for most nodes whenever one gets paid, so it is sent as the new order rather than per node
+        by_hash = {record["protx_hash"]: record for record in records}
+        order_moved = [record["protx_hash"] for record in records] != [record["protx_hash"] for record in self.records]
+        changes = {}
+        for protx_hash, record in by_hash.items():
+            previous = self.by_hash.get(protx_hash)
+            if previous is None:
+                changes[protx_hash] = ("added", record)
+            elif {**previous, "rank": record["rank"]} != record:
+                changes[protx_hash] = ("changed", record)
+        for protx_hash in self.by_hash.keys() - by_hash.keys():
+            changes[protx_hash] = ("removed", None)
+        
+        # Swap everything in at once so readers never see a half-built snapshot
+        if changes or order_moved:
+            self.version += 1
+            self.history.append((self.version, changes, order_moved))
+        self.by_hash = by_hash
+        self.records, self.ips, self.statuses, self.status_codes = records, columns["ip"], statuses, status_codes
+        self.rows_by_status, self.rows_by_payee, self.orders = rows_by_status, rows_by_payee, orders
+        self.status_counts = {status: len(rows) for status, rows in rows_by_status.items()}
+        self.source = source
+        self.updated_at = datetime.now(timezone.utc).isoformat()
+
+    def query(self, status: Optional[str] = None, payee: Optional[str] = None, ip: Optional[str] = None,
+              sort: str = "rank", descending: bool = False, offset: int = 0,
+              limit: int = SMARTNODE_MAX_PAGE_SIZE) -> tuple:
+        """(matched_count, page of records) for the filters, in sort order"""
+        order = self.orders.get(sort, array('I'))
+        rows = order[::-1] if descending else order
+        if status is None and payee is None and ip is None:
+            return len(self.records), [self.records[row] for row in rows[offset:offset + limit]]
+        
+        if status is not None and status not in self.rows_by_status:
+            return 0, []
+        code = self.statuses.index(status) if status is not None else None
+        payee_rows = set(self.rows_by_payee.get(payee, ())) if payee is not None else None
+        
+        matched = 0
+        page = []
+        for row in rows:
+            if code is not None and self.status_codes[row] != code:
+                continue
+            if payee_rows is not None and row not in payee_rows:
+                continue
+            if ip is not None and not self.ips[row].startswith(ip):
+                continue
+            if offset <= matched < offset + limit:
+                page.append(self.records[row])
+            matched += 1
+        return matched, page
+
+    def delta(self, since: int, epoch: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Nodes added, changed and removed after version ``since``; None when a full snapshot is needed.
+
+        ``order`` lists every protx_hash in rank order when the payment queue moved, else it is None.
+        """
+        if epoch != self.epoch:
+            return None  # Version from another worker or an earlier run
+        if since == self.version:
+            return {"added": [], "changed": [], "removed": [], "order": None}
+        if since > self.version or not self.history or since < self.history[0][0] - 1:
+            return None  # Older than the kept history
+        
+        # A node whose first change after ``since`` is an add was not in the client's copy
+        existed: Dict[str, bool] = {}
+        order_moved = False
+        for version, changes, moved in self.history:
+            if version > since:
+                order_moved = order_moved or moved
+                for protx_hash, (change, _) in changes.items():
+                    existed.setdefault(protx_hash, change != "added")
+        
+        added, changed, removed = [], [], []
+        for protx_hash, was_known in existed.items():
+            record = self.by_hash.get(protx_hash)
+            if record is None:
+                if was_known:
+                    removed.append(protx_hash)
+            elif was_known:
+                changed.append(record)
+            else:
+                added.append(record)
+        order = [record["protx_hash"] for record in self.records] if order_moved else None
+        return {"added": added, "changed": changed, "removed": removed, "order": order}
+
+smartnode_registry = SmartnodeRegistry()
+
+async def refresh_smartnode_registry():
+    nodes, source = await fetch_smartnode_list()
+    smartnode_registry.load(nodes, source)
+
+async def smartnode_registry_follower():
+    """Reload the smartnode list on every new block (the deterministic list only changes in blocks)"""
+    new_blocks = subscribe_new_blocks()
+    while True:
+        try:
+            await refresh_smartnode_registry()
+        except Exception as e:
+            logger.error(f"Smartnode registry refresh failed: {e}")
+        await wait_for_new_block(new_blocks, SMARTNODE_REFRESH_INTERVAL)
 
 @api_router.get("/raptoreum/smartnodes/all")
-async def get_all_smartnodes():
-    """Get all smartnodes on the Raptoreum network"""
+async def get_all_smartnodes(status: Optional[str] = None, payee: Optional[str] = None, ip: Optional[str] = None,
+                             sort: str = "rank", order: str = "asc", offset: int = 0,
+                             limit: int = SMARTNODE_MAX_PAGE_SIZE):
+    """Get smartnodes on the Raptoreum network, filtered by status/payee/IP prefix, sorted and paged"""
+    if sort not in SMARTNODE_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SMARTNODE_SORT_KEYS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
     try:
-        # Get real smartnodes from network
-        network_smartnodes = await get_real_raptoreum_smartnodes()
-        
-        # Sort by rank
-        network_smartnodes.sort(key=lambda x: x["rank"])
-        
-        enabled_count = len([n for n in network_smartnodes if n["status"] == "ENABLED"])
-        quantum_count = len([n for n in network_smartnodes if n.get("quantum_enhanced", False)])
+        if not smartnode_registry.records:
+            await refresh_smartnode_registry()  # First request before the follower's first pass
+        
+        offset = max(offset, 0)
+        limit = min(max(limit, 1), SMARTNODE_MAX_PAGE_SIZE)
+        matched, smartnodes = smartnode_registry.query(
+            status=status.upper() if status else None,
+            payee=payee,
+            ip=ip,
+            sort=sort,
+            descending=order == "desc",
+            offset=offset,
+            limit=limit
+        )
         
         return {
-            "smartnodes": network_smartnodes,
-            "total_count": 1266,  # Actual network count
-            "returned_count": len(network_smartnodes),  # Limited for performance
-            "enabled_count": enabled_count,
-            "quantum_enhanced_count": quantum_count,
-            "last_updated": datetime.now(timezone.utc).isoformat(),
+            "smartnodes": smartnodes,
+            "total_count": len(smartnode_registry),
+            "matched_count": matched,
+            "returned_count": len(smartnodes),
+            "next_offset": offset + limit if offset + limit < matched else None,
+            "enabled_count": smartnode_registry.status_counts.get("ENABLED", 0),
+            "status_counts": smartnode_registry.status_counts,
+            "last_updated": smartnode_registry.updated_at,
             "network": "mainnet",
-            "real_data": True,
-            "note": f"Showing first {len(network_smartnodes)} of {1266} smartnodes for performance"
+            "source": smartnode_registry.source,
+            "real_data": smartnode_registry.source != "simulated",
+            "epoch": smartnode_registry.epoch,
+            "version": smartnode_registry.version
         }
         
     except Exception as e:
         logger.error(f"Failed to get network smartnodes: {e}")
         raise HTTPException(status_code=500, detail="Failed to get network smartnodes")
 
+@api_router.get("/raptoreum/smartnodes/delta")
+async def get_smartnodes_delta(since: int, epoch: Optional[str] = None):
+    """Smartnodes added, changed or removed since a version from /smartnodes/all or an earlier delta.
+
+    Versions are only comparable within one ``epoch`` (one worker process); a different
+    epoch or a ``since`` older than the kept history gets the full list (``full: true``).
+    When the payment queue moved, ``order`` lists every protx_hash in rank order.
+    """
+    try:
+        if not smartnode_registry.records:
+            await refresh_smartnode_registry()
+        
+        delta = smartnode_registry.delta(since, epoch)
+        response: Dict[str, Any] = {
+            "epoch": smartnode_registry.epoch,
+            "version": smartnode_registry.version,
+            "full": delta is None,
+            "total_count": len(smartnode_registry),
+            "enabled_count": smartnode_registry.status_counts.get("ENABLED", 0),
+            "status_counts": smartnode_registry.status_counts,
+            "last_updated": smartnode_registry.updated_at
+        }
+        if delta is None:
+            response["smartnodes"] = smartnode_registry.records
+        else:
+            response.update(delta)
+        return response
+        
+    except Exception as e:
+        logger.error(f"Failed to get smartnode delta: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get smartnode delta")
+
 @api_router.post("/raptoreum/smartnodes/create")
 async def create_raptoreum_smartnode(smartnode_data: dict):
     """Create and deploy a new Raptoreum smartnode"""
@@ -1530,85 +3285,1160 @@ async def create_raptoreum_smartnode(smartnode_data: dict):
             "collateral_locked": True,
             "quantum_enhanced": smartnode_config["quantum_enhanced"]
         }
-        
-    except Exception as e:
-        logger.error(f"Smartnode creation failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Smartnode creation failed: {str(e)}")
+        
+    except Exception as e:
+        logger.error(f"Smartnode creation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Smartnode creation failed: {str(e)}")
+
+@api_router.post("/raptoreum/smartnodes/{node_id}/{action}")
+async def control_smartnode(node_id: str, action: str, control_data: dict):
+    """Start, stop, or manage smartnode"""
+    try:
+        wallet_address = control_data.get("wallet_address")
+        
+        if action == "start":
+            result = {
+                "success": True,
+                "message": f"Smartnode {node_id} started successfully",
+                "status": "STARTING",
+                "estimated_sync_time": "15-30 minutes"
+            }
+        elif action == "stop":
+            result = {
+                "success": True,
+                "message": f"Smartnode {node_id} stopped successfully", 
+                "status": "STOPPED"
+            }
+        else:
+            result = {
+                "success": True,
+                "message": f"Smartnode {node_id} {action} completed",
+                "status": "UPDATED"
+            }
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"Smartnode control failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Smartnode control failed: {str(e)}")
+
+@api_router.post("/raptoreum/smartnodes/{node_id}/lock-collateral")
+async def lock_smartnode_collateral(node_id: str, lock_data: dict):
+    """Lock smartnode collateral"""
+    try:
+        return {
+            "success": True,
+            "message": f"Collateral for smartnode {node_id} locked successfully",
+            "collateral_amount": 1800000,
+            "locked_at": datetime.now(timezone.utc).isoformat(),
+            "unlockable": True
+        }
+    except Exception as e:
+        logger.error(f"Collateral lock failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Collateral lock failed: {str(e)}")
+
+@api_router.post("/raptoreum/smartnodes/{node_id}/unlock-collateral")
+async def unlock_smartnode_collateral(node_id: str, unlock_data: dict):
+    """Unlock smartnode collateral"""
+    try:
+        return {
+            "success": True,
+            "message": f"Collateral for smartnode {node_id} unlocked successfully",
+            "collateral_amount": 1800000,
+            "unlocked_at": datetime.now(timezone.utc).isoformat(),
+            "spendable": True
+        }
+    except Exception as e:
+        logger.error(f"Collateral unlock failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Collateral unlock failed: {str(e)}")
+
+# Chain notifications: raptoreumd ZMQ (hashblock/hashtx/rawtx) with a polling fallback
+RAPTOREUM_ZMQ_URL = os.environ.get('RAPTOREUM_ZMQ_URL', '')  # e.g. tcp://127.0.0.1:28332
+CHAIN_POLL_INTERVAL = float(os.environ.get('CHAIN_POLL_INTERVAL', '10'))  # Seconds between tip checks without ZMQ
+
+chain_notification_status = {
+    "mode": None,
+    "blocks": 0,
+    "transactions": 0,
+    "missed_notifications": 0,
+    "last_block_hash": None,
+    "last_event_at": None
+}
+chain_block_listeners: List[asyncio.Event] = []
+
+def subscribe_new_blocks() -> asyncio.Event:
+    """Event set whenever a new tip is seen; the subscriber clears it after waking"""
+    event = asyncio.Event()
+    chain_block_listeners.append(event)
+    return event
+
+async def wait_for_new_block(event: asyncio.Event, timeout: float) -> bool:
+    """Sleep until the next block notification or timeout; True if a block arrived"""
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return False
+    event.clear()
+    return True
+
+async def on_new_block(block_hash: str):
+    if block_hash == chain_notification_status["last_block_hash"]:
+        return
+    chain_notification_status.update(
+        blocks=chain_notification_status["blocks"] + 1,
+        last_block_hash=block_hash,
+        last_event_at=datetime.now(timezone.utc).isoformat()
+    )
+    chain_cache.invalidate()
+    for event in chain_block_listeners:
+        event.set()
+
+async def on_new_transaction(txid: str):
+    chain_notification_status.update(
+        transactions=chain_notification_status["transactions"] + 1,
+        last_event_at=datetime.now(timezone.utc).isoformat()
+    )
+
+async def detect_purchase_payments(raw_tx: bytes):
+    """Match outputs paying the service wallet against pending purchases by their unique salted amount"""
+    now = datetime.now(timezone.utc)
+    pending = {"status": "pending_payment", "pending_expires_at": {"$gt": now}}
+    if not await db.purchases.find_one(pending, {"_id": 1}):
+        return  # Skip the decode RPC for the common case
+    
+    tx = await rpc_client.call("decoderawtransaction", raw_tx.hex())
+    for vout in tx.get("vout", []):
+        script = vout.get("scriptPubKey", {})
+        addresses = script.get("addresses") or ([script["address"]] if script.get("address") else [])
+        if PAYMENT_WALLET_ADDRESS not in addresses:
+            continue
+        amount = vout["valueSat"] if "valueSat" in vout else satoshis(vout.get("value"))
+        purchase = await db.purchases.find_one_and_update(
+            {**pending, "price_sat": amount},
+            {
+                "$set": {"status": "payment_detected", "transaction_hash": tx["txid"], "detected_at": now.isoformat()},
+                "$unset": {"pending_expires_at": ""}
+            },
+            projection={"_id": 1}
+        )
+        if purchase:
+            records_cache.discard(f"purchase:{purchase['_id']}")
+            logger.info(f"Payment detected for {purchase['_id']} in {tx['txid']}")
+
+async def poll_chain_tip():
+    block_hash = await rpc_client.call("getbestblockhash")
+    await on_new_block(block_hash)
+
+async def zmq_chain_subscriber(url: str):
+    """Consume raptoreumd ZMQ notifications (multipart: topic, body, 4-byte LE sequence)"""
+    context = zmq.asyncio.Context.instance()
+    socket = context.socket(zmq.SUB)
+    for topic in (b"hashblock", b"hashtx", b"rawtx"):
+        socket.setsockopt(zmq.SUBSCRIBE, topic)
+    socket.connect(url)
+    
+    sequences: Dict[bytes, int] = {}
+    try:
+        while True:
+            topic, body, *rest = await socket.recv_multipart()
+            
+            # A sequence gap means notifications were dropped - reconcile the tip by RPC
+            if rest and len(rest[0]) == 4:
+                sequence = int.from_bytes(rest[0], "little")
+                expected = sequences.get(topic)
+                sequences[topic] = sequence
+                if expected is not None and sequence != (expected + 1) & 0xFFFFFFFF:
+                    chain_notification_status["missed_notifications"] += 1
+                    if topic == b"hashblock":
+                        await poll_chain_tip()
+            
+            try:
+                if topic == b"hashblock":
+                    await on_new_block(body.hex())
+                elif topic == b"hashtx":
+                    await on_new_transaction(body.hex())
+                elif topic == b"rawtx":
+                    await detect_purchase_payments(body)
+            except Exception as e:
+                logger.error(f"Failed to handle {topic.decode()} notification: {e}")
+    finally:
+        socket.close(linger=0)
+
+async def chain_notification_listener():
+    """Drive block/transaction handlers from ZMQ when configured, otherwise poll the tip"""
+    use_zmq = bool(RAPTOREUM_ZMQ_URL) and zmq is not None
+    if RAPTOREUM_ZMQ_URL and zmq is None:
+        logger.warning("RAPTOREUM_ZMQ_URL is set but pyzmq is not installed; polling raptoreumd instead")
+    chain_notification_status["mode"] = "zmq" if use_zmq else "polling"
+    
+    while True:
+        try:
+            if use_zmq:
+                await poll_chain_tip()  # Catch up on anything that happened while disconnected
+                await zmq_chain_subscriber(RAPTOREUM_ZMQ_URL)
+            else:
+                await poll_chain_tip()
+                await asyncio.sleep(CHAIN_POLL_INTERVAL)
+        except asyncio.CancelledError:
+            raise
+        except RaptoreumRPCError as e:
+            logger.warning(f"Chain notifications waiting for raptoreumd: {e}")
+            await asyncio.sleep(30)
+        except Exception as e:
+            logger.error(f"Chain notification listener error: {e}")
+            await asyncio.sleep(30)
+
+# Push channel: WebSocket / SSE topic subscriptions fed by one chain watcher
+PUSH_SYNC_INTERVAL = float(os.environ.get('PUSH_SYNC_INTERVAL', '5'))  # Sync progress refresh between blocks
+PUSH_KEEPALIVE_INTERVAL = float(os.environ.get('PUSH_KEEPALIVE_INTERVAL', '15'))
+PUSH_MAX_PENDING = int(os.environ.get('PUSH_MAX_PENDING', '64'))  # Frames queued per slow client before dropping
+PUSH_TOPICS = ("chain.tip", "sync.progress")  # Plus balance:<address> and inbox:<address>
+PUSH_MAX_BALANCE_TOPICS = int(os.environ.get('PUSH_MAX_BALANCE_TOPICS', '20'))  # Each one is refreshed on every block
+
+class PushConnection:
+    """Per-client send queue.
+
+    Frames are already encoded by the hub. State topics coalesce (a pending
+    frame is replaced by the newer one), so they hold one slot each and are
+    never dropped. Event frames queue up to max_pending, after which the oldest
+    event is dropped, so a slow client only loses its own backlog and never
+    holds up the broadcast.
+    """
+
+    def __init__(self, max_pending: int):
+        self.topics: set = set()
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending: OrderedDict = OrderedDict()
+        self._sequence = 0
+        self._waiter: Optional[asyncio.Future] = None
+
+    def push(self, topic: str, frame: str, coalesce: bool) -> int:
+        """Queue a frame; returns the number of event frames dropped to make room"""
+        if coalesce:
+            key = topic
+        else:
+            self._sequence += 1
+            key = (topic, self._sequence)
+        self._pending[key] = frame
+        dropped = 0
+        if len(self._pending) > self.max_pending:
+            # State frames are bounded by the subscribed topics; event frames have tuple keys
+            oldest_event = next((pending for pending in self._pending if isinstance(pending, tuple)), None)
+            if oldest_event is not None:
+                del self._pending[oldest_event]
+                dropped = 1
+                self.dropped += 1
+        # Bare future instead of asyncio.Event: this runs once per subscriber per broadcast
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+        return dropped
+
+    async def next_frame(self) -> str:
+        while not self._pending:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._pending.popitem(last=False)[1]
+
+    async def next_frame_or_none(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.next_frame(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class PushHub:
+    """Topic -> subscriber index for push clients.
+
+    Each published event is JSON-encoded once and the same frame is handed
+    to every subscriber's queue. The last frame of each state topic is
+    retained and replayed to new subscribers.
+    """
+
+    def __init__(self, max_pending: int = PUSH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._subscribers: Dict[str, set] = {}
+        self._last: Dict[str, tuple] = {}  # topic -> (dedupe key, frame)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0  # Kept here so drops survive the connection that had them
+
+    def connect(self) -> PushConnection:
+        return PushConnection(self.max_pending)
+
+    def subscribe(self, connection: PushConnection, topic: str) -> bool:
+        """Subscribe and replay the retained frame; False if the topic has none yet"""
+        self._subscribers.setdefault(topic, set()).add(connection)
+        connection.topics.add(topic)
+        retained = self._last.get(topic)
+        if retained:
+            self.dropped += connection.push(topic, retained[1], coalesce=True)
+        return retained is not None
+
+    def unsubscribe(self, connection: PushConnection, topic: str):
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self._subscribers[topic]
+                if topic.startswith("balance:"):
+                    self._last.pop(topic, None)
+        connection.topics.discard(topic)
+
+    def disconnect(self, connection: PushConnection):
+        for topic in list(connection.topics):
+            self.unsubscribe(connection, topic)
+
+    def publish(self, topic: str, data: Dict[str, Any], key: Any = None, coalesce: bool = True) -> int:
+        """Broadcast data to a topic's subscribers unless key matches the last published key.
+
+        coalesce=False is for event streams (e.g. messages) where every frame
+        matters and nothing is retained for late subscribers.
+        """
+        retained = self._last.get(topic)
+        if key is not None and retained and retained[0] == key:
+            return 0
+        frame = json.dumps(
+            {"topic": topic, "data": data, "timestamp": datetime.now(timezone.utc).isoformat()},
+            default=str
+        )
+        if coalesce:
+            self._last[topic] = (key, frame)
+        subscribers = self._subscribers.get(topic, ())
+        for connection in subscribers:
+            self.dropped += connection.push(topic, frame, coalesce)
+        self.published += 1
+        self.delivered += len(subscribers)
+        return len(subscribers)
+
+    def balance_addresses(self) -> List[str]:
+        return [topic[len("balance:"):] for topic in self._subscribers if topic.startswith("balance:")]
+
+    def stats(self) -> Dict[str, Any]:
+        connections = set().union(*self._subscribers.values()) if self._subscribers else set()
+        return {
+            "connections": len(connections),
+            "topics": {topic: len(subscribers) for topic, subscribers in self._subscribers.items() if not topic.startswith("balance:")},
+            "balance_topics": len(self.balance_addresses()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+push_hub = PushHub()
+
+def is_push_topic(topic: str) -> bool:
+    if topic in PUSH_TOPICS:
+        return True
+    prefix, _, address = topic.partition(":")
+    return prefix in ("balance", "inbox") and address.startswith('R') and len(address) >= 25
+
+async def publish_balance(address: str):
+    balance = await get_wallet_balance(address)
+    push_hub.publish(
+        f"balance:{address}",
+        balance,
+        key=(balance.get("balance"), balance.get("unconfirmed_balance"))
+    )
+
+async def subscribe_push_topics(connection: PushConnection, topics: List[str]) -> Dict[str, str]:
+    """Subscribe a client to every valid topic within its balance topic allowance; returns rejected topic -> reason"""
+    rejected = {}
+    balance_topics = sum(1 for topic in connection.topics if topic.startswith("balance:"))
+    for topic in topics:
+        if not is_push_topic(topic):
+            rejected[topic] = "unknown topic"
+            continue
+        if topic.startswith("balance:") and topic not in connection.topics:
+            if balance_topics >= PUSH_MAX_BALANCE_TOPICS:
+                rejected[topic] = f"at most {PUSH_MAX_BALANCE_TOPICS} balance topics per connection"
+                continue
+            balance_topics += 1
+        if not push_hub.subscribe(connection, topic) and topic.startswith("balance:"):
+            # First subscriber for this address - don't make it wait for the next block
+            try:
+                await publish_balance(topic[len("balance:"):])
+            except Exception as e:
+                logger.error(f"Failed to load balance for {topic}: {e}")
+    return rejected
+
+async def push_watcher():
+    """Single upstream producer: refresh chain state on each block (or every PUSH_SYNC_INTERVAL) and broadcast changes"""
+    new_blocks = subscribe_new_blocks()
+    while True:
+        try:
+            blockchain_info = await get_raptoreum_blockchain_info()
+            push_hub.publish(
+                "chain.tip",
+                blockchain_info,
+                key=(blockchain_info.get("blocks"), blockchain_info.get("bestblockhash"))
+            )
+            
+            daemon_status = await get_raptoreum_daemon_status()
+            push_hub.publish(
+                "sync.progress",
+                daemon_status,
+                key=(
+                    daemon_status.get("current_block"),
+                    daemon_status.get("sync_progress_percent"),
+                    daemon_status.get("daemon_connected")
+                )
+            )
+            
+            if await wait_for_new_block(new_blocks, PUSH_SYNC_INTERVAL):
+                # Balances only move with blocks
+                results = await asyncio.gather(
+                    *(publish_balance(address) for address in push_hub.balance_addresses()),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error(f"Push balance refresh failed: {result}")
+        except Exception as e:
+            logger.error(f"Push watcher error: {e}")
+            await asyncio.sleep(PUSH_SYNC_INTERVAL)
+
+# New-message delivery: change stream on db.messages, polling where there is no replica set
+MESSAGE_POLL_INTERVAL = float(os.environ.get('MESSAGE_POLL_INTERVAL', '2'))
+MESSAGE_POLL_BATCH = 500
+MESSAGE_POLL_OVERLAP = timedelta(seconds=float(os.environ.get('MESSAGE_POLL_OVERLAP', '30')))
+# Each worker follows the stream under a numbered slot lease; a restarted worker takes a free
+# slot and resumes from its saved position, so state never outgrows the worker count
+MESSAGE_WATCH_SLOTS = int(os.environ.get('MESSAGE_WATCH_SLOTS', '64'))
+CHANGE_STREAM_UNSUPPORTED = (40573,)  # $changeStream only runs on replica sets / sharded clusters
+CHANGE_STREAM_HISTORY_LOST = (136, 280, 286)  # Resume point has fallen off the oplog
+
+message_watch_status = {"mode": None, "delivered": 0, "resumed": False, "slot": None}
+
+def publish_new_message(message: Dict[str, Any]):
+    """Notify a connected recipient; the body stays in the inbox endpoint"""
+    push_hub.publish(
+        f"inbox:{message['to_wallet']}",
+        {"id": message["id"], "from": message["from_wallet"], "timestamp": message["timestamp"]},
+        coalesce=False
+    )
+    message_watch_status["delivered"] += 1
+
+def message_watch_key() -> str:
+    """watch_state document for the slot this worker holds; every worker follows the stream for its own connections"""
+    return f"messages:{message_watch_status['slot']}"
+
+async def claim_message_watch_slot() -> int:
+    """Lowest message watch slot no live worker holds"""
+    while True:
+        for slot in range(MESSAGE_WATCH_SLOTS):
+            if await acquire_lease(f"message_watch:{slot}"):
+                return slot
+        logger.warning(f"All {MESSAGE_WATCH_SLOTS} message watch slots are held; raise MESSAGE_WATCH_SLOTS")
+        await asyncio.sleep(LEASE_TTL)
+
+async def save_message_watch_state(**fields):
+    await db.watch_state.update_one(
+        {"_id": message_watch_key()},
+        {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+async def watch_message_changes(resume_token: Optional[Dict[str, Any]]):
+    """Follow inserts on db.messages, persisting the resume token whenever the stream goes idle"""
+    pipeline = [{"$match": {"operationType": "insert"}}]
+    async with db.messages.watch(pipeline, resume_after=resume_token, max_await_time_ms=1000) as stream:
+        message_watch_status.update(mode="change_stream", resumed=resume_token is not None)
+        saved_token = resume_token
+        while stream.alive:
+            change = await stream.try_next()
+            if change is not None:
+                publish_new_message(change["fullDocument"])
+                if message_watch_status["delivered"] % 100:
+                    continue  # Save at most every 100 events while busy
+            if stream.resume_token != saved_token:
+                saved_token = stream.resume_token
+                await save_message_watch_state(resume_token=saved_token)
+
+async def poll_message_window(since: str, delivered: Dict[Any, str]) -> Optional[str]:
+    """Publish messages stamped at or after since that are not in delivered; returns the newest timestamp seen"""
+    newest = None
+    after = [since, None]
+    while True:
+        timestamp, message_id = after
+        query = {"timestamp": {"$gte": timestamp}} if message_id is None else {
+            "$or": [{"timestamp": {"$gt": timestamp}}, {"timestamp": timestamp, "id": {"$gt": message_id}}]
+        }
+        cursor = db.messages.find(
+            query, {"_id": 1, "id": 1, "from_wallet": 1, "to_wallet": 1, "timestamp": 1}
+        ).sort([("timestamp", 1), ("id", 1)]).limit(MESSAGE_POLL_BATCH)
+        messages = await cursor.to_list(length=MESSAGE_POLL_BATCH)
+        for message in messages:
+            if message["_id"] not in delivered:
+                delivered[message["_id"]] = message["timestamp"]
+                publish_new_message(message)
+        if messages:
+            after = [messages[-1]["timestamp"], messages[-1]["id"]]
+            newest = after[0]
+        if len(messages) < MESSAGE_POLL_BATCH:
+            return newest
+
+async def poll_new_messages(last_seen: Optional[str]):
+    """Re-scan from last_seen minus MESSAGE_POLL_OVERLAP on an interval, deduplicating by _id.
+
+    Timestamps are taken before the insert commits, so a message can land behind one
+    already seen; the overlap window picks those up on a later pass.
+    """
+    message_watch_status.update(mode="polling", resumed=last_seen is not None)
+    if last_seen is None:
+        # Nothing stored yet: start from the newest message rather than replaying history
+        newest = await db.messages.find_one({}, {"_id": 0, "timestamp": 1}, sort=[("timestamp", -1), ("id", -1)])
+        last_seen = newest["timestamp"] if newest else datetime.now(timezone.utc).isoformat()
+        await save_message_watch_state(last_seen=last_seen)
+    
+    delivered: Dict[Any, str] = {}
+    while True:
+        since = (datetime.fromisoformat(last_seen) - MESSAGE_POLL_OVERLAP).isoformat()
+        for object_id in [object_id for object_id, timestamp in delivered.items() if timestamp < since]:
+            del delivered[object_id]
+        newest = await poll_message_window(since, delivered)
+        if newest and newest > last_seen:
+            last_seen = newest
+            await save_message_watch_state(last_seen=last_seen)
+        await asyncio.sleep(MESSAGE_POLL_INTERVAL)
+
+async def message_change_watcher():
+    """Follow new messages under a slot lease, taking a free slot again if the lease is lost"""
+    while True:
+        try:
+            slot = await claim_message_watch_slot()
+        except Exception as e:
+            logger.error(f"Failed to claim a message watch slot: {e}")
+            await asyncio.sleep(LEASE_TTL)
+            continue
+        message_watch_status["slot"] = slot
+        await hold_lease(f"message_watch:{slot}", [follow_new_messages()])
+
+async def follow_new_messages():
+    """Push new inbox messages to connected recipients, resuming where the slot's last holder stopped"""
+    use_change_stream = True
+    while True:
+        try:
+            state = await db.watch_state.find_one({"_id": message_watch_key()}) or {}
+            if use_change_stream:
+                await watch_message_changes(state.get("resume_token"))
+            else:
+                await poll_new_messages(state.get("last_seen"))
+        except OperationFailure as e:
+            if e.code in CHANGE_STREAM_UNSUPPORTED:
+                logger.info("MongoDB has no replica set; polling for new messages instead of a change stream")
+                use_change_stream = False
+            elif e.code in CHANGE_STREAM_HISTORY_LOST:
+                logger.warning("Stored message resume token is too old; restarting the change stream from now")
+                await save_message_watch_state(resume_token=None)
+            else:
+                logger.error(f"Message watcher error: {e}")
+                await asyncio.sleep(30)
+        except Exception as e:
+            logger.error(f"Message watcher error: {e}")
+            await asyncio.sleep(30)
+
+@api_router.websocket("/push/ws")
+async def push_websocket(websocket: WebSocket, topics: str = ""):
+    """Push channel; send {"action": "subscribe"|"unsubscribe", "topics": [...]} to change topics"""
+    await websocket.accept()
+    connection = push_hub.connect()
+    
+    async def subscribe(requested: List[str]):
+        rejected = await subscribe_push_topics(connection, requested)
+        if rejected:
+            await websocket.send_text(json.dumps({"error": "Topics rejected", "topics": rejected}))
+    
+    async def receive():
+        if topics:
+            await subscribe(topics.split(","))
+        while True:
+            request = await websocket.receive_json()
+            requested = request.get("topics", [])
+            if request.get("action") == "unsubscribe":
+                for topic in requested:
+                    push_hub.unsubscribe(connection, topic)
+            else:
+                await subscribe(requested)
+    
+    async def send():
+        while True:
+            await websocket.send_text(await connection.next_frame())
+    
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and not isinstance(task.exception(), (WebSocketDisconnect, type(None))):
+                logger.error(f"Push websocket error: {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        push_hub.disconnect(connection)
+
+@api_router.get("/push/events")
+async def push_events(request: Request, topics: str):
+    """Server-Sent Events fallback for the push channel (comma-separated topics)"""
+    requested = [topic for topic in topics.split(",") if topic]
+    invalid = [topic for topic in requested if not is_push_topic(topic)]
+    if invalid or not requested:
+        raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(invalid) or 'none given'}")
+    if len({topic for topic in requested if topic.startswith("balance:")}) > PUSH_MAX_BALANCE_TOPICS:
+        raise HTTPException(status_code=400, detail=f"At most {PUSH_MAX_BALANCE_TOPICS} balance topics per connection")
+    
+    connection = push_hub.connect()
+    await subscribe_push_topics(connection, requested)
+    
+    async def stream():
+        try:
+            while True:
+                frame = await connection.next_frame_or_none(PUSH_KEEPALIVE_INTERVAL)
+                if frame is None:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {frame}\n\n"
+        finally:
+            push_hub.disconnect(connection)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Address / UTXO index built from raptoreumd blocks
+ADDRESS_INDEX_ENABLED = os.environ.get('ADDRESS_INDEX_ENABLED', 'true').lower() == 'true'
+ADDRESS_INDEX_BATCH_BLOCKS = int(os.environ.get('ADDRESS_INDEX_BATCH_BLOCKS', '20'))  # Blocks fetched per RPC batch
+ADDRESS_INDEX_POLL_INTERVAL = float(os.environ.get('ADDRESS_INDEX_POLL_INTERVAL', '10'))  # Seconds between tip checks
+ADDRESS_INDEX_REORG_WINDOW = int(os.environ.get('ADDRESS_INDEX_REORG_WINDOW', '1000'))  # Block hashes kept for fork detection
+
+# In-process view of the index checkpoint so balance reads stay a single query
+address_index_status = {"height": -1, "hash": None, "tip": 0, "synced": False}
+
+def satoshis(value: Optional[float]) -> int:
+    return int(round((value or 0) * 1e8))
+
+def decode_block_for_index(block: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a verbosity-2 getblock reply to the outputs and spends the address index needs"""
+    outputs = []
+    spends = []
+    for tx in block.get("tx", []):
+        txid = tx["txid"]
+        for vin in tx.get("vin", []):
+            if "coinbase" in vin:
+                continue
+            spends.append({
+                "txid": txid,
+                "outpoint": f"{vin['txid']}:{vin['vout']}",
+                # Present when raptoreumd runs with -spentindex; used if the outpoint isn't indexed
+                "address": vin.get("address"),
+                "value": vin.get("valueSat")
+            })
+        for vout in tx.get("vout", []):
+            script = vout.get("scriptPubKey", {})
+            addresses = script.get("addresses") or ([script["address"]] if script.get("address") else [])
+            if len(addresses) != 1:
+                continue  # OP_RETURN, bare multisig and nonstandard outputs
+            outputs.append({
+                "_id": f"{txid}:{vout['n']}",
+                "txid": txid,
+                "vout": vout["n"],
+                "address": addresses[0],
+                "value": vout["valueSat"] if "valueSat" in vout else satoshis(vout.get("value"))
+            })
+    return {
+        "height": block["height"],
+        "hash": block["hash"],
+        "previousblockhash": block.get("previousblockhash"),
+        "time": block.get("time"),
+        "outputs": outputs,
+        "spends": spends
+    }
+
+async def apply_indexed_blocks(blocks: List[Dict[str, Any]]):
+    """Write decoded blocks (ascending height) into the utxo, history and balance collections"""
+    if not blocks:
+        return
+    
+    # Outputs created in this batch can be spent within it - resolve those in memory
+    created = {}
+    for block in blocks:
+        for output in block["outputs"]:
+            created[output["_id"]] = {**output, "height": block["height"], "spent_height": None, "spent_txid": None}
+    
+    spent_outpoints = [spend["outpoint"] for block in blocks for spend in block["spends"] if spend["outpoint"] not in created]
+    stored = {}
+    if spent_outpoints:
+        async for utxo in db.utxos.find({"_id": {"$in": spent_outpoints}}, {"address": 1, "value": 1}):
+            stored[utxo["_id"]] = utxo
+    
+    # Per (address, txid) movements for the history and balance collections
+    movements: Dict[tuple, Dict[str, Any]] = {}
+    def movement(address: str, txid: str, block: Dict[str, Any]) -> Dict[str, Any]:
+        key = (address, txid)
+        if key not in movements:
+            movements[key] = {"address": address, "txid": txid, "height": block["height"], "time": block["time"], "received": 0, "sent": 0}
+        return movements[key]
+    
+    spent_updates = []
+    for block in blocks:
+        for output in block["outputs"]:
+            movement(output["address"], output["txid"], block)["received"] += output["value"]
+        for spend in block["spends"]:
+            source = created.get(spend["outpoint"]) or stored.get(spend["outpoint"])
+            if source is None and spend["address"]:
+                source = {"address": spend["address"], "value": spend["value"] or 0}
+            if source is None:
+                continue  # Output predates the index start height
+            movement(source["address"], spend["txid"], block)["sent"] += source["value"]
+            if spend["outpoint"] in created:
+                created[spend["outpoint"]].update(spent_height=block["height"], spent_txid=spend["txid"])
+            else:
+                spent_updates.append(UpdateOne(
+                    {"_id": spend["outpoint"]},
+                    {"$set": {"spent_height": block["height"], "spent_txid": spend["txid"]}}
+                ))
+    
+    # utxos and history are replace/upserts, but balances are $inc: each block must be applied exactly
+    # once. Only the chain_indexers lease holder writes, and it rolls back to the checkpoint before resuming
+    if created:
+        await db.utxos.bulk_write([ReplaceOne({"_id": key}, doc, upsert=True) for key, doc in created.items()], ordered=False)
+    if spent_updates:
+        await db.utxos.bulk_write(spent_updates, ordered=False)
+    if movements:
+        await db.address_history.bulk_write([
+            ReplaceOne(
+                {"address": entry["address"], "txid": entry["txid"]},
+                {**entry, "delta": entry["received"] - entry["sent"]},
+                upsert=True
+            )
+            for entry in movements.values()
+        ], ordered=False)
+        
+        balances: Dict[str, Dict[str, int]] = {}
+        for entry in movements.values():
+            totals = balances.setdefault(entry["address"], {"received": 0, "sent": 0, "tx_count": 0, "last_height": 0})
+            totals["received"] += entry["received"]
+            totals["sent"] += entry["sent"]
+            totals["tx_count"] += 1
+            totals["last_height"] = max(totals["last_height"], entry["height"])
+        await db.address_balances.bulk_write([
+            UpdateOne(
+                {"_id": address},
+                {
+                    "$inc": {
+                        "balance": totals["received"] - totals["sent"],
+                        "received": totals["received"],
+                        "sent": totals["sent"],
+                        "tx_count": totals["tx_count"]
+                    },
+                    "$max": {"last_height": totals["last_height"]}
+                },
+                upsert=True
+            )
+            for address, totals in balances.items()
+        ], ordered=False)
+
+async def save_address_index_checkpoint(blocks: List[Dict[str, Any]]):
+    """Record the hashes of applied blocks, then advance the checkpoint to the last one"""
+    await db.index_blocks.bulk_write([
+        ReplaceOne(
+            {"_id": block["height"]},
+            {"hash": block["hash"], "previousblockhash": block["previousblockhash"]},
+            upsert=True
+        )
+        for block in blocks
+    ], ordered=False)
+    
+    height, block_hash = blocks[-1]["height"], blocks[-1]["hash"]
+    await db.index_state.update_one(
+        {"_id": "address_index"},
+        {"$set": {"height": height, "hash": block_hash, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    address_index_status.update(height=height, hash=block_hash)
+    
+    # Only the reorg window of block hashes is needed to find a fork point; prune each time
+    # the checkpoint passes a multiple of 100, whatever the batch size
+    if height // 100 > (blocks[0]["height"] - 1) // 100:
+        await db.index_blocks.delete_many({"_id": {"$lt": height - ADDRESS_INDEX_REORG_WINDOW}})
+
+async def rollback_address_index(height: int):
+    """Undo the effects of every block above height on the utxo, history and balance collections"""
+    affected = await db.address_history.distinct("address", {"height": {"$gt": height}})
+    
+    await db.utxos.delete_many({"height": {"$gt": height}})
+    await db.utxos.update_many(
+        {"spent_height": {"$gt": height}},
+        {"$set": {"spent_height": None, "spent_txid": None}}
+    )
+    await db.address_history.delete_many({"height": {"$gt": height}})
+    
+    # Rebuild balances only for addresses the orphaned blocks touched
+    if affected:
+        totals = {}
+        async for row in db.address_history.aggregate([
+            {"$match": {"address": {"$in": affected}}},
+            {"$group": {
+                "_id": "$address",
+                "received": {"$sum": "$received"},
+                "sent": {"$sum": "$sent"},
+                "tx_count": {"$sum": 1},
+                "last_height": {"$max": "$height"}
+            }}
+        ]):
+            totals[row["_id"]] = row
+        
+        await db.address_balances.bulk_write([
+            ReplaceOne(
+                {"_id": address},
+                {
+                    "balance": totals[address]["received"] - totals[address]["sent"],
+                    "received": totals[address]["received"],
+                    "sent": totals[address]["sent"],
+                    "tx_count": totals[address]["tx_count"],
+                    "last_height": totals[address]["last_height"]
+                },
+                upsert=True
+            ) if address in totals else DeleteOne({"_id": address})
+            for address in affected
+        ], ordered=False)
+    
+    await db.index_blocks.delete_many({"_id": {"$gt": height}})
+    
+    stored = await db.index_blocks.find_one({"_id": height}) if height >= 0 else None
+    block_hash = stored["hash"] if stored else None
+    await db.index_state.update_one(
+        {"_id": "address_index"},
+        {"$set": {"height": height, "hash": block_hash, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    address_index_status.update(height=height, hash=block_hash)
+    logger.info(f"Address index rolled back to height {height} ({len(affected)} addresses recomputed)")
+
+async def find_address_index_fork_point(height: int) -> int:
+    """Walk back from height comparing stored block hashes with the daemon's chain; return the last common height"""
+    while height >= 0:
+        heights = list(range(height, max(height - ADDRESS_INDEX_BATCH_BLOCKS, -1), -1))
+        daemon_hashes = await rpc_client.batch([("getblockhash", [h]) for h in heights])
+        stored = {
+            doc["_id"]: doc["hash"]
+            async for doc in db.index_blocks.find({"_id": {"$in": heights}})
+        }
+        for h, daemon_hash in zip(heights, daemon_hashes):
+            if h not in stored:
+                # Below the reorg window - nothing left to compare against
+                logger.error(f"Address index fork deeper than stored window at height {h}, rebuilding")
+                return -1
+            if stored[h] == daemon_hash:
+                return h
+        height = heights[-1] - 1
+    return -1
 
-@api_router.post("/raptoreum/smartnodes/{node_id}/{action}")
-async def control_smartnode(node_id: str, action: str, control_data: dict):
-    """Start, stop, or manage smartnode"""
+async def handle_address_index_reorg():
+    fork_height = await find_address_index_fork_point(address_index_status["height"])
+    logger.warning(
+        f"Chain reorganization detected: address index at {address_index_status['height']}, "
+        f"common ancestor at {fork_height}"
+    )
+    await rollback_address_index(fork_height)
+
+async def fetch_blocks_for_index(heights: List[int]) -> List[Dict[str, Any]]:
+    """getblockhash + getblock (verbosity 2) for a height range as two batched round trips"""
+    hashes = await rpc_client.batch([("getblockhash", [height]) for height in heights])
+    for reply in hashes:
+        if isinstance(reply, RaptoreumRPCError):
+            raise reply
+    blocks = await rpc_client.batch([("getblock", [block_hash, 2]) for block_hash in hashes], timeout=60)
+    for reply in blocks:
+        if isinstance(reply, RaptoreumRPCError):
+            raise reply
+    return blocks
+
+def blocks_extend_chain(blocks: List[Dict[str, Any]], tip_hash: Optional[str]) -> bool:
+    """True when blocks link onto tip_hash and onto each other"""
+    expected = tip_hash
+    for block in blocks:
+        if expected is not None and block["previousblockhash"] != expected:
+            return False
+        expected = block["hash"]
+    return True
+
+# Staged backfill for cold index builds: prefetch -> decode (process pool) -> ordered write
+ADDRESS_INDEX_BACKFILL_THRESHOLD = int(os.environ.get('ADDRESS_INDEX_BACKFILL_THRESHOLD', '500'))  # Blocks behind tip before backfilling
+ADDRESS_INDEX_PREFETCH_CONCURRENCY = int(os.environ.get('ADDRESS_INDEX_PREFETCH_CONCURRENCY', '4'))  # getblock batches in flight
+ADDRESS_INDEX_PREFETCH_AHEAD = int(os.environ.get('ADDRESS_INDEX_PREFETCH_AHEAD', '16'))  # Batches buffered ahead of the writer
+
+backfill_status = {
+    "running": False,
+    "start_height": None,
+    "target_height": None,
+    "height": None,
+    "blocks_per_second": 0.0,
+    "stage_seconds": {"fetch": 0.0, "decode": 0.0, "write": 0.0},
+    "started_at": None
+}
+
+def decode_block_batch(body: bytes) -> List[Dict[str, Any]]:
+    """Parse a raw getblock batch reply and decode each block (runs in the decode pool)"""
+    replies = json.loads(body)
+    if not isinstance(replies, list):
+        error = (replies.get("error") or {}) if isinstance(replies, dict) else {}
+        raise RuntimeError(f"getblock batch rejected: {error.get('message', 'unexpected reply')}")
+    
+    decoded = []
+    for reply in sorted(replies, key=lambda item: item.get("id")):
+        if reply.get("error"):
+            raise RuntimeError(f"getblock failed: {reply['error'].get('message', 'RPC error')}")
+        decoded.append(decode_block_for_index(reply["result"]))
+    return decoded
+
+async def backfill_address_index(target_height: int):
+    """Bulk-load blocks up to target_height with overlapping fetch, decode and write stages.
+
+    The prefetch queue is bounded, so fetching stalls once the writer falls
+    PREFETCH_AHEAD batches behind; decode parallelism is capped by CPU_POOL_WORKERS.
+    """
+    start_height = address_index_status["height"] + 1
+    ranges = [
+        list(range(height, min(height + ADDRESS_INDEX_BATCH_BLOCKS - 1, target_height) + 1))
+        for height in range(start_height, target_height + 1, ADDRESS_INDEX_BATCH_BLOCKS)
+    ]
+    if not ranges:
+        return
+    
+    loop = asyncio.get_running_loop()
+    pool = get_cpu_pool()
+    fetch_slots = asyncio.Semaphore(ADDRESS_INDEX_PREFETCH_CONCURRENCY)
+    pending: asyncio.Queue = asyncio.Queue(maxsize=ADDRESS_INDEX_PREFETCH_AHEAD)
+    stage_seconds = {"fetch": 0.0, "decode": 0.0, "write": 0.0}
+    backfill_status.update(
+        running=True,
+        start_height=start_height,
+        target_height=target_height,
+        height=address_index_status["height"],
+        blocks_per_second=0.0,
+        stage_seconds=stage_seconds,
+        started_at=datetime.now(timezone.utc).isoformat()
+    )
+    
+    async def fetch_and_decode(heights: List[int]) -> List[Dict[str, Any]]:
+        async with fetch_slots:
+            started = time.monotonic()
+            hashes = await rpc_client.batch([("getblockhash", [height]) for height in heights])
+            for reply in hashes:
+                if isinstance(reply, RaptoreumRPCError):
+                    raise reply
+            body = await rpc_client.batch_raw([("getblock", [block_hash, 2]) for block_hash in hashes], timeout=120)
+            stage_seconds["fetch"] += time.monotonic() - started
+        
+        started = time.monotonic()
+        blocks = await loop.run_in_executor(pool, decode_block_batch, body)
+        stage_seconds["decode"] += time.monotonic() - started
+        return blocks
+    
+    async def produce():
+        for heights in ranges:
+            await pending.put(asyncio.create_task(fetch_and_decode(heights)))
+        await pending.put(None)
+    
+    producer = asyncio.create_task(produce())
+    began = time.monotonic()
+    written = 0
     try:
-        wallet_address = control_data.get("wallet_address")
-        
-        if action == "start":
-            result = {
-                "success": True,
-                "message": f"Smartnode {node_id} started successfully",
-                "status": "STARTING",
-                "estimated_sync_time": "15-30 minutes"
-            }
-        elif action == "stop":
-            result = {
-                "success": True,
-                "message": f"Smartnode {node_id} stopped successfully", 
-                "status": "STOPPED"
-            }
-        else:
-            result = {
-                "success": True,
-                "message": f"Smartnode {node_id} {action} completed",
-                "status": "UPDATED"
-            }
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"Smartnode control failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Smartnode control failed: {str(e)}")
+        while True:
+            task = await pending.get()
+            if task is None:
+                break
+            blocks = await task
+            if not blocks_extend_chain(blocks, address_index_status["hash"]):
+                logger.warning(f"Backfill stopped at height {address_index_status['height']}: chain changed during fetch")
+                break
+            
+            started = time.monotonic()
+            await apply_indexed_blocks(blocks)
+            await save_address_index_checkpoint(blocks)
+            stage_seconds["write"] += time.monotonic() - started
+            
+            written += len(blocks)
+            backfill_status["height"] = blocks[-1]["height"]
+            backfill_status["blocks_per_second"] = round(written / max(time.monotonic() - began, 1e-6), 1)
+    finally:
+        producer.cancel()
+        while not pending.empty():
+            task = pending.get_nowait()
+            if task is None:
+                continue
+            task.cancel()
+            if task.done() and not task.cancelled():
+                task.exception()  # Already failed; mark retrieved
+        backfill_status["running"] = False
+        logger.info(
+            f"Address index backfill: {written} blocks to height {address_index_status['height']} "
+            f"at {backfill_status['blocks_per_second']} blocks/s (stage seconds {stage_seconds})"
+        )
 
-@api_router.post("/raptoreum/smartnodes/{node_id}/lock-collateral")
-async def lock_smartnode_collateral(node_id: str, lock_data: dict):
-    """Lock smartnode collateral"""
+async def address_index_follower():
+    """Walk blocks from the index checkpoint to the daemon tip and keep the address index current"""
+    while True:
+        try:
+            state = await db.index_state.find_one({"_id": "address_index"}) or {}
+            address_index_status.update(height=state.get("height", -1), hash=state.get("hash"))
+            
+            # Discard anything a crash left written above the checkpoint; re-applied below
+            await rollback_address_index(address_index_status["height"])
+            break
+        except Exception as e:
+            logger.error(f"Address index unable to load checkpoint: {e}")
+            await asyncio.sleep(30)
+    
+    new_blocks = subscribe_new_blocks()
+    while True:
+        try:
+            # Resume check: the checkpoint block must still be on the daemon's chain
+            if address_index_status["height"] >= 0:
+                current_hash = await rpc_client.call("getblockhash", address_index_status["height"])
+                if current_hash != address_index_status["hash"]:
+                    await handle_address_index_reorg()
+                    continue
+            
+            tip = await rpc_client.call("getblockcount")
+            address_index_status["tip"] = tip
+            next_height = address_index_status["height"] + 1
+            address_index_status["synced"] = next_height > tip
+            
+            if next_height > tip:
+                await wait_for_new_block(new_blocks, ADDRESS_INDEX_POLL_INTERVAL)
+                continue
+            
+            if tip - next_height >= ADDRESS_INDEX_BACKFILL_THRESHOLD:
+                await backfill_address_index(tip)
+                continue
+            
+            heights = list(range(next_height, min(tip, next_height + ADDRESS_INDEX_BATCH_BLOCKS - 1) + 1))
+            blocks = [decode_block_for_index(block) for block in await fetch_blocks_for_index(heights)]
+            if not blocks_extend_chain(blocks, address_index_status["hash"]):
+                # Tip moved underneath the fetch; the hash check above sorts it out next pass
+                continue
+            await apply_indexed_blocks(blocks)
+            await save_address_index_checkpoint(blocks)
+            
+        except RaptoreumRPCError as e:
+            logger.warning(f"Address index waiting for raptoreumd: {e}")
+            await asyncio.sleep(30)
+        except Exception as e:
+            logger.error(f"Address index follower error: {e}")
+            await asyncio.sleep(30)
+
+@api_router.get("/wallet/{address}/utxos")
+async def get_wallet_utxos(address: str, limit: int = 100):
+    """Get unspent outputs for any address from the address index"""
     try:
+        cursor = db.utxos.find(
+            {"address": address, "spent_height": None},
+            {"_id": 0, "txid": 1, "vout": 1, "value": 1, "height": 1}
+        ).sort("height", DESCENDING).limit(min(max(limit, 1), 1000))
+        utxos = await cursor.to_list(length=None)
+        for utxo in utxos:
+            utxo["amount"] = utxo.pop("value") / 1e8
+        
         return {
-            "success": True,
-            "message": f"Collateral for smartnode {node_id} locked successfully",
-            "collateral_amount": 1800000,
-            "locked_at": datetime.now(timezone.utc).isoformat(),
-            "unlockable": True
+            "address": address,
+            "utxos": utxos,
+            "index_height": address_index_status["height"],
+            "index_synced": address_index_status["synced"]
         }
     except Exception as e:
-        logger.error(f"Collateral lock failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Collateral lock failed: {str(e)}")
+        logger.error(f"Failed to get utxos for {address}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get utxos: {str(e)}")
 
-@api_router.post("/raptoreum/smartnodes/{node_id}/unlock-collateral")
-async def unlock_smartnode_collateral(node_id: str, unlock_data: dict):
-    """Unlock smartnode collateral"""
+@api_router.get("/wallet/{address}/transactions")
+async def get_wallet_transactions(address: str, limit: int = 50, before_height: Optional[int] = None):
+    """Get transaction history for any address from the address index, newest first"""
     try:
+        query: Dict[str, Any] = {"address": address}
+        if before_height is not None:
+            query["height"] = {"$lt": before_height}
+        cursor = db.address_history.find(
+            query,
+            {"_id": 0, "txid": 1, "height": 1, "time": 1, "received": 1, "sent": 1, "delta": 1}
+        ).sort("height", DESCENDING).limit(min(max(limit, 1), 500))
+        history = await cursor.to_list(length=None)
+        for entry in history:
+            for field in ("received", "sent", "delta"):
+                entry[field] = entry[field] / 1e8
+        
         return {
-            "success": True,
-            "message": f"Collateral for smartnode {node_id} unlocked successfully",
-            "collateral_amount": 1800000,
-            "unlocked_at": datetime.now(timezone.utc).isoformat(),
-            "spendable": True
+            "address": address,
+            "transactions": history,
+            "next_before_height": history[-1]["height"] if history else None,
+            "index_height": address_index_status["height"]
         }
     except Exception as e:
-        logger.error(f"Collateral unlock failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Collateral unlock failed: {str(e)}")
+        logger.error(f"Failed to get transactions for {address}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get transactions: {str(e)}")
 
 @api_router.get("/wallet/{address}/balance")
 async def get_wallet_balance(address: str):
     """Get real wallet balance from Raptoreum blockchain"""
     try:
-        # In production, this would call actual Raptoreum RPC: getbalance, listunspent, etc.
-        # For now, simulate real wallet balance (starting from 0, can grow with transactions)
-        
         # Validate RTM address format
         if not address.startswith('R') or len(address) < 25:
             raise HTTPException(status_code=400, detail="Invalid Raptoreum address format")
-        
-        # Simulate real balance calculation based on blockchain data
+
+        # Local address index answers with one indexed read once it has caught up with the tip
+        if address_index_status["synced"]:
+            indexed = await db.address_balances.find_one({"_id": address}) or {}
+            balance = indexed.get("balance", 0) / 1e8
+            return {
+                "address": address,
+                "balance": round(balance, 8),
+                "confirmed_balance": round(balance, 8),
+                "unconfirmed_balance": 0.0,
+                "locked_balance": 0.0,
+                "spendable_balance": round(balance, 8),
+                "total_received": round(indexed.get("received", 0) / 1e8, 8),
+                "transaction_count": indexed.get("tx_count", 0),
+                "last_activity_height": indexed.get("last_height"),
+                "is_watch_only": True,
+                "blockchain_height": address_index_status["height"],
+                "sync_status": "synced",
+                "source": "index"
+            }
+
+        # Address balance and tip height in one pooled round trip (requires -addressindex on raptoreumd)
+        try:
+            address_balance, block_count = await rpc_client.batch([
+                ("getaddressbalance", [{"addresses": [address]}]),
+                ("getblockcount", [])
+            ])
+        except RaptoreumRPCError as e:
+            address_balance = block_count = e
+
+        if isinstance(address_balance, dict) and isinstance(block_count, int):
+            confirmed = address_balance.get("balance", 0) / 1e8  # Satoshis to RTM
+            immature = address_balance.get("immature", 0) / 1e8
+            return {
+                "address": address,
+                "balance": round(confirmed, 8),
+                "confirmed_balance": round(confirmed, 8),
+                "unconfirmed_balance": 0.0,
+                "locked_balance": round(immature, 8),
+                "spendable_balance": round(confirmed - immature, 8),
+                "total_received": round(address_balance.get("received", 0) / 1e8, 8),
+                "last_activity": None,
+                "is_watch_only": True,
+                "blockchain_height": block_count,
+                "sync_status": "synced",
+                "source": "daemon"
+            }
+
+        # Daemon unavailable - simulate real balance calculation based on blockchain data
         # In production, this would query actual UTXOs for the address
         current_time = datetime.now(timezone.utc)
         
@@ -1646,8 +4476,9 @@ async def get_wallet_balance(address: str):
             "last_activity": current_time.isoformat() if total_balance > 0 else None,
             "is_watch_only": False,
             "hd_master_key_id": f"rtm_key_{secrets.token_hex(16)}",
-            "blockchain_height": (await get_raptoreum_blockchain_info())["blocks"],
-            "sync_status": "synced"
+            "blockchain_height": block_count if isinstance(block_count, int) else await get_chain_height(),
+            "sync_status": "synced",
+            "source": "simulated"
         }
         
         return balance_info
@@ -1706,76 +4537,518 @@ async def get_wallet_assets(address: str):
         logger.error(f"Failed to get wallet assets for {address}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get wallet assets: {str(e)}")
 
+# Asset name index: sorted names for prefix lookups plus a trigram map for substring search
+ASSET_NAME_PAGE_SIZE = 20
+ASSET_NAME_MAX_PAGE_SIZE = 200
+ASSET_LIST_BATCH = int(os.environ.get('ASSET_LIST_BATCH', '5000'))  # Names per listassets call
+ASSET_INDEX_POLL_INTERVAL = float(os.environ.get('ASSET_INDEX_POLL_INTERVAL', '300'))  # Seconds between refreshes without a block
+ASSET_NAME_MIRROR_INTERVAL = float(os.environ.get('ASSET_NAME_MIRROR_INTERVAL', '30'))  # Seconds between name index catch-ups
+
+class AssetNameIndex:
+    """In-memory index over on-chain asset names: extended from new blocks, resynced against the daemon's list"""
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._trigrams: Dict[str, set] = {}
+        self.ready = False
+        self.updated_at: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        position = bisect.bisect_left(self._names, name)
+        return position < len(self._names) and self._names[position] == name
+
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    @staticmethod
+    def _grams(name: str) -> set:
+        return {name[i:i + 3] for i in range(len(name) - 2)}
+
+    def add(self, name: str):
+        position = bisect.bisect_left(self._names, name)
+        if position < len(self._names) and self._names[position] == name:
+            return
+        self._names.insert(position, name)
+        for gram in self._grams(name):
+            self._trigrams.setdefault(gram, set()).add(name)
+
+    def remove(self, name: str):
+        position = bisect.bisect_left(self._names, name)
+        if position == len(self._names) or self._names[position] != name:
+            return
+        del self._names[position]
+        for gram in self._grams(name):
+            names = self._trigrams.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._trigrams[gram]
+
+    def extend(self, names: set) -> set:
+        """Add names seen in new blocks; returns the ones that were not indexed yet"""
+        added = {name for name in names if name not in self}
+        for name in added:
+            self.add(name)
+        if added:
+            self.updated_at = datetime.now(timezone.utc).isoformat()
+        return added
+
+    def sync(self, names: List[str]) -> tuple:
+        """Apply only the difference to the daemon's current list; returns the (added, removed) name sets"""
+        current = set(self._names)
+        latest = set(names)
+        added = latest - current
+        removed = current - latest
+        if len(added) > len(self._names):
+            # First load (or near enough): one sort beats thousands of inserts
+            self._names = sorted(latest)
+            self._trigrams = {}
+            for name in self._names:
+                for gram in self._grams(name):
+                    self._trigrams.setdefault(gram, set()).add(name)
+        else:
+            for name in removed:
+                self.remove(name)
+            for name in added:
+                self.add(name)
+        self.ready = True
+        self.updated_at = datetime.now(timezone.utc).isoformat()
+        return added, removed
+
+    def prefix(self, prefix: str, after: Optional[str] = None, limit: int = ASSET_NAME_PAGE_SIZE) -> List[str]:
+        """Names starting with prefix in sorted order, resuming after the given name"""
+        start = bisect.bisect_left(self._names, prefix)
+        if after is not None and after >= prefix:
+            start = bisect.bisect_right(self._names, after)
+        results = []
+        for name in self._names[start:start + limit]:
+            if not name.startswith(prefix):
+                break
+            results.append(name)
+        return results
+
+    def substring(self, text: str, after: Optional[str] = None, limit: int = ASSET_NAME_PAGE_SIZE) -> List[str]:
+        """Names containing text in sorted order, resuming after the given name"""
+        if len(text) < 3:
+            # Too short for trigrams; a scan of the sorted array is still only a few thousand compares
+            candidates = (name for name in self._names if text in name)
+            if after is not None:
+                candidates = (name for name in candidates if name > after)
+            return [name for _, name in zip(range(limit), candidates)]
+        
+        grams = sorted((self._trigrams.get(gram, set()) for gram in self._grams(text)), key=len)
+        if not grams[0]:
+            return []
+        matches = set.intersection(*grams) if len(grams) > 1 else set(grams[0])
+        if len(text) > 3:
+            matches = {name for name in matches if text in name}  # Trigrams can match out of order
+        if after is not None:
+            matches = {name for name in matches if name > after}
+        return sorted(matches)[:limit]
+
+asset_name_index = AssetNameIndex()
+
+async def fetch_asset_names() -> List[str]:
+    """Every asset name known to the daemon, paged through listassets"""
+    names: List[str] = []
+    while True:
+        page = await rpc_client.call("listassets", "*", False, ASSET_LIST_BATCH, len(names), timeout=60)
+        if isinstance(page, dict):
+            page = list(page.keys())  # Some daemon builds answer with a name-keyed object
+        names.extend(page or [])
+        if len(page or []) < ASSET_LIST_BATCH:
+            return names
+
+# Asset registry: getassetdata and holder snapshots in Mongo, refreshed for assets touched by new blocks
+ASSET_DETAIL_BATCH = int(os.environ.get('ASSET_DETAIL_BATCH', '100'))  # Assets per batched RPC round trip
+ASSET_HOLDERS_BATCH = 1000  # Addresses per listaddressesbyasset page
+ASSET_REGISTRY_SCAN_MAX = int(os.environ.get('ASSET_REGISTRY_SCAN_MAX', '500'))  # Further behind: refresh everything
+ASSET_PAGE_SIZE = 50
+ASSET_MAX_PAGE_SIZE = 500
+asset_registry_status = {
+    "height": -1,
+    "assets": 0,
+    "last_refreshed": 0,
+    "last_full_refresh_at": None,
+    "updated_at": None,
+    "last_error": None
+}
+
+def normalize_asset_data(name: str, data: Dict[str, Any], height: int) -> Dict[str, Any]:
+    """getassetdata reply -> registry document fields"""
+    amount = data.get("amount", data.get("Circulating_supply", 0))
+    units = data.get("units", data.get("Decimalpoint", 0))
+    reissuable = bool(data.get("reissuable", data.get("Updatable", False)))
+    unique = bool(data.get("Isunique")) or (units == 0 and amount == 1 and not reissuable)
+    return {
+        "name": name,
+        "type": "unique" if unique else ("reissuable" if reissuable else "fixed"),
+        "amount": amount,
+        "units": units,
+        "reissuable": reissuable,
+        "owner": data.get("owner") or "",
+        "txid": data.get("txid") or data.get("Asset_id") or "",
+        "has_ipfs": bool(data.get("has_ipfs") or data.get("ReferenceHash")),
+        "ipfs_hash": data.get("ipfs_hash", data.get("ReferenceHash", "")),
+        "creation_height": data.get("block_height"),
+        "updated_height": height
+    }
+
+def block_asset_names(block: Dict[str, Any]) -> set:
+    """Assets moved, issued or reissued in a verbosity-2 block (every such tx has an asset output)"""
+    names = set()
+    for tx in block.get("tx", []):
+        for vout in tx.get("vout", []):
+            asset = vout.get("asset") or vout.get("scriptPubKey", {}).get("asset")
+            if isinstance(asset, dict) and asset.get("name"):
+                names.add(asset["name"])
+    return names
+
+async def fetch_asset_holders(names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """address -> balance for each asset; first pages batched together, long lists paged individually"""
+    holders: Dict[str, Dict[str, Any]] = {name: {} for name in names}
+    pending = [(name, 0) for name in names]
+    while pending:
+        replies = await rpc_client.batch([
+            ("listaddressesbyasset", [name, False, ASSET_HOLDERS_BATCH, start]) for name, start in pending
+        ], timeout=60)
+        next_pending = []
+        for (name, start), reply in zip(pending, replies):
+            if isinstance(reply, RaptoreumRPCError):
+                raise reply
+            holders[name].update(reply or {})
+            if len(reply or {}) == ASSET_HOLDERS_BATCH:
+                next_pending.append((name, start + ASSET_HOLDERS_BATCH))
+        pending = next_pending
+    return holders
+
+async def refresh_registry_assets(names: List[str], height: int):
+    """Re-read details and holders for the given assets and store both"""
+    for i in range(0, len(names), ASSET_DETAIL_BATCH):
+        chunk = names[i:i + ASSET_DETAIL_BATCH]
+        details = await rpc_client.batch([("getassetdata", [name]) for name in chunk], timeout=60)
+        holders = await fetch_asset_holders(chunk)
+        
+        asset_updates = []
+        for name, data in zip(chunk, details):
+            if isinstance(data, RaptoreumRPCError):
+                logger.error(f"getassetdata {name} failed: {data}")
+                continue
+            document = normalize_asset_data(name, data or {}, height)
+            document["holders_count"] = len(holders[name])
+            asset_updates.append(UpdateOne({"_id": name}, {"$set": document}, upsert=True))
+        if asset_updates:
+            await db.chain_assets.bulk_write(asset_updates, ordered=False)
+        
+        # Snapshot replace: upsert current holders stamped with this height, then drop unstamped ones
+        holder_updates = [
+            UpdateOne(
+                {"asset": name, "address": address},
+                {"$set": {"balance": balance, "height": height}},
+                upsert=True
+            )
+            for name in chunk for address, balance in holders[name].items()
+        ]
+        if holder_updates:
+            await db.asset_holders.bulk_write(holder_updates, ordered=False)
+        await db.asset_holders.delete_many({"asset": {"$in": chunk}, "height": {"$ne": height}})
+    asset_registry_status["last_refreshed"] = len(names)
+
+async def remove_registry_assets(names: List[str]):
+    if names:
+        await db.chain_assets.delete_many({"_id": {"$in": names}})
+        await db.asset_holders.delete_many({"asset": {"$in": names}})
+
+async def sync_asset_registry(reload_names: bool) -> bool:
+    """Bring the name index and Mongo registry up to the daemon tip; False when already there.
+
+    New names come from the asset outputs of the blocks since the checkpoint. The full
+    listassets walk runs only when reload_names is set (startup) or the blocks can't be
+    trusted to cover the gap (first run, long outage, reorg below the checkpoint).
+    """
+    state = await db.index_state.find_one({"_id": "asset_registry"}) or {}
+    height, checkpoint_hash = state.get("height", -1), state.get("hash")
+    tip = await rpc_client.call("getblockcount")
+    if height == tip:
+        return False
+    
+    touched = set()
+    full_refresh = height < 0 or tip < height or tip - height > ASSET_REGISTRY_SCAN_MAX
+    if not full_refresh:
+        heights = list(range(height + 1, tip + 1))
+        for i in range(0, len(heights), ADDRESS_INDEX_BATCH_BLOCKS):
+            blocks = await fetch_blocks_for_index(heights[i:i + ADDRESS_INDEX_BATCH_BLOCKS])
+            if i == 0 and blocks[0].get("previousblockhash") != checkpoint_hash:
+                full_refresh = True
+                break
+            for block in blocks:
+                touched |= block_asset_names(block)
+    
+    if full_refresh or reload_names:
+        added, removed = asset_name_index.sync(await fetch_asset_names())
+        await remove_registry_assets(sorted(removed))
+    else:
+        # An asset's first output is its issuance, so names not indexed yet were created in these blocks
+        added, removed = asset_name_index.extend(touched), set()
+    touched |= added
+    
+    names = asset_name_index.names() if full_refresh else sorted(name for name in touched if name in asset_name_index)
+    await refresh_registry_assets(names, tip)
+    
+    tip_hash = await rpc_client.call("getblockhash", tip)
+    checkpoint = {"height": tip, "hash": tip_hash, "updated_at": datetime.now(timezone.utc)}
+    if full_refresh or reload_names:
+        checkpoint["names_synced_at"] = checkpoint["updated_at"]  # Workers reload their name index
+    await db.index_state.update_one({"_id": "asset_registry"}, {"$set": checkpoint}, upsert=True)
+    asset_registry_status.update(
+        height=tip,
+        assets=len(asset_name_index),
+        updated_at=datetime.now(timezone.utc).isoformat(),
+        last_error=None
+    )
+    if full_refresh:
+        asset_registry_status["last_full_refresh_at"] = asset_registry_status["updated_at"]
+    if added or removed or names:
+        logger.info(f"Asset registry at {tip}: +{len(added)} -{len(removed)}, refreshed {len(names)}")
+    return True
+
+async def mirror_asset_names(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Bring this worker's name index in step with db.chain_assets; returns the state for the next pass"""
+    registry = await db.index_state.find_one({"_id": "asset_registry"}, {"names_synced_at": 1}) or {}
+    full = not state or registry.get("names_synced_at") != state["names_synced_at"]
+    # Same-height rows are read again: the registry may have been mid-refresh on the last pass
+    query = {} if full else {"updated_height": {"$gte": state["height"]}}
+    names = []
+    height = -1 if full else state["height"]
+    async for asset in db.chain_assets.find(query, {"_id": 1, "updated_height": 1}):
+        names.append(asset["_id"])
+        height = max(height, asset.get("updated_height") or -1)
+    if full:
+        asset_name_index.sync(names)  # First pass, or the registry dropped names
+    else:
+        asset_name_index.extend(set(names))
+    return {"names_synced_at": registry.get("names_synced_at"), "height": height}
+
+async def asset_name_mirror():
+    """Every worker serves name searches from its own index, kept in step with the registry in Mongo"""
+    new_blocks = subscribe_new_blocks()
+    state: Dict[str, Any] = {}
+    while True:
+        try:
+            state = await mirror_asset_names(state)
+        except Exception as e:
+            logger.error(f"Asset registry unable to load names: {e}")
+        await wait_for_new_block(new_blocks, ASSET_NAME_MIRROR_INTERVAL)
+
+async def asset_registry_follower():
+    """Keep the Mongo asset registry current, waking on every new block; runs in the chain_indexers lease holder"""
+    new_blocks = subscribe_new_blocks()
+    reload_names = True  # Check the stored names against the daemon's full list once per start
+    while True:
+        try:
+            if await sync_asset_registry(reload_names):
+                reload_names = False
+            else:
+                await wait_for_new_block(new_blocks, ASSET_INDEX_POLL_INTERVAL)
+        except Exception as e:
+            asset_registry_status["last_error"] = str(e)
+            logger.error(f"Asset registry refresh failed: {e}")
+            await wait_for_new_block(new_blocks, ASSET_INDEX_POLL_INTERVAL)
+
+def encode_holder_cursor(holder: Dict[str, Any]) -> str:
+    raw = json.dumps([holder["balance"], holder["address"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_holder_cursor(cursor: str) -> tuple:
+    try:
+        balance, address = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return balance, str(address)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid holders cursor")
+
+@api_router.get("/raptoreum/assets/search")
+async def search_raptoreum_assets(q: str, mode: str = "prefix", cursor: Optional[str] = None, limit: int = ASSET_NAME_PAGE_SIZE):
+    """Autocomplete (mode=prefix) or substring search over on-chain asset names"""
+    if mode not in ("prefix", "substring"):
+        raise HTTPException(status_code=400, detail="mode must be prefix or substring")
+    query = q.strip().upper()
+    if not query:
+        raise HTTPException(status_code=400, detail="q is required")
+    limit = min(max(limit, 1), ASSET_NAME_MAX_PAGE_SIZE)
+    
+    # The cursor is simply the last name of the previous page
+    search = asset_name_index.prefix if mode == "prefix" else asset_name_index.substring
+    names = search(query, after=cursor, limit=limit + 1)
+    has_more = len(names) > limit
+    names = names[:limit]
+    
+    return {
+        "names": names,
+        "next_cursor": names[-1] if has_more else None,
+        "index_ready": asset_name_index.ready,
+        "indexed_names": len(asset_name_index),
+        "updated_at": asset_name_index.updated_at
+    }
+
 @api_router.get("/raptoreum/assets/all")
-async def get_all_raptoreum_assets():
-    """Get all assets created on Raptoreum blockchain"""
+async def get_all_raptoreum_assets(cursor: Optional[str] = None, limit: int = ASSET_PAGE_SIZE):
+    """Get assets created on Raptoreum blockchain from the synced registry, by name one page at a time"""
     try:
-        # In production, this would query actual Raptoreum blockchain
-        # This simulates real blockchain asset data
+        limit = min(max(limit, 1), ASSET_MAX_PAGE_SIZE)
+        query = {"_id": {"$gt": cursor}} if cursor else {}
+        assets = await db.chain_assets.find(query, {"_id": 0}).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+        has_more = len(assets) > limit
+        assets = assets[:limit]
         
-        current_time = datetime.now(timezone.utc)
+        return {
+            "assets": assets,
+            "next_cursor": assets[-1]["name"] if has_more else None,
+            "total_count": await db.chain_assets.estimated_document_count(),
+            "blockchain_height": asset_registry_status["height"],
+            "last_updated": asset_registry_status["updated_at"],
+            "note": "Asset data retrieved from Raptoreum blockchain"
+        }
         
-        # Simulate real assets from blockchain (empty for new blockchain)
-        # Real implementation would call RPC to get actual assets
-        real_assets = []
+    except Exception as e:
+        logger.error(f"Failed to get all assets: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get assets: {str(e)}")
+
+@api_router.get("/raptoreum/assets/{asset_name}")
+async def get_raptoreum_asset(asset_name: str):
+    """Get one on-chain asset from the registry"""
+    try:
+        asset = await db.chain_assets.find_one({"_id": asset_name}, {"_id": 0})
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        return asset
         
-        # Add some example assets that would exist on mainnet
-        example_assets = [
-            {
-                "name": "RTM_COMMUNITY_TOKEN",
-                "type": "reissuable",
-                "owner": "RRTMCommunityFoundation123456789012345678",
-                "txid": f"rtm_asset_{secrets.token_hex(32)}",
-                "quantity": 1000000,
-                "circulation": 750000,
-                "units": 8,
-                "reissuable": True,
-                "has_ipfs": False,
-                "ipfs_hash": "",
-                "creation_height": 340125,
-                "creation_time": (current_time - timedelta(days=30)).isoformat(),
-                "last_transaction": (current_time - timedelta(hours=2)).isoformat()
-            },
-            {
-                "name": "QUANTUM_SECURE_NFT",
-                "type": "unique", 
-                "owner": "RQuantumSecureArt9876543210fedcba0987654",
-                "txid": f"rtm_nft_{secrets.token_hex(32)}",
-                "quantity": 1,
-                "circulation": 1,
-                "units": 0,
-                "reissuable": False,
-                "has_ipfs": True,
-                "ipfs_hash": f"Qm{secrets.token_hex(22)}",
-                "creation_height": 346789,
-                "creation_time": (current_time - timedelta(days=5)).isoformat(),
-                "last_transaction": (current_time - timedelta(hours=12)).isoformat()
-            }
-        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get asset {asset_name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get asset: {str(e)}")
+
+@api_router.get("/raptoreum/assets/{asset_name}/holders")
+async def get_raptoreum_asset_holders(asset_name: str, cursor: Optional[str] = None, limit: int = ASSET_PAGE_SIZE):
+    """Top holders of an asset by balance, one page at a time"""
+    try:
+        limit = min(max(limit, 1), ASSET_MAX_PAGE_SIZE)
+        query: Dict[str, Any] = {"asset": asset_name}
+        if cursor:
+            balance, address = decode_holder_cursor(cursor)
+            query["$or"] = [
+                {"balance": {"$lt": balance}},
+                {"balance": balance, "address": {"$gt": address}}
+            ]
         
-        # In production, there might be very few or no assets initially
-        # This is realistic for a new blockchain
-        all_assets = example_assets if current_time.hour % 2 == 0 else []
+        holders = await db.asset_holders.find(
+            query, {"_id": 0, "address": 1, "balance": 1}
+        ).sort([("balance", -1), ("address", 1)]).limit(limit + 1).to_list(length=limit + 1)
+        has_more = len(holders) > limit
+        holders = holders[:limit]
         
         return {
-            "assets": all_assets,
-            "total_count": len(all_assets),
-            "blockchain_height": (await get_raptoreum_blockchain_info())["blocks"],
-            "last_updated": current_time.isoformat(),
-            "note": "Asset data retrieved from Raptoreum blockchain"
+            "asset": asset_name,
+            "holders": holders,
+            "next_cursor": encode_holder_cursor(holders[-1]) if has_more else None,
+            "as_of_height": asset_registry_status["height"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to get all assets: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to get assets: {str(e)}")
+        logger.error(f"Failed to get holders for {asset_name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get asset holders: {str(e)}")
+
+# Last daemon height sample, used to derive sync speed between status polls
+daemon_sync_sample = {"blocks": 0, "timestamp": 0.0, "blocks_per_sec": 0.0}
+
+def build_live_daemon_status(chain_info: Dict[str, Any], network_info: Dict[str, Any],
+                             wallet_loaded: bool, uptime_seconds: int,
+                             current_time: datetime) -> Dict[str, Any]:
+    """Shape getblockchaininfo/getnetworkinfo replies into the daemon status payload"""
+    current_block = chain_info.get("blocks", 0)
+    target_block = max(chain_info.get("headers", current_block), current_block)
+    blocks_remaining = target_block - current_block
+    sync_progress = chain_info.get("verificationprogress", 0) * 100
+    is_syncing = chain_info.get("initialblockdownload", False) or blocks_remaining > 10
+
+    # Sync speed from the previous sample
+    now = time.time()
+    elapsed = now - daemon_sync_sample["timestamp"]
+    if daemon_sync_sample["timestamp"] and elapsed >= 1:
+        daemon_sync_sample["blocks_per_sec"] = max(0, current_block - daemon_sync_sample["blocks"]) / elapsed
+    if elapsed >= 1:
+        daemon_sync_sample["blocks"] = current_block
+        daemon_sync_sample["timestamp"] = now
+    sync_speed = daemon_sync_sample["blocks_per_sec"] if is_syncing else 0
+
+    eta_minutes = int(blocks_remaining / sync_speed / 60) if sync_speed > 0 else 0
+    median_time = chain_info.get("mediantime")
+
+    return {
+        "daemon_connected": True,
+        "daemon_version": network_info.get("subversion", "").strip("/") or "unknown",
+        "current_block": current_block,
+        "target_block": target_block,
+        "sync_progress_percent": round(sync_progress, 2),
+        "is_syncing": is_syncing,
+        "blocks_remaining": blocks_remaining,
+        "sync_speed_blocks_per_sec": round(sync_speed, 1),
+        "sync_speed_blocks_per_min": round(sync_speed * 60, 1),
+        "estimated_sync_time": (f"{eta_minutes} minutes" if eta_minutes > 0 else "Calculating...") if is_syncing else "Synced",
+        "network": {"main": "mainnet", "test": "testnet"}.get(chain_info.get("chain"), chain_info.get("chain", "mainnet")),
+        "connections": network_info.get("connections", 0),
+        "last_block_time": datetime.fromtimestamp(median_time, timezone.utc).isoformat() if median_time else None,
+        "daemon_uptime_seconds": uptime_seconds,
+        "sync_from_last_point": True,
+        "quantum_features_active": True,
+        "rpc_port": urlparse(RAPTOREUM_RPC_URL).port or 10225,
+        "data_directory_size_gb": round(chain_info.get("size_on_disk", 0) / 1024 / 1024 / 1024, 1),
+        "wallet_loaded": wallet_loaded,
+        "indexing_complete": not chain_info.get("initialblockdownload", False),
+        "sync_status_message": "Syncing blocks from network" if is_syncing else "Fully synchronized",
+        "catching_up": is_syncing,
+        "source": "daemon"
+    }
+
 
 @api_router.get("/raptoreum/daemon/status")
 async def get_raptoreum_daemon_status():
     """Get live daemon sync status from where it left off"""
+    daemon_status = await chain_cache.get("daemon_status", load_raptoreum_daemon_status)
+    chain_cache.observe_block_height(daemon_status.get("current_block", 0), source_key="daemon_status")
+    return daemon_status
+
+async def load_raptoreum_daemon_status():
+    """Query the daemon (or simulate it) for the current sync status"""
     try:
         current_time = datetime.now(timezone.utc)
-        
-        # Simulate realistic daemon sync status from last shutdown point
+
+        # Query the local daemon first - one pooled batch instead of four requests
+        try:
+            chain_info, network_info, wallet_info, uptime = await rpc_client.batch([
+                ("getblockchaininfo", []),
+                ("getnetworkinfo", []),
+                ("getwalletinfo", []),
+                ("uptime", [])
+            ])
+        except RaptoreumRPCError as e:
+            chain_info = e
+
+        if isinstance(chain_info, dict):
+            return build_live_daemon_status(
+                chain_info,
+                network_info if isinstance(network_info, dict) else {},
+                wallet_loaded=isinstance(wallet_info, dict),
+                uptime_seconds=uptime if isinstance(uptime, int) else 0,
+                current_time=current_time
+            )
+
+        # Daemon unreachable - simulate realistic daemon sync status from last shutdown point
         # Daemon was last synced to a specific block and is now catching up
         
         # Get real current Raptoreum network block height
@@ -1876,8 +5149,8 @@ async def track_advertisement_click(click_data: dict):
         slot_name = click_data.get("slot_name")
         url = click_data.get("url")
         
-        if slot_name in advertisement_slots and advertisement_slots[slot_name]["active"]:
-            advertisement_slots[slot_name]["clicks"] += 1
+        if slot_name:
+            await db.advertisement_slots.update_one({"_id": slot_name, "active": True}, {"$inc": {"clicks": 1}})
             
         return {
             "success": True,
@@ -1897,8 +5170,8 @@ async def track_advertisement_impression(impression_data: dict):
     try:
         slot_name = impression_data.get("slot_name")
         
-        if slot_name in advertisement_slots and advertisement_slots[slot_name]["active"]:
-            advertisement_slots[slot_name]["impressions"] += 1
+        if slot_name:
+            await db.advertisement_slots.update_one({"_id": slot_name, "active": True}, {"$inc": {"impressions": 1}})
             
         return {
             "success": True,
@@ -1921,7 +5194,7 @@ async def generate_ai_asset_with_payment(asset_request):
         
         # Check if user has unlimited subscription or process payment
         user_wallet = asset_request.get("user_wallet")
-        has_unlimited = check_user_has_unlimited_binarai(user_wallet)
+        has_unlimited = await check_user_has_unlimited_binarai(user_wallet)
         
         if not has_unlimited:
             # Return pricing info for payment
@@ -1946,34 +5219,13 @@ async def generate_ai_asset_with_payment(asset_request):
         logger.error(f"AI asset generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Asset generation failed: {str(e)}")
 
-def check_user_has_unlimited_binarai(wallet_address: str) -> bool:
+async def check_user_has_unlimited_binarai(wallet_address: str) -> bool:
     """Check if user has active BinarAi unlimited subscription"""
-    if not wallet_address or wallet_address not in user_services:
-        return False
-    
-    user_active_services = user_services[wallet_address]
-    binarai_service = user_active_services.get("binarai_unlimited")
-    
-    if not binarai_service:
-        return False
-    
-    # Check if service is still active
-    if not binarai_service.get("is_active", False):
+    if not wallet_address:
         return False
     
-    # Check expiration
-    expires_at = binarai_service.get("expires_at")
-    if expires_at:
-        try:
-            expire_date = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
-            if datetime.now(timezone.utc) > expire_date:
-                # Service expired
-                binarai_service["is_active"] = False
-                return False
-        except:
-            return False
-    
-    return True
+    user_active_services = await get_user_service_records(wallet_address)
+    return service_is_active(user_active_services.get("binarai_unlimited"))
 
 @api_router.post("/payment/secure-transaction")
 async def process_secure_payment(payment_request: dict):
@@ -2074,27 +5326,16 @@ async def get_advertising_slots():
     try:
         current_time = datetime.now(timezone.utc)
         
-        # Check and update expired ads
-        for slot_name, slot_data in advertisement_slots.items():
-            if slot_data["active"] and slot_data["expires_at"]:
-                expires_at = datetime.fromisoformat(slot_data["expires_at"].replace('Z', '+00:00'))
-                if current_time > expires_at:
-                    # Ad expired, clear slot
-                    advertisement_slots[slot_name] = {
-                        "active": False,
-                        "advertiser_wallet": None,
-                        "banner_url": None,
-                        "banner_filename": None,
-                        "title": None,
-                        "url": None,
-                        "expires_at": None,
-                        "clicks": 0,
-                        "impressions": 0,
-                        "created_at": None
-                    }
+        # Clear expired ads (ISO timestamps in UTC compare correctly as strings)
+        expired = await db.advertisement_slots.update_many(
+            {"active": True, "expires_at": {"$lt": current_time.isoformat()}},
+            {"$set": empty_advertisement_slot()}
+        )
+        if expired.modified_count:
+            records_cache.discard("advertisement_slots")
         
         return {
-            "slots": advertisement_slots,
+            "slots": await get_advertisement_slots_state(),
             "daily_price_rtm": (await get_dynamic_service_prices())["advertising_daily"]["price_rtm"],
             "daily_price_usd": USD_PRICES["advertising_daily"],
             "rtm_market_price": await get_rtm_price_usd()
@@ -2111,12 +5352,13 @@ async def purchase_advertising_slot(ad_request: AdvertisementRequest):
         slot = ad_request.slot
         
         # Validate slot
-        if slot not in advertisement_slots:
+        slots = await get_advertisement_slots_state()
+        if slot not in slots:
             raise HTTPException(status_code=400, detail="Invalid advertising slot")
         
         # Check if slot is available
-        if advertisement_slots[slot]["active"]:
-            expires_at = datetime.fromisoformat(advertisement_slots[slot]["expires_at"].replace('Z', '+00:00'))
+        if slots[slot]["active"]:
+            expires_at = datetime.fromisoformat(slots[slot]["expires_at"].replace('Z', '+00:00'))
             if datetime.now(timezone.utc) < expires_at:
                 raise HTTPException(status_code=400, detail="Advertising slot is currently occupied")
         
@@ -2156,18 +5398,25 @@ async def purchase_advertising_slot(ad_request: AdvertisementRequest):
         expires_at = current_time + timedelta(days=ad_request.days)
         ad_id = f"ad_{slot}_{int(time.time())}"
         
-        advertisement_slots[slot] = {
-            "active": True,
-            "advertiser_wallet": ad_request.advertiser_wallet,
-            "banner_url": f"/api/banners/{banner_filename}",
-            "banner_filename": banner_filename,
-            "title": ad_request.title,
-            "url": ad_request.url,
-            "expires_at": expires_at.isoformat(),
-            "clicks": 0,
-            "impressions": 0,
-            "created_at": current_time.isoformat()
-        }
+        # Claim the slot atomically so two workers can't sell it twice
+        claimed = await db.advertisement_slots.update_one(
+            {"_id": slot, "$or": [{"active": False}, {"expires_at": {"$lt": current_time.isoformat()}}]},
+            {"$set": {
+                "active": True,
+                "advertiser_wallet": ad_request.advertiser_wallet,
+                "banner_url": f"/api/banners/{banner_filename}",
+                "banner_filename": banner_filename,
+                "title": ad_request.title,
+                "url": ad_request.url,
+                "expires_at": expires_at.isoformat(),
+                "clicks": 0,
+                "impressions": 0,
+                "created_at": current_time.isoformat()
+            }}
+        )
+        records_cache.discard("advertisement_slots")
+        if not claimed.modified_count:
+            raise HTTPException(status_code=400, detail="Advertising slot is currently occupied")
         
         return AdvertisementResponse(
             ad_id=ad_id,
@@ -2225,9 +5474,14 @@ async def validate_banner_image(base64_image: str) -> bool:
 async def track_ad_click(slot: str):
     """Track advertisement click"""
     try:
-        if slot in advertisement_slots and advertisement_slots[slot]["active"]:
-            advertisement_slots[slot]["clicks"] += 1
-            return {"success": True, "total_clicks": advertisement_slots[slot]["clicks"]}
+        slot_data = await db.advertisement_slots.find_one_and_update(
+            {"_id": slot, "active": True},
+            {"$inc": {"clicks": 1}},
+            projection={"clicks": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if slot_data:
+            return {"success": True, "total_clicks": slot_data["clicks"]}
         else:
             raise HTTPException(status_code=404, detail="Advertisement not found")
     except Exception as e:
@@ -2238,9 +5492,14 @@ async def track_ad_click(slot: str):
 async def track_ad_impression(slot: str):
     """Track advertisement impression"""
     try:
-        if slot in advertisement_slots and advertisement_slots[slot]["active"]:
-            advertisement_slots[slot]["impressions"] += 1
-            return {"success": True, "total_impressions": advertisement_slots[slot]["impressions"]}
+        slot_data = await db.advertisement_slots.find_one_and_update(
+            {"_id": slot, "active": True},
+            {"$inc": {"impressions": 1}},
+            projection={"impressions": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if slot_data:
+            return {"success": True, "total_impressions": slot_data["impressions"]}
         else:
             raise HTTPException(status_code=404, detail="Advertisement not found")
     except Exception as e:
@@ -2253,18 +5512,17 @@ async def get_advertiser_analytics(wallet_address: str):
     try:
         advertiser_ads = []
         
-        for slot_name, slot_data in advertisement_slots.items():
-            if slot_data["active"] and slot_data["advertiser_wallet"] == wallet_address:
-                advertiser_ads.append({
-                    "slot": slot_name,
-                    "title": slot_data["title"],
-                    "url": slot_data["url"],
-                    "clicks": slot_data["clicks"],
-                    "impressions": slot_data["impressions"],
-                    "ctr": slot_data["clicks"] / max(slot_data["impressions"], 1) * 100,
-                    "expires_at": slot_data["expires_at"],
-                    "created_at": slot_data["created_at"]
-                })
+        async for slot_data in db.advertisement_slots.find({"advertiser_wallet": wallet_address, "active": True}):
+            advertiser_ads.append({
+                "slot": slot_data["_id"],
+                "title": slot_data["title"],
+                "url": slot_data["url"],
+                "clicks": slot_data["clicks"],
+                "impressions": slot_data["impressions"],
+                "ctr": slot_data["clicks"] / max(slot_data["impressions"], 1) * 100,
+                "expires_at": slot_data["expires_at"],
+                "created_at": slot_data["created_at"]
+            })
         
         return {
             "advertiser_wallet": wallet_address,
@@ -2293,9 +5551,10 @@ async def initiate_service_purchase(purchase_request: ServicePurchaseRequest):
         service = services_dict[service_id]
         
         # Generate unique purchase ID
-        purchase_id = f"purchase_{int(time.time())}_{service_id}_{user_wallet[-8:]}"
+        purchase_id = f"purchase_{int(time.time())}_{service_id}_{user_wallet[-8:]}_{secrets.token_hex(4)}"
         
         # Create purchase record
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
         purchase_record = {
             "purchase_id": purchase_id,
             "service_id": service_id,
@@ -2305,22 +5564,37 @@ async def initiate_service_purchase(purchase_request: ServicePurchaseRequest):
             "payment_address": PAYMENT_WALLET_ADDRESS,
             "status": "pending_payment",
             "created_at": datetime.now(timezone.utc).isoformat(),
-            "expires_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+            "expires_at": expires_at.isoformat(),
             "transaction_hash": None,
             "confirmed_at": None
         }
         
-        # Store purchase record
-        purchase_database[purchase_id] = purchase_record
+        # Store purchase record (price_sat identifies the payment, pending_expires_at drives the TTL index).
+        # The quote is salted by a few satoshis until no other pending purchase has the same amount.
+        base_sat = satoshis(service["price_rtm"])
+        for attempt in range(10):
+            price_sat = base_sat + secrets.randbelow(PURCHASE_AMOUNT_SALT_MAX) + 1
+            purchase_record["price_rtm"] = price_sat / 100_000_000
+            try:
+                await db.purchases.replace_one(
+                    {"_id": purchase_id},
+                    {**purchase_record, "price_sat": price_sat, "pending_expires_at": expires_at},
+                    upsert=True
+                )
+                break
+            except DuplicateKeyError:
+                if attempt == 9:
+                    raise
+        records_cache.discard(f"purchase:{purchase_id}")
         
         # Generate QR code for payment
-        qr_data = f"{PAYMENT_WALLET_ADDRESS}?amount={service['price_rtm']:.8f}&message=RaptorQ Service: {service['name']}&purchaseId={purchase_id}"
-        qr_base64 = generate_qr_with_logo(qr_data, "RaptorQ Payment")
+        qr_data = f"{PAYMENT_WALLET_ADDRESS}?amount={purchase_record['price_rtm']:.8f}&message=RaptorQ Service: {service['name']}&purchaseId={purchase_id}"
+        qr_base64 = await generate_qr_with_logo_async(qr_data, "RaptorQ Payment")
         
         return ServicePurchaseResponse(
             purchase_id=purchase_id,
             service_name=service["name"],
-            price_rtm=service["price_rtm"],
+            price_rtm=purchase_record["price_rtm"],
             payment_address=PAYMENT_WALLET_ADDRESS,
             qr_code_data=qr_base64,
             estimated_confirmation_time="2-5 minutes",
@@ -2341,11 +5615,10 @@ async def verify_service_payment(verification_request: PaymentVerificationReques
         transaction_hash = verification_request.transaction_hash
         
         # Get purchase record
-        if purchase_id not in purchase_database:
+        purchase = await get_purchase(purchase_id)
+        if purchase is None:
             raise HTTPException(status_code=404, detail="Purchase not found")
         
-        purchase = purchase_database[purchase_id]
-        
         # Check if already confirmed
         if purchase["status"] == "confirmed":
             return {
@@ -2354,19 +5627,34 @@ async def verify_service_payment(verification_request: PaymentVerificationReques
                 "service_active": True
             }
         
-        # Mock payment verification (in production, integrate with Raptoreum RPC)
-        # This would normally query the blockchain to verify the transaction
-        is_valid_payment = await mock_verify_rtm_payment(
-            transaction_hash, 
-            purchase["payment_address"], 
-            purchase["price_rtm"]
-        )
+        if purchase["status"] == "payment_detected" and purchase["transaction_hash"] == transaction_hash:
+            # Already matched from the daemon's transaction notifications
+            is_valid_payment = True
+        else:
+            # Mock payment verification (in production, integrate with Raptoreum RPC)
+            # This would normally query the blockchain to verify the transaction
+            is_valid_payment = await mock_verify_rtm_payment(
+                transaction_hash, 
+                purchase["payment_address"], 
+                purchase["price_rtm"]
+            )
         
         if is_valid_payment:
-            # Update purchase status
-            purchase["status"] = "confirmed"
-            purchase["transaction_hash"] = transaction_hash
-            purchase["confirmed_at"] = datetime.now(timezone.utc).isoformat()
+            # Update purchase status - only one worker wins the transition
+            confirmed_at = datetime.now(timezone.utc).isoformat()
+            if not await update_purchase(
+                purchase_id,
+                {"status": {"$ne": "confirmed"}},
+                {
+                    "$set": {"status": "confirmed", "transaction_hash": transaction_hash, "confirmed_at": confirmed_at},
+                    "$unset": {"pending_expires_at": ""}
+                }
+            ):
+                return {
+                    "status": "already_confirmed",
+                    "message": "Service already activated",
+                    "service_active": True
+                }
             
             # Activate service for user
             await activate_user_service(purchase["user_wallet"], purchase["service_id"])
@@ -2376,7 +5664,7 @@ async def verify_service_payment(verification_request: PaymentVerificationReques
                 "message": f"Payment confirmed! {purchase['service_id']} activated",
                 "service_active": True,
                 "transaction_hash": transaction_hash,
-                "activated_at": purchase["confirmed_at"]
+                "activated_at": confirmed_at
             }
         else:
             return {
@@ -2396,7 +5684,7 @@ async def verify_service_payment(verification_request: PaymentVerificationReques
 async def get_user_services(wallet_address: str):
     """Get user's active premium services"""
     try:
-        user_active_services = user_services.get(wallet_address, {})
+        user_active_services = await get_user_service_records(wallet_address)
         
         active_services = []
         for service_id, service_data in user_active_services.items():
@@ -2426,10 +5714,10 @@ async def get_user_services(wallet_address: str):
 async def get_purchase_status(purchase_id: str):
     """Get status of a specific purchase"""
     try:
-        if purchase_id not in purchase_database:
+        purchase = await get_purchase(purchase_id)
+        if purchase is None:
             raise HTTPException(status_code=404, detail="Purchase not found")
         
-        purchase = purchase_database[purchase_id]
         service = PREMIUM_SERVICES.get(purchase["service_id"], {})
         
         return {
@@ -2469,9 +5757,6 @@ async def mock_verify_rtm_payment(tx_hash: str, address: str, amount: float) ->
 
 async def activate_user_service(wallet_address: str, service_id: str):
     """Activate premium service for user"""
-    if wallet_address not in user_services:
-        user_services[wallet_address] = {}
-    
     service = PREMIUM_SERVICES[service_id]
     activation_time = datetime.now(timezone.utc)
     
@@ -2487,7 +5772,12 @@ async def activate_user_service(wallet_address: str, service_id: str):
     else:
         service_record["expires_at"] = None  # One-time purchase
     
-    user_services[wallet_address][service_id] = service_record
+    await db.user_services.update_one(
+        {"user_wallet": wallet_address, "service_id": service_id},
+        {"$set": service_record},
+        upsert=True
+    )
+    records_cache.discard(f"services:{wallet_address}")
     
     logger.info(f"Service {service_id} activated for wallet {wallet_address}")
 
@@ -2580,9 +5870,8 @@ async def quantum_health_check():
         # GitHub connectivity check
         github_accessible = True
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{GITHUB_API_URL}/releases/latest", timeout=5) as response:
-                    github_accessible = response.status == 200
+            async with get_http_session().get(f"{GITHUB_API_URL}/releases/latest", timeout=5) as response:
+                github_accessible = response.status == 200
         except:
             github_accessible = False
         
@@ -2630,6 +5919,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Startup event
+def chain_indexer_coroutines() -> List[Any]:
+    coroutines = [asset_registry_follower()]
+    if ADDRESS_INDEX_ENABLED:
+        coroutines.append(address_index_follower())
+    return coroutines
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("RaptorQ Wallet API starting - Quantum resistance active")
@@ -2638,12 +5933,53 @@ async def startup_event():
     # Start self-healing monitor
     asyncio.create_task(self_healing_monitor())
     
+    # Prime the RTM price once (bounded), then keep it fresh in the background
+    try:
+        await asyncio.wait_for(refresh_rtm_price(), timeout=5)
+    except asyncio.TimeoutError:
+        logger.warning("Initial RTM price fetch timed out, background refresher will retry")
+    asyncio.create_task(rtm_price_refresher())
+    
+    # Indexes, default records and a COLLSCAN check of the hot queries
+    try:
+        await ensure_mongo_indexes()
+        await seed_advertisement_slots()
+        await migrate_legacy_asset_likes()
+        await seed_trending_scores()
+        await check_query_plans()
+    except Exception as e:
+        logger.error(f"Failed to prepare Mongo collections: {e}")
+    
+    # Block/transaction notifications (ZMQ or polling)
+    asyncio.create_task(chain_notification_listener())
+    
+    # Single producer for push subscribers
+    asyncio.create_task(push_watcher())
+    asyncio.create_task(message_change_watcher())
+    asyncio.create_task(asset_name_mirror())
+    asyncio.create_task(smartnode_registry_follower())
+    
+    # Chain writers (asset registry, address/UTXO index) run in whichever worker holds the lease
+    asyncio.create_task(run_under_lease("chain_indexers", chain_indexer_coroutines))
+    
     # Initialize system status
     system_status["last_check"] = datetime.now(timezone.utc)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("RaptorQ Wallet API shutting down - Quantum security maintained")
+    # Hand chain writers to another worker now rather than after the lease expires
+    for name in list(held_leases):
+        try:
+            await release_lease(name)
+        except Exception as e:
+            logger.error(f"Failed to release the {name} lease: {e}")
+    await rpc_client.close()
+    if http_session is not None:
+        await http_session.close()
+    qr_render_executor.shutdown(wait=False)
+    if cpu_pool is not None:
+        cpu_pool.shutdown(wait=False, cancel_futures=True)
     client.close()
 
 if __name__ == "__main__":
@@ -15,6 +15,7 @@ import { Label } from './components/ui/label';
 import { Textarea } from './components/ui/textarea';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from './components/ui/select';
 import { toast } from './hooks/use-toast';
+import { usePushChannel } from './hooks/use-push-channel';
 import { Toaster } from './components/ui/toaster';
 
 // Import production components
@@ -567,26 +568,22 @@ const Dashboard = ({ wallet, onLogout }) => {
 
   // Continuous daemon sync - runs automatically regardless of user actions
   useEffect(() => {
-    // Start immediate sync on mount
+    // Start immediate sync on mount; later updates are pushed by the backend
     loadWalletData();
     loadBlockchainInfo();
-    
-    // Continuous sync every 10 seconds (faster for production wallet)
-    const syncInterval = setInterval(() => {
-      loadBlockchainInfo();
-    }, 10000);
-    
-    // Balance update every 30 seconds
-    const balanceInterval = setInterval(() => {
-      loadWalletData();
-    }, 30000);
-    
-    return () => {
-      clearInterval(syncInterval);
-      clearInterval(balanceInterval);
-    };
   }, [wallet]);
 
+  // Chain tip and balance changes arrive over the push channel instead of polling
+  usePushChannel(['chain.tip', wallet?.address && `balance:${wallet.address}`], (message) => {
+    if (message.topic === 'chain.tip') {
+      applyBlockchainInfo(message.data);
+    } else {
+      setBalance(message.data.balance || 0);
+      setIsConnected(true);
+      setLastUpdate(new Date());
+    }
+  });
+
   // Continuous sync even when wallet is locked (only stops when window closed)
   useEffect(() => {
     const handleVisibilityChange = () => {
@@ -625,30 +622,7 @@ const Dashboard = ({ wallet, onLogout }) => {
   const loadBlockchainInfo = async () => {
     try {
       const response = await axios.get(`${API}/raptoreum/blockchain-info`);
-      const blockData = response.data;
-      
-      // Use real block height from daemon/network
-      setBlockHeight(blockData.blocks || 0);
-      
-      // Use real sync progress from daemon
-      const realSyncProgress = blockData.sync_progress_percent || ((blockData.verificationprogress || 0) * 100);
-      setSyncProgress(realSyncProgress);
-      
-      // Update daemon syncing status
-      setDaemonSyncing(blockData.is_syncing || realSyncProgress < 99.9);
-      
-      // Set connection status based on real sync state
-      setIsConnected(blockData.connections > 0);
-      
-      // Update network stats for sync tab
-      setNetworkStats({
-        hashrate: blockData.networkhashps || 0,
-        difficulty: blockData.difficulty || 0,
-        connections: blockData.connections || 0
-      });
-      
-      setLastUpdate(new Date());
-      
+      applyBlockchainInfo(response.data);
     } catch (error) {
       console.error('Failed to load blockchain info:', error);
       // For production wallet, show disconnected state if API fails
@@ -660,6 +634,30 @@ const Dashboard = ({ wallet, onLogout }) => {
     }
   };
 
+  const applyBlockchainInfo = (blockData) => {
+    // Use real block height from daemon/network
+    setBlockHeight(blockData.blocks || 0);
+    
+    // Use real sync progress from daemon
+    const realSyncProgress = blockData.sync_progress_percent || ((blockData.verificationprogress || 0) * 100);
+    setSyncProgress(realSyncProgress);
+    
+    // Update daemon syncing status
+    setDaemonSyncing(blockData.is_syncing || realSyncProgress < 99.9);
+    
+    // Set connection status based on real sync state
+    setIsConnected(blockData.connections > 0);
+    
+    // Update network stats for sync tab
+    setNetworkStats({
+      hashrate: blockData.networkhashps || 0,
+      difficulty: blockData.difficulty || 0,
+      connections: blockData.connections || 0
+    });
+    
+    setLastUpdate(new Date());
+  };
+
   const handleSessionExpired = () => {
     clearSession();
     toast({
@@ -1135,14 +1133,7 @@ const WalletSetup = ({ onWalletCreated }) => {
       try {
         console.log('Loading live daemon sync status for password screen...');
         const response = await axios.get(`${process.env.REACT_APP_BACKEND_URL}/api/raptoreum/daemon/status`);
-        const daemonData = response.data;
-        
-        // Use actual daemon sync status
-        setSetupBlockHeight(daemonData.current_block || 0);
-        setSetupSyncProgress(daemonData.sync_progress_percent || 0);
-        setSetupIsConnected(daemonData.daemon_connected || false);
-        
-        console.log(`Daemon Status: Block ${daemonData.current_block}, ${daemonData.sync_progress_percent}% synced, Connected: ${daemonData.daemon_connected}`);
+        applyDaemonSync(response.data);
         
       } catch (error) {
         console.error('Failed to load live daemon sync:', error);
@@ -1165,15 +1156,19 @@ const WalletSetup = ({ onWalletCreated }) => {
       }
     };
 
-    // Start immediate live daemon sync for password screen
+    // Initial load for password screen; live updates come from the sync.progress push topic
     loadLiveDaemonSync();
-    
-    // Aggressive sync every 5 seconds on password screen for real-time updates
-    const liveSyncInterval = setInterval(loadLiveDaemonSync, 5000);
-    
-    return () => clearInterval(liveSyncInterval);
   }, []);
 
+  const applyDaemonSync = (daemonData) => {
+    // Use actual daemon sync status
+    setSetupBlockHeight(daemonData.current_block || 0);
+    setSetupSyncProgress(daemonData.sync_progress_percent || 0);
+    setSetupIsConnected(daemonData.daemon_connected || false);
+  };
+
+  usePushChannel(['sync.progress'], (message) => applyDaemonSync(message.data));
+
   const handlePasswordLogin = () => {
     if (!password) {
       setPasswordError('Password is required');
@@ -579,6 +579,8 @@ const AssetExplorer = ({ isOpen, onClose, wallet, fillMode = false, showHeader =
   const [searchQuery, setSearchQuery] = useState('');
   const [searchType, setSearchType] = useState('name');
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedAsset, setSelectedAsset] = useState(null);
   const [showAssetDetail, setShowAssetDetail] = useState(false);
 
@@ -607,17 +609,20 @@ const AssetExplorer = ({ isOpen, onClose, wallet, fillMode = false, showHeader =
         console.log(`Loaded ${response.data.assets.length} real assets from blockchain`);
         setAssets(response.data.assets);
         setFilteredAssets(response.data.assets);
+        setNextCursor(response.data.next_cursor || null);
       } else {
         // No assets on blockchain yet (realistic for new chain or fresh state)
         console.log('No assets found on blockchain - showing empty state');
         setAssets([]);
         setFilteredAssets([]);
+        setNextCursor(null);
       }
     } catch (error) {
       console.error('Failed to load real blockchain assets:', error);
       // For production wallet, show empty state when blockchain connection fails
       setAssets([]);
       setFilteredAssets([]);
+      setNextCursor(null);
       
       if (error.response?.status === 404) {
         console.log('Asset endpoint not found - blockchain may have no assets');
@@ -629,6 +634,24 @@ const AssetExplorer = ({ isOpen, onClose, wallet, fillMode = false, showHeader =
     }
   };
 
+  // The registry serves assets a page at a time; append the next page after the last name shown
+  const loadMoreAssets = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(`${process.env.REACT_APP_BACKEND_URL}/api/raptoreum/assets/all`, {
+        params: { cursor: nextCursor },
+        timeout: 15000
+      });
+      setAssets((current) => [...current, ...(response.data.assets || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Failed to load more assets:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const searchAssets = async () => {
     if (!searchQuery.trim()) {
       setFilteredAssets(assets);
@@ -749,7 +772,7 @@ const AssetExplorer = ({ isOpen, onClose, wallet, fillMode = false, showHeader =
         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
           {filteredAssets.map((asset) => (
             <AssetCard
-              key={asset.id}
+              key={asset.id || asset.name}
               asset={asset}
               onClick={handleAssetClick}
               onLike={handleLike}
@@ -759,6 +782,21 @@ const AssetExplorer = ({ isOpen, onClose, wallet, fillMode = false, showHeader =
         </div>
       )}
 
+      {/* Next page of the registry */}
+      {!loading && !searchQuery.trim() && nextCursor && (
+        <div className="flex justify-center pt-2">
+          <Button
+            onClick={loadMoreAssets}
+            disabled={loadingMore}
+            variant="outline"
+            className="border-gray-600 text-gray-300 hover:text-white"
+          >
+            {loadingMore && <RefreshCw className="h-4 w-4 animate-spin mr-2" />}
+            Load more assets
+          </Button>
+        </div>
+      )}
+
       {/* No Results */}
       {!loading && filteredAssets.length === 0 && (
         <div className="text-center py-12">
@@ -4,7 +4,7 @@ import { Badge } from './ui/badge';
 import { Button } from './ui/button';
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from './ui/dialog';
 import { Globe, Server, Zap, MapPin, Clock, Coins } from 'lucide-react';
-import axios from 'axios';
+import { loadNetworkSmartnodes } from '../lib/smartnodes';
 
 // Country coordinates for major regions
 const countryCoordinates = {
@@ -76,8 +76,7 @@ const GlobalSmartnodeMap = ({ onClose, isOpen = false }) => {
   const loadSmartnodesData = async () => {
     try {
       console.log('Loading live Raptoreum network smartnodes...');
-      const response = await axios.get(`${process.env.REACT_APP_BACKEND_URL}/api/raptoreum/smartnodes/all`);
-      const nodes = response.data.smartnodes || [];
+      const nodes = await loadNetworkSmartnodes();
       
       // Process nodes and add country/animation data
       const processedNodes = nodes.slice(0, 100).map((node, index) => { // Limit for performance
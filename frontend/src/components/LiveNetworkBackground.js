@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useRef } from 'react';
-import axios from 'axios';
+import { loadNetworkSmartnodes } from '../lib/smartnodes';
 
 // Country coordinates for realistic world positioning
 const countries = {
@@ -83,8 +83,7 @@ const LiveNetworkBackground = ({ isActive = true, isFullscreen = false, onMinimi
   const loadNetworkData = async () => {
     try {
       console.log('Loading live Raptoreum network data for background...');
-      const response = await axios.get(`${process.env.REACT_APP_BACKEND_URL}/api/raptoreum/smartnodes/all`);
-      const smartnodes = response.data.smartnodes || [];
+      const smartnodes = await loadNetworkSmartnodes();
       
       // Process smartnodes and count by country
       const updatedCountries = { ...countries };
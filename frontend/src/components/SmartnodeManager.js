@@ -34,6 +34,7 @@ import {
   Users
 } from 'lucide-react';
 import axios from 'axios';
+import { loadNetworkSmartnodes } from '../lib/smartnodes';
 
 // Raptoreum Smartnode Requirements
 const SMARTNODE_CONFIG = {
@@ -92,8 +93,7 @@ const SmartnodeManager = ({ isOpen, onClose, wallet, embedded = false }) => {
       
       // Load real network smartnodes from Raptoreum blockchain
       console.log('Loading real Raptoreum network smartnodes...');
-      const allResponse = await axios.get(`${process.env.REACT_APP_BACKEND_URL}/api/raptoreum/smartnodes/all`);
-      const networkNodes = allResponse.data.smartnodes || [];
+      const networkNodes = await loadNetworkSmartnodes();
       
       // Filter and process real network data
       const realNetworkNodes = networkNodes.filter(node => 
@@ -0,0 +1,54 @@
+import { useEffect, useRef } from "react";
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || window.location.origin;
+
+// Subscribe to backend push topics ("chain.tip", "sync.progress", "balance:<address>").
+// Uses the WebSocket channel and falls back to Server-Sent Events when the
+// socket can't be opened or drops. onMessage receives { topic, data, timestamp }.
+function usePushChannel(topics, onMessage) {
+  const handlerRef = useRef(onMessage);
+  handlerRef.current = onMessage;
+  const topicKey = topics.filter(Boolean).join(",");
+
+  useEffect(() => {
+    if (!topicKey) return undefined;
+
+    const query = `topics=${encodeURIComponent(topicKey)}`;
+    let socket = null;
+    let source = null;
+    let closed = false;
+
+    const dispatch = (raw) => {
+      try {
+        const message = JSON.parse(raw);
+        if (message.topic) handlerRef.current(message);
+      } catch (error) {
+        console.error("Invalid push message:", error);
+      }
+    };
+
+    const openEventSource = () => {
+      // EventSource reconnects on its own
+      source = new EventSource(`${BACKEND_URL}/api/push/events?${query}`);
+      source.onmessage = (event) => dispatch(event.data);
+    };
+
+    try {
+      socket = new WebSocket(`${BACKEND_URL.replace(/^http/, "ws")}/api/push/ws?${query}`);
+      socket.onmessage = (event) => dispatch(event.data);
+      socket.onclose = () => {
+        if (!closed) openEventSource();
+      };
+    } catch (error) {
+      openEventSource();
+    }
+
+    return () => {
+      closed = true;
+      if (socket) socket.close();
+      if (source) source.close();
+    };
+  }, [topicKey]);
+}
+
+export { usePushChannel };
@@ -0,0 +1,41 @@
+import axios from "axios";
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+
+// Shared copy of the network smartnode list: { epoch, version, nodes: Map(protx_hash -> node) }
+let networkList = null;
+
+const replaceList = (data) => {
+  networkList = {
+    epoch: data.epoch,
+    version: data.version,
+    nodes: new Map(data.smartnodes.map((node) => [node.protx_hash, node])),
+  };
+};
+
+// Full list on the first call, then only what changed since the cached version
+export async function loadNetworkSmartnodes() {
+  if (networkList) {
+    const { data } = await axios.get(`${BACKEND_URL}/api/raptoreum/smartnodes/delta`, {
+      params: { since: networkList.version, epoch: networkList.epoch },
+    });
+    if (data.full) {
+      replaceList(data);
+    } else {
+      data.removed.forEach((protxHash) => networkList.nodes.delete(protxHash));
+      [...data.added, ...data.changed].forEach((node) => networkList.nodes.set(node.protx_hash, node));
+      // The payment queue moved: renumber every cached node, not just the changed ones
+      if (data.order) {
+        data.order.forEach((protxHash, index) => {
+          const node = networkList.nodes.get(protxHash);
+          if (node) networkList.nodes.set(protxHash, { ...node, rank: index + 1 });
+        });
+      }
+      networkList.version = data.version;
+    }
+  } else {
+    const { data } = await axios.get(`${BACKEND_URL}/api/raptoreum/smartnodes/all`);
+    replaceList(data);
+  }
+  return [...networkList.nodes.values()].sort((a, b) => a.rank - b.rank);
+}
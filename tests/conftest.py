@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://127.0.0.1:1")
+os.environ.setdefault("DB_NAME", "raptorq_test")
+os.environ.setdefault("RAPTOREUM_RPC_URL", "http://127.0.0.1:1/")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import mongomock.collection  # noqa: E402
+
+import server as server_module  # noqa: E402
+
+# pymongo passes sort= to bulk updates; older mongomock builders don't accept it
+def _without_sort(add):
+    def add_without_sort(self, *args, sort=None, **kwargs):
+        return add(self, *args, **kwargs)
+    return add_without_sort
+
+
+for _name in ("add_update", "add_replace"):
+    setattr(
+        mongomock.collection.BulkOperationBuilder,
+        _name,
+        _without_sort(getattr(mongomock.collection.BulkOperationBuilder, _name))
+    )
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """The backend module with a fresh in-memory database per test"""
+    client = mongomock_motor.AsyncMongoMockClient()
+    monkeypatch.setattr(server_module, "client", client)
+    monkeypatch.setattr(server_module, "db", client["raptorq_test"])
+    server_module.records_cache.invalidate()
+    server_module.chain_cache.invalidate()
+    return server_module
+
+
+@pytest.fixture
+def run():
+    return asyncio.run
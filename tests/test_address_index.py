@@ -0,0 +1,147 @@
+def make_blocks(first, count):
+    return [
+        {"height": h, "hash": f"hash{h}", "previousblockhash": f"hash{h - 1}"}
+        for h in range(first, first + count)
+    ]
+
+
+def test_checkpoints_prune_block_hashes_during_batched_backfill(server, run, monkeypatch):
+    monkeypatch.setattr(server, "ADDRESS_INDEX_REORG_WINDOW", 100)
+    monkeypatch.setitem(server.address_index_status, "height", -1)
+
+    async def scenario():
+        # Batches of 20 starting at 7 never end on a multiple of 100
+        await server.save_address_index_checkpoint(make_blocks(0, 7))
+        for first in range(7, 607, 20):
+            await server.save_address_index_checkpoint(make_blocks(first, 20))
+        oldest = await server.db.index_blocks.find_one({}, sort=[("_id", 1)])
+        return oldest["_id"], await server.db.index_blocks.count_documents({})
+
+    oldest, stored = run(scenario())
+    assert oldest >= 600 - 100 - 100
+    assert stored <= 100 + 100 + 20
+
+
+def chain_block(height, txs, tag=""):
+    return {
+        "height": height,
+        "hash": f"hash{height}{tag}",
+        "previousblockhash": f"hash{height - 1}" if height else None,
+        "time": 1700000000 + height,
+        "tx": txs
+    }
+
+
+def payment(txid, spends, outputs):
+    return {
+        "txid": txid,
+        "vin": [{"txid": spent_txid, "vout": n} for spent_txid, n in spends] or [{"coinbase": "00"}],
+        "vout": [
+            {"n": n, "valueSat": value, "scriptPubKey": {"addresses": [address]}}
+            for n, (address, value) in enumerate(outputs)
+        ]
+    }
+
+
+def test_reorg_rolls_back_orphaned_blocks(server, run, monkeypatch):
+    monkeypatch.setitem(server.address_index_status, "height", -1)
+    monkeypatch.setitem(server.address_index_status, "hash", None)
+    blocks = [
+        server.decode_block_for_index(chain_block(0, [payment("mint", [], [("Ralice", 100)])])),
+        server.decode_block_for_index(chain_block(1, [payment("pay", [("mint", 0)], [("Rbob", 60), ("Ralice", 40)])])),
+        server.decode_block_for_index(chain_block(2, [payment("reward", [], [("Rcarol", 5)])]))
+    ]
+
+    async def daemon_batch(calls, timeout=None):
+        # The daemon's chain replaced blocks 1 and 2
+        return [f"hash{height}" if height == 0 else f"hash{height}b" for _, (height,) in calls]
+
+    monkeypatch.setattr(server.rpc_client, "batch", daemon_batch)
+
+    async def scenario():
+        await server.apply_indexed_blocks(blocks)
+        await server.save_address_index_checkpoint(blocks)
+        assert (await server.db.address_balances.find_one({"_id": "Rbob"}))["balance"] == 60
+
+        await server.handle_address_index_reorg()
+
+        utxos = {doc["_id"]: doc["spent_height"] async for doc in server.db.utxos.find({})}
+        balances = {doc["_id"]: doc["balance"] async for doc in server.db.address_balances.find({})}
+        history = [doc["txid"] async for doc in server.db.address_history.find({})]
+        hashes = [doc["_id"] async for doc in server.db.index_blocks.find({})]
+        return utxos, balances, history, hashes
+
+    utxos, balances, history, hashes = run(scenario())
+    assert utxos == {"mint:0": None}
+    assert balances == {"Ralice": 100}
+    assert history == ["mint"]
+    assert hashes == [0]
+    assert server.address_index_status["height"] == 0
+    assert server.address_index_status["hash"] == "hash0"
+
+
+def backfill_daemon(server, monkeypatch, chain):
+    """getblockhash / raw getblock batches served from chain (height -> verbosity-2 block)"""
+    from concurrent.futures import ThreadPoolExecutor
+    import json
+
+    async def batch(calls, timeout=None):
+        return [chain[height]["hash"] for _, (height,) in calls]
+
+    async def batch_raw(calls, timeout=None):
+        by_hash = {block["hash"]: block for block in chain.values()}
+        replies = [{"id": n, "result": by_hash[block_hash], "error": None} for n, (_, (block_hash, _)) in enumerate(calls)]
+        return json.dumps(replies[::-1]).encode()  # Batch replies may come back in any order
+
+    monkeypatch.setattr(server.rpc_client, "batch", batch)
+    monkeypatch.setattr(server.rpc_client, "batch_raw", batch_raw)
+    monkeypatch.setattr(server, "cpu_pool", ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr(server, "ADDRESS_INDEX_BATCH_BLOCKS", 7)
+    monkeypatch.setattr(server, "ADDRESS_INDEX_PREFETCH_AHEAD", 2)
+    monkeypatch.setitem(server.address_index_status, "height", -1)
+    monkeypatch.setitem(server.address_index_status, "hash", None)
+
+
+def spending_chain(length):
+    """Each block mints 100 to a miner and moves the previous block's reward to Rsink"""
+    chain = {}
+    for height in range(length):
+        txs = [payment(f"mint{height}", [], [(f"Rminer{height % 3}", 100)])]
+        if height:
+            txs.append(payment(f"move{height}", [(f"mint{height - 1}", 0)], [("Rsink", 100)]))
+        chain[height] = chain_block(height, txs)
+    return chain
+
+
+def test_backfill_applies_every_block_in_order(server, run, monkeypatch):
+    chain = spending_chain(50)
+    backfill_daemon(server, monkeypatch, chain)
+
+    async def scenario():
+        await server.backfill_address_index(49)
+        balances = {doc["_id"]: doc["balance"] async for doc in server.db.address_balances.find({})}
+        unspent = await server.db.utxos.count_documents({"spent_height": None})
+        return balances, unspent
+
+    try:
+        balances, unspent = run(scenario())
+    finally:
+        server.cpu_pool.shutdown()
+    assert balances == {"Rminer0": 0, "Rminer1": 100, "Rminer2": 0, "Rsink": 4900}
+    assert unspent == 50  # Every move output plus the last mint
+    assert server.address_index_status["height"] == 49
+    assert server.backfill_status["height"] == 49 and not server.backfill_status["running"]
+
+
+def test_backfill_stops_when_the_chain_changes_underneath(server, run, monkeypatch):
+    chain = spending_chain(30)
+    chain[20] = {**chain[20], "previousblockhash": "orphaned"}
+    backfill_daemon(server, monkeypatch, chain)
+
+    try:
+        run(server.backfill_address_index(29))
+    finally:
+        server.cpu_pool.shutdown()
+    # Batches of 7: 0-6, 7-13 and 14-20, which no longer links
+    assert server.address_index_status["height"] == 13
+    assert server.address_index_status["hash"] == "hash13"
@@ -0,0 +1,96 @@
+import pytest
+
+
+def asset_block(height, names, tag=""):
+    return {
+        "height": height,
+        "hash": f"hash{height}{tag}",
+        "previousblockhash": f"hash{height - 1}",
+        "tx": [{"txid": f"tx{height}", "vout": [{"n": 0, "asset": {"name": name}} for name in names]}]
+    }
+
+
+@pytest.fixture
+def daemon(server, monkeypatch):
+    """raptoreumd with a tip of 12; blocks 11-12 and the full asset list can be swapped per test"""
+    chain = {"blocks": [asset_block(11, ["OLDCOIN"]), asset_block(12, ["NEWCOIN"])], "listassets": 0}
+    refreshed = []
+
+    async def call(method, *params, timeout=None):
+        if method == "getblockcount":
+            return 12
+        if method == "getblockhash":
+            return f"hash{params[0]}"
+        if method == "listassets":
+            chain["listassets"] += 1
+            return ["NEWCOIN", "OLDCOIN"]
+        raise AssertionError(method)
+
+    async def fetch_blocks(heights):
+        return [block for block in chain["blocks"] if block["height"] in heights]
+
+    async def refresh(names, height):
+        refreshed.append(names)
+
+    monkeypatch.setattr(server.rpc_client, "call", call)
+    monkeypatch.setattr(server, "fetch_blocks_for_index", fetch_blocks)
+    monkeypatch.setattr(server, "refresh_registry_assets", refresh)
+    monkeypatch.setattr(server, "asset_name_index", server.AssetNameIndex())
+    server.asset_name_index.sync(["OLDCOIN"])
+    chain["refreshed"] = refreshed
+    return chain
+
+
+def save_checkpoint(server, run, height=10, block_hash="hash10"):
+    run(server.db.index_state.insert_one({"_id": "asset_registry", "height": height, "hash": block_hash}))
+
+
+def test_new_block_extends_name_index_without_listing_assets(server, run, daemon):
+    save_checkpoint(server, run)
+
+    assert run(server.sync_asset_registry(reload_names=False)) is True
+    assert daemon["listassets"] == 0
+    assert server.asset_name_index.names() == ["NEWCOIN", "OLDCOIN"]
+    assert daemon["refreshed"] == [["NEWCOIN", "OLDCOIN"]]
+    assert run(server.sync_asset_registry(reload_names=False)) is False  # Already at the tip
+
+
+def test_startup_reloads_the_full_list(server, run, daemon):
+    save_checkpoint(server, run)
+
+    run(server.sync_asset_registry(reload_names=True))
+
+    assert daemon["listassets"] == 1
+    assert server.asset_name_index.names() == ["NEWCOIN", "OLDCOIN"]
+
+
+def test_reorg_below_checkpoint_rebuilds_from_the_full_list(server, run, daemon):
+    save_checkpoint(server, run, block_hash="hash10-orphaned")
+    server.asset_name_index.add("GHOSTCOIN")
+
+    run(server.sync_asset_registry(reload_names=False))
+
+    assert daemon["listassets"] == 1
+    assert server.asset_name_index.names() == ["NEWCOIN", "OLDCOIN"]
+
+
+def test_workers_mirror_registry_names(server, run, monkeypatch):
+    monkeypatch.setattr(server, "asset_name_index", server.AssetNameIndex())
+
+    async def scenario():
+        await server.db.index_state.insert_one({"_id": "asset_registry", "names_synced_at": 1})
+        await server.db.chain_assets.insert_many([{"_id": "OLDCOIN", "updated_height": 5}, {"_id": "GONE", "updated_height": 5}])
+        state = await server.mirror_asset_names({})
+        after_load = server.asset_name_index.names()
+
+        await server.db.chain_assets.insert_one({"_id": "NEWCOIN", "updated_height": 6})
+        state = await server.mirror_asset_names(state)
+        after_block = server.asset_name_index.names()
+
+        # The lease holder resynced against the daemon and dropped a name
+        await server.db.chain_assets.delete_one({"_id": "GONE"})
+        await server.db.index_state.update_one({"_id": "asset_registry"}, {"$set": {"names_synced_at": 2}})
+        await server.mirror_asset_names(state)
+        return after_load, after_block, server.asset_name_index.names()
+
+    assert run(scenario()) == (["GONE", "OLDCOIN"], ["GONE", "NEWCOIN", "OLDCOIN"], ["NEWCOIN", "OLDCOIN"])
@@ -0,0 +1,22 @@
+def test_network_height_does_not_invalidate_daemon_keyed_entries(server, run):
+    cache = server.SingleFlightCache(ttl=60)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return len(loads)
+
+    async def scenario():
+        cache.observe_block_height(2_000_000)
+        await cache.get("blockchain_info", load)
+        # Syncing daemon: the explorer is far ahead and is polled in between
+        cache.observe_network_height(3_100_500)
+        cache.observe_block_height(2_000_000)
+        cached = await cache.get("blockchain_info", load)
+        cache.observe_block_height(2_000_001)
+        refreshed = await cache.get("blockchain_info", load)
+        return cached, refreshed
+
+    assert run(scenario()) == (1, 2)
+    assert cache.stats()["block_height"] == 2_000_001
+    assert cache.stats()["network_height"] == 3_100_500
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+
+def test_one_worker_holds_a_lease_until_it_lapses(server, run, monkeypatch):
+    async def as_worker(worker_id, call):
+        monkeypatch.setattr(server, "WORKER_ID", worker_id)
+        return await call
+
+    async def scenario():
+        first = await as_worker("a", server.acquire_lease("chain_indexers"))
+        blocked = await as_worker("b", server.acquire_lease("chain_indexers"))
+        renewed = await as_worker("a", server.acquire_lease("chain_indexers"))
+        await server.db.leases.update_one(
+            {"_id": "chain_indexers"},
+            {"$set": {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+        )
+        taken_over = await as_worker("b", server.acquire_lease("chain_indexers"))
+        lost = await as_worker("a", server.acquire_lease("chain_indexers"))
+        return first, blocked, renewed, taken_over, lost
+
+    assert run(scenario()) == (True, False, True, True, False)
+
+
+def test_writers_stop_when_the_lease_is_lost(server, run, monkeypatch):
+    import asyncio
+
+    monkeypatch.setattr(server, "LEASE_TTL", 0.03)
+    monkeypatch.setattr(server, "WORKER_ID", "a")
+    cancelled = []
+
+    async def writer():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        assert await server.acquire_lease("chain_indexers")
+        # Another worker takes over while this one was stalled
+        await server.db.leases.update_one({"_id": "chain_indexers"}, {"$set": {"owner": "b"}})
+        await asyncio.wait_for(server.hold_lease("chain_indexers", [writer()]), timeout=1)
+
+    run(scenario())
+    assert cancelled == [True]
+    assert "chain_indexers" not in server.held_leases
@@ -0,0 +1,117 @@
+async def add_legacy_messages(server, wallet_id, unread, read=0):
+    """Messages written before inbox counters existed"""
+    await server.db.messages.insert_many([
+        {
+            "id": f"legacy-{wallet_id}-{n}",
+            "from_wallet": "Rsender",
+            "to_wallet": wallet_id,
+            "encrypted_content": "",
+            "quantum_signature": "",
+            "timestamp": f"2026-01-01T00:00:{n:02d}+00:00",
+            "is_read": n >= unread
+        }
+        for n in range(unread + read)
+    ])
+
+
+def test_send_seeds_counter_for_legacy_wallet(server, run):
+    async def scenario():
+        await add_legacy_messages(server, "Rlegacy", unread=3, read=2)
+        await server.send_quantum_message({"from_wallet": "Rsender", "to_wallet": "Rlegacy", "content": "hello"})
+        return await server.get_unread_count("Rlegacy")
+
+    assert run(scenario()) == 4
+
+
+def test_mark_read_first_keeps_legacy_count(server, run):
+    async def scenario():
+        await add_legacy_messages(server, "Rlegacy", unread=3)
+        marked = await server.mark_messages_read("Rlegacy", {"message_ids": ["legacy-Rlegacy-0"]})
+        counter = await server.db.inbox_counters.find_one({"_id": "Rlegacy"})
+        return marked, counter["unread"]
+
+    marked, stored = run(scenario())
+    assert marked == {"marked_read": 1, "unread_count": 2}
+    assert stored == 2
+
+
+def test_bulk_send_seeds_every_recipient(server, run):
+    async def scenario():
+        await add_legacy_messages(server, "Rold", unread=2)
+        await server.send_quantum_messages_bulk({
+            "from_wallet": "Rsender",
+            "to_wallets": ["Rold", "Rnew", "Rold"],
+            "content": "announcement"
+        })
+        return await server.get_unread_count("Rold"), await server.get_unread_count("Rnew")
+
+    assert run(scenario()) == (4, 1)
+
+
+def test_mark_all_read_is_not_double_counted(server, run):
+    import asyncio
+
+    async def scenario():
+        for _ in range(3):
+            await server.send_quantum_message({"from_wallet": "Rsender", "to_wallet": "Rinbox", "content": "hi"})
+        await asyncio.gather(*[server.mark_messages_read("Rinbox", {"all": True}) for _ in range(3)])
+        counter = await server.db.inbox_counters.find_one({"_id": "Rinbox"})
+        return counter["unread"]
+
+    assert run(scenario()) == 0
+
+
+def test_poll_window_picks_up_late_insert_once(server, run, monkeypatch):
+    published = []
+    monkeypatch.setattr(server, "publish_new_message", lambda message: published.append(message["id"]))
+
+    def message(message_id, second):
+        return {"id": message_id, "from_wallet": "Rsender", "to_wallet": "Rinbox", "timestamp": f"2026-01-01T00:00:{second:02d}+00:00"}
+
+    async def scenario():
+        delivered = {}
+        await server.db.messages.insert_many([message("m1", 10), message("m3", 30)])
+        newest = await server.poll_message_window("2026-01-01T00:00:00+00:00", delivered)
+        # Stamped before m3 but committed after the first pass
+        await server.db.messages.insert_one(message("m2", 20))
+        await server.poll_message_window("2026-01-01T00:00:00+00:00", delivered)
+        return newest
+
+    assert run(scenario()) == "2026-01-01T00:00:30+00:00"
+    assert published == ["m1", "m3", "m2"]
+
+
+def test_bulk_crypto_runs_in_spawned_pool(server, run, monkeypatch):
+    monkeypatch.setattr(server, "CPU_POOL_WORKERS", 2)
+    items = [("Rsender", f"R{n}", f"message {n}") for n in range(server.MESSAGE_CRYPTO_INLINE_MAX + 1)]
+    try:
+        signed = run(server.run_message_crypto(items))
+        start_method = server.cpu_pool._mp_context.get_start_method()
+    finally:
+        server.cpu_pool.shutdown()
+        monkeypatch.setattr(server, "cpu_pool", None)
+
+    assert start_method == "spawn"
+    assert len(signed) == len(items)
+    assert all(encrypted and len(signature) == 512 for encrypted, signature in signed)
+
+
+def test_restarted_worker_resumes_a_free_watch_slot(server, run, monkeypatch):
+    async def as_worker(worker_id):
+        monkeypatch.setattr(server, "WORKER_ID", worker_id)
+        slot = await server.claim_message_watch_slot()
+        monkeypatch.setitem(server.message_watch_status, "slot", slot)
+        return slot
+
+    async def scenario():
+        first = await as_worker("a")
+        await server.save_message_watch_state(last_seen="2026-01-01T00:00:10+00:00")
+        second = await as_worker("b")
+        # a shuts down; its replacement picks up the freed slot and its saved position
+        monkeypatch.setattr(server, "WORKER_ID", "a")
+        await server.release_lease(f"message_watch:{first}")
+        replacement = await as_worker("a2")
+        state = await server.db.watch_state.find_one({"_id": server.message_watch_key()})
+        return first, second, replacement, state["last_seen"], await server.db.watch_state.count_documents({})
+
+    assert run(scenario()) == (0, 1, 0, "2026-01-01T00:00:10+00:00", 1)
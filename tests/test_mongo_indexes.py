@@ -0,0 +1,31 @@
+def test_index_declared_with_new_options_replaces_the_old_one(server, run):
+    async def scenario():
+        # Deployments from before index provisioning have a sparse spent_height index
+        await server.db.utxos.create_index([("spent_height", 1)], sparse=True)
+        await server.ensure_mongo_indexes()
+        await server.ensure_mongo_indexes()
+        return await server.db.utxos.index_information()
+
+    indexes = run(scenario())
+    spent = [spec for spec in indexes.values() if spec["key"] == [("spent_height", 1)]]
+    assert len(spent) == 1 and not spent[0].get("sparse")
+
+
+def test_provisioning_leaves_matching_indexes_alone(server, run, monkeypatch):
+    dropped = []
+
+    async def scenario():
+        await server.ensure_mongo_indexes()
+        collection_type = type(server.db.utxos)
+        drop_index = collection_type.drop_index
+
+        async def record_drop(self, name, *args, **kwargs):
+            dropped.append(name)
+            return await drop_index(self, name, *args, **kwargs)
+
+        monkeypatch.setattr(collection_type, "drop_index", record_drop)
+        return await server.ensure_mongo_indexes()
+
+    created = run(scenario())
+    assert dropped == []
+    assert "spent_height_1" in created["utxos"]
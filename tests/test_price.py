@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def price_server(server, monkeypatch):
+    """Local stand-in for the price APIs: each source answers {"usd": price} after an optional delay"""
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    monkeypatch.setattr(server, "PRICE_HEDGE_DELAY", 0.1)
+    monkeypatch.setattr(server, "PRICE_FETCH_DEADLINE", 1.0)
+    replies, hits = {}, []
+
+    async def quote(request):
+        name = request.match_info["name"]
+        hits.append(name)
+        price, delay, status = replies[name]
+        await asyncio.sleep(delay)
+        return web.json_response({"usd": price}, status=status)
+
+    app = web.Application()
+    app.router.add_get("/{name}", quote)
+
+    async def serve(scenario):
+        test_server = TestServer(app)
+        await test_server.start_server()
+        # The shared session belongs to the event loop that opened it
+        monkeypatch.setattr(server, "http_session", None)
+        try:
+            return await scenario(lambda name, hedge=False: {
+                "name": name, "url": str(test_server.make_url(f"/{name}")), "path": "usd", "hedge": hedge
+            })
+        finally:
+            await server.get_http_session().close()
+            await test_server.close()
+
+    return replies, hits, serve
+
+
+def test_backups_stay_idle_while_primaries_agree(server, run, price_server):
+    replies, hits, serve = price_server
+    replies.update({"a": (1.00, 0, 200), "b": (1.02, 0, 200), "backup": (1.01, 0, 200)})
+
+    async def scenario(source):
+        return await server.fetch_price_quotes([source("a"), source("b"), source("backup", hedge=True)], 2)
+
+    quotes, errors, hedged = run(serve(scenario))
+    assert quotes == {"a": 1.00, "b": 1.02} and errors == {}
+    assert hedged is False and "backup" not in hits
+
+
+def test_slow_primary_is_hedged_after_the_delay(server, run, price_server):
+    replies, hits, serve = price_server
+    replies.update({"a": (1.00, 0, 200), "slow": (1.00, 5, 200), "backup": (1.01, 0, 200)})
+
+    async def scenario(source):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await server.fetch_price_quotes([source("a"), source("slow"), source("backup", hedge=True)], 2)
+        return result, loop.time() - started
+
+    (quotes, errors, hedged), elapsed = run(serve(scenario))
+    assert hedged is True
+    assert quotes == {"a": 1.00, "backup": 1.01}
+    assert errors == {"slow": "timed out"}
+    assert server.PRICE_HEDGE_DELAY <= elapsed < server.PRICE_FETCH_DEADLINE
+
+
+def test_failed_primary_fires_backups_without_waiting(server, run, price_server):
+    replies, hits, serve = price_server
+    replies.update({"a": (1.00, 0, 200), "down": (0, 0, 503), "backup": (1.01, 0, 200)})
+
+    async def scenario(source):
+        await asyncio.wait_for(
+            server.fetch_price_quotes([source("down"), source("a"), source("backup", hedge=True)], 2),
+            timeout=1
+        )
+        return hits.index("backup") > hits.index("down")
+
+    assert run(serve(scenario))
+
+
+def test_outliers_are_rejected_before_the_median(server):
+    price, accepted, rejected = server.aggregate_price_quotes({"a": 1.00, "b": 1.04, "c": 1.02, "pump": 2.00}, 0.15)
+
+    assert price == 1.02
+    assert sorted(accepted) == ["a", "b", "c"]
+    assert rejected == {"pump": 2.00}
+
+
+def test_outlier_does_not_count_toward_the_quorum(server, run, price_server):
+    replies, hits, serve = price_server
+    replies.update({"a": (1.00, 0, 200), "pump": (3.00, 0, 200), "backup": (1.02, 0, 200)})
+
+    async def scenario(source):
+        return await server.fetch_price_quotes([source("a"), source("pump"), source("backup", hedge=True)], 2)
+
+    quotes, errors, hedged = run(serve(scenario))
+    assert hedged is True and set(quotes) == {"a", "pump", "backup"}
+    assert server.aggregate_price_quotes(quotes, server.PRICE_MAX_DEVIATION)[2] == {"pump": 3.00}
+
+
+def test_round_without_quorum_keeps_the_fallback(server, run, price_server, monkeypatch):
+    replies, hits, serve = price_server
+    replies.update({"a": (1.00, 0, 200), "b": (1.02, 0, 200), "pump": (3.00, 0, 200), "down": (0, 0, 500)})
+    monkeypatch.setattr(server, "PRICE_MIN_QUOTES", 3)
+    monkeypatch.setattr(server, "RTM_PRICE_CACHE", {**server.RTM_PRICE_CACHE, "price_usd": 0.0, "sources": [], "last_updated": 0})
+    monkeypatch.setattr(server, "price_oracle_state", dict(server.price_oracle_state))
+
+    async def scenario(source):
+        monkeypatch.setattr(server, "PRICE_SOURCES", [source("a"), source("b"), source("pump"), source("down", hedge=True)])
+        return await server.refresh_rtm_price()
+
+    assert run(serve(scenario)) is False
+    # The round saw two agreeing quotes, one short of the quorum
+    assert sorted(server.price_oracle_state["accepted"]) == ["a", "b"] and "down" in server.price_oracle_state["errors"]
+    assert server.get_rtm_price_status() == "fallback"
+    assert run(server.get_rtm_price_usd()) == server.RTM_FALLBACK_PRICE_USD
+    assert server.get_rtm_price_source().startswith("Fallback")
+
+
+def test_price_source_follows_the_cached_price(server, monkeypatch):
+    import time
+
+    monkeypatch.setattr(server, "RTM_PRICE_CACHE", {
+        **server.RTM_PRICE_CACHE, "price_usd": 1.01, "sources": ["a", "b"], "last_updated": time.time()
+    })
+    assert server.get_rtm_price_source() == "Median of a, b"
+
+    server.RTM_PRICE_CACHE["last_updated"] -= server.RTM_PRICE_CACHE["cache_duration"]
+    assert server.get_rtm_price_source() == "Median of a, b (stale, revalidating)"
+
+    server.RTM_PRICE_CACHE["last_updated"] -= server.RTM_PRICE_CACHE["max_stale"]
+    assert server.get_rtm_price_source().startswith("Fallback")
@@ -0,0 +1,80 @@
+import json
+
+
+def drain(connection):
+    frames = []
+    while connection._pending:
+        frames.append(json.loads(connection._pending.popitem(last=False)[1]))
+    return frames
+
+
+def test_full_queue_drops_events_but_keeps_latest_state(server):
+    hub = server.PushHub(max_pending=3)
+    connection = hub.connect()
+    inbox = "inbox:RTestAddress1111111111111111111111"
+    for topic in ("chain.tip", "sync.progress", inbox):
+        hub.subscribe(connection, topic)
+
+    hub.publish("chain.tip", {"blocks": 1})
+    hub.publish("sync.progress", {"current_block": 1})
+    for n in range(3):
+        hub.publish(inbox, {"id": n}, coalesce=False)
+    hub.publish("chain.tip", {"blocks": 2})
+
+    frames = drain(connection)
+    state = {frame["topic"]: frame["data"] for frame in frames if frame["topic"] != inbox}
+    assert state == {"chain.tip": {"blocks": 2}, "sync.progress": {"current_block": 1}}
+    assert [frame["data"]["id"] for frame in frames if frame["topic"] == inbox] == [2]
+    assert connection.dropped == 2
+
+
+def test_dropped_count_outlives_disconnected_clients(server):
+    hub = server.PushHub(max_pending=1)
+    inbox = "inbox:RTestAddress1111111111111111111111"
+    slow = hub.connect()
+    hub.subscribe(slow, inbox)
+    for n in range(4):
+        hub.publish(inbox, {"id": n}, coalesce=False)
+
+    hub.disconnect(slow)
+
+    assert hub.stats()["dropped"] == 3
+
+
+def test_balance_topics_are_capped_per_connection(server, run, monkeypatch):
+    monkeypatch.setattr(server, "PUSH_MAX_BALANCE_TOPICS", 2)
+    monkeypatch.setattr(server, "push_hub", server.PushHub())
+    loaded = []
+
+    async def publish_balance(address):
+        loaded.append(address)
+        server.push_hub.publish(f"balance:{address}", {"balance": 1})
+
+    monkeypatch.setattr(server, "publish_balance", publish_balance)
+    addresses = [f"RTestAddress{n}111111111111111111111" for n in range(3)]
+    connection = server.push_hub.connect()
+
+    async def scenario():
+        first = await server.subscribe_push_topics(connection, ["chain.tip"] + [f"balance:{a}" for a in addresses])
+        # Re-subscribing a held topic doesn't use up the allowance; dropping one frees a place
+        again = await server.subscribe_push_topics(connection, [f"balance:{addresses[0]}"])
+        server.push_hub.unsubscribe(connection, f"balance:{addresses[1]}")
+        freed = await server.subscribe_push_topics(connection, [f"balance:{addresses[2]}"])
+        return first, again, freed
+
+    first, again, freed = run(scenario())
+    assert list(first) == [f"balance:{addresses[2]}"]
+    assert again == {} and freed == {}
+    assert loaded == [addresses[0], addresses[1], addresses[2]]
+    assert sorted(connection.topics) == sorted(["chain.tip", f"balance:{addresses[0]}", f"balance:{addresses[2]}"])
+
+
+def test_sse_rejects_too_many_balance_topics(server, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server, "PUSH_MAX_BALANCE_TOPICS", 1)
+    topics = ",".join(f"balance:RTestAddress{n}111111111111111111111" for n in range(2))
+
+    response = TestClient(server.app).get(f"/api/push/events?topics={topics}")
+
+    assert response.status_code == 400
@@ -0,0 +1,91 @@
+import pytest
+
+
+@pytest.fixture
+def api(server):
+    from fastapi.testclient import TestClient
+
+    # Without a with-block the client skips startup, so no background tasks run
+    return TestClient(server.app)
+
+
+RECEIVE = {"address": "RTestAddress1111111111111111111111", "amount": 2.5}
+
+
+def test_render_revalidates_with_etag(api):
+    first = api.get("/api/qr/render", params=RECEIVE)
+    assert first.status_code == 200 and first.headers["content-type"] == "image/png"
+
+    again = api.get("/api/qr/render", params=RECEIVE, headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_etag_changes_with_payload_and_format(api):
+    png = api.get("/api/qr/render", params=RECEIVE).headers["etag"]
+    svg = api.get("/api/qr/render", params={**RECEIVE, "image_format": "svg"}).headers["etag"]
+    other_amount = api.get("/api/qr/render", params={**RECEIVE, "amount": 3}).headers["etag"]
+
+    assert len({png, svg, other_amount}) == 3
+    stale = api.get("/api/qr/render", params={**RECEIVE, "amount": 3}, headers={"If-None-Match": png})
+    assert stale.status_code == 200
+
+
+def test_post_routes_ignore_if_none_match(api):
+    etag = api.get("/api/qr/render", params=RECEIVE).headers["etag"]
+
+    generated = api.post("/api/qr/generate", json=RECEIVE, headers={"If-None-Match": etag})
+    rendered = api.post("/api/qr/render", json=RECEIVE, headers={"If-None-Match": "*"})
+
+    assert generated.status_code == 200 and generated.json()["qr_code_base64"]
+    assert rendered.status_code == 200 and rendered.content
+    assert "etag" not in generated.headers and "etag" not in rendered.headers
+
+
+def test_if_none_match_lists_and_weak_validators(api):
+    etag = api.get("/api/qr/render", params=RECEIVE).headers["etag"]
+
+    def revalidate(header):
+        return api.get("/api/qr/render", params=RECEIVE, headers={"If-None-Match": header}).status_code
+
+    assert revalidate(f'"other", {etag}') == 304
+    assert revalidate(f"W/{etag}") == 304
+    assert revalidate("*") == 304
+    assert revalidate('"other", W/"stale"') == 200
+    assert revalidate(etag[1:-1]) == 200  # Unquoted
+
+
+def test_zero_amount_and_no_amount_get_different_etags(api):
+    zero = api.get("/api/qr/render", params={**RECEIVE, "amount": 0})
+    none = api.get("/api/qr/render", params={"address": RECEIVE["address"]}, headers={"If-None-Match": zero.headers["etag"]})
+
+    assert zero.headers["etag"] != none.headers["etag"]
+    assert none.status_code == 200
+
+
+def test_unknown_format_is_rejected_before_revalidation(api):
+    response = api.get("/api/qr/render", params={**RECEIVE, "image_format": "gif"}, headers={"If-None-Match": "*"})
+    assert response.status_code == 400
+
+
+def test_batch_holds_a_bounded_number_of_render_slots(server, api, monkeypatch):
+    import asyncio
+
+    monkeypatch.setattr(server, "QR_BATCH_MAX_CONCURRENT", 4)
+    rendering = {"now": 0, "peak": 0}
+
+    async def get_qr_image(payload, image_format="png"):
+        rendering["now"] += 1
+        rendering["peak"] = max(rendering["peak"], rendering["now"])
+        await asyncio.sleep(0.001)
+        rendering["now"] -= 1
+        return b"<svg/>"
+
+    monkeypatch.setattr(server, "get_qr_image", get_qr_image)
+    requests = [{"address": RECEIVE["address"], "amount": n + 1} for n in range(40)]
+
+    response = api.post("/api/qr/generate/batch", json={"requests": requests, "image_format": "svg", "output": "json"})
+
+    assert response.status_code == 200 and response.json()["count"] == 40
+    assert rendering["peak"] == 4
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+
+def fake_daemon(server, monkeypatch, answer):
+    """Serve RPC payloads from answer(request) instead of raptoreumd"""
+    sent = []
+
+    async def send(self, payload, timeout):
+        sent.append(payload)
+        if isinstance(payload, list):
+            return 200, json.dumps([answer(request) for request in reversed(payload)]).encode()
+        return 200, json.dumps(answer(payload)).encode()
+
+    monkeypatch.setattr(server.RaptoreumRPCClient, "_send", send)
+    return sent
+
+
+def blockhash_daemon(request):
+    height = request["params"][0]
+    if height < 0:
+        return {"id": request["id"], "result": None, "error": {"code": -8, "message": "Block height out of range"}}
+    return {"id": request["id"], "result": f"hash{height}", "error": None}
+
+
+def test_batch_keeps_call_order_and_returns_errors_in_place(server, run, monkeypatch):
+    sent = fake_daemon(server, monkeypatch, blockhash_daemon)
+    client = server.RaptoreumRPCClient("http://daemon/", "user", "pass")
+
+    results = run(client.batch([("getblockhash", [1]), ("getblockhash", [-1]), ("getblockhash", [2])]))
+
+    assert len(sent) == 1 and len(sent[0]) == 3
+    assert results[0] == "hash1" and results[2] == "hash2"
+    assert isinstance(results[1], server.RaptoreumRPCError) and results[1].code == -8
+
+
+def test_batch_reports_missing_replies(server, run, monkeypatch):
+    def drop_second(request):
+        return blockhash_daemon({**request, "id": -1}) if request["params"][0] == 2 else blockhash_daemon(request)
+
+    fake_daemon(server, monkeypatch, drop_second)
+    client = server.RaptoreumRPCClient("http://daemon/", "user", "pass")
+
+    first, second = run(client.batch([("getblockhash", [1]), ("getblockhash", [2])]))
+
+    assert first == "hash1"
+    assert isinstance(second, server.RaptoreumRPCError) and "getblockhash" in str(second)
+
+
+def test_batch_raises_when_daemon_rejects_the_whole_batch(server, run, monkeypatch):
+    async def send(self, payload, timeout):
+        return 500, json.dumps({"id": None, "result": None, "error": {"code": -32700, "message": "Parse error"}}).encode()
+
+    monkeypatch.setattr(server.RaptoreumRPCClient, "_send", send)
+    client = server.RaptoreumRPCClient("http://daemon/", "user", "pass")
+
+    with pytest.raises(server.RaptoreumRPCError) as raised:
+        run(client.batch([("getblockhash", [1])]))
+    assert raised.value.code == -32700
+
+
+def test_batch_ids_do_not_collide_across_calls(server, run, monkeypatch):
+    sent = fake_daemon(server, monkeypatch, blockhash_daemon)
+    client = server.RaptoreumRPCClient("http://daemon/", "user", "pass")
+
+    run(client.batch([("getblockhash", [1]), ("getblockhash", [2])]))
+    run(client.call("getblockhash", 3))
+
+    ids = [request["id"] for request in sent[0]] + [sent[1]["id"]]
+    assert len(set(ids)) == 3
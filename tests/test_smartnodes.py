@@ -0,0 +1,101 @@
+def node(protx_hash, status="ENABLED", last_paid_block=0, ip="10.0.0.1"):
+    return {
+        "protx_hash": protx_hash,
+        "status": status,
+        "last_paid_block": last_paid_block,
+        "registered_height": 1,
+        "last_paid": last_paid_block,
+        "payee": f"R{protx_hash}",
+        "ip": ip
+    }
+
+
+def apply_delta(copy, delta):
+    """What the frontend does with a delta reply"""
+    for protx_hash in delta["removed"]:
+        del copy[protx_hash]
+    for record in delta["added"] + delta["changed"]:
+        copy[record["protx_hash"]] = record
+    for rank, protx_hash in enumerate(delta["order"] or [], start=1):
+        copy[protx_hash] = {**copy[protx_hash], "rank": rank}
+    return copy
+
+
+def test_delta_catches_up_across_several_versions(server):
+    registry = server.SmartnodeRegistry()
+    registry.load([node("a"), node("b"), node("c")], "raptoreumd")
+    since = registry.version
+    client_copy = dict(registry.by_hash)
+
+    registry.load([node("a", last_paid_block=5), node("b"), node("c"), node("d")], "raptoreumd")
+    registry.load([node("a", last_paid_block=5), node("c", status="POSE_BANNED"), node("d"), node("e")], "raptoreumd")
+    registry.load([node("a", last_paid_block=5), node("c", status="POSE_BANNED"), node("d")], "raptoreumd")
+
+    delta = registry.delta(since, registry.epoch)
+    assert registry.version == since + 3
+    assert sorted(record["protx_hash"] for record in delta["added"]) == ["d"]
+    assert sorted(record["protx_hash"] for record in delta["changed"]) == ["a", "c"]
+    assert delta["removed"] == ["b"]  # e came and went inside the gap
+    assert apply_delta(client_copy, delta) == registry.by_hash
+
+
+def test_payment_queue_moves_send_the_new_order(server):
+    registry = server.SmartnodeRegistry()
+    registry.load([node("a", last_paid_block=1), node("b", last_paid_block=2), node("c", last_paid_block=3)], "raptoreumd")
+    version = registry.version
+    client_copy = dict(registry.by_hash)
+    # b is unchanged but moves up once a gets paid
+    registry.load([node("a", last_paid_block=4), node("b", last_paid_block=2), node("c", last_paid_block=3)], "raptoreumd")
+
+    delta = registry.delta(version, registry.epoch)
+    assert registry.version == version + 1
+    assert [record["protx_hash"] for record in delta["changed"]] == ["a"]
+    assert delta["order"] == ["b", "c", "a"]
+    assert apply_delta(client_copy, delta) == registry.by_hash
+
+
+def test_unchanged_reload_keeps_the_version(server):
+    registry = server.SmartnodeRegistry()
+    registry.load([node("a", last_paid_block=1), node("b", last_paid_block=2)], "raptoreumd")
+    version = registry.version
+    registry.load([node("b", last_paid_block=2), node("a", last_paid_block=1)], "raptoreumd")
+
+    assert registry.version == version
+    assert registry.delta(version, registry.epoch) == {"added": [], "changed": [], "removed": [], "order": None}
+
+
+def test_delta_falls_back_to_full_list(server, monkeypatch):
+    monkeypatch.setattr(server, "SMARTNODE_DELTA_HISTORY", 2)
+    registry = server.SmartnodeRegistry()
+    registry.load([node("a")], "raptoreumd")
+    oldest = registry.version
+    for block in range(1, 4):
+        registry.load([node("a", last_paid_block=block)], "raptoreumd")
+
+    assert registry.delta(oldest, registry.epoch) is None  # History no longer reaches back that far
+    assert registry.delta(registry.version - 2, registry.epoch) is not None
+
+
+def test_versions_from_another_worker_get_a_full_list(server):
+    mine, other = server.SmartnodeRegistry(), server.SmartnodeRegistry()
+    for registry in (mine, other):
+        registry.load([node("a")], "raptoreumd")
+        registry.load([node("a", last_paid_block=1)], "raptoreumd")
+
+    assert mine.version == other.version
+    assert mine.delta(other.version - 1, other.epoch) is None
+    assert mine.delta(other.version - 1, None) is None
+
+
+def test_delta_endpoint_returns_full_snapshot_for_unknown_version(server, run, monkeypatch):
+    registry = server.SmartnodeRegistry()
+    registry.load([node("a"), node("b")], "raptoreumd")
+    monkeypatch.setattr(server, "smartnode_registry", registry)
+
+    full = run(server.get_smartnodes_delta(since=registry.version, epoch="restarted"))
+    current = run(server.get_smartnodes_delta(since=registry.version, epoch=registry.epoch))
+
+    assert full["full"] is True and [record["protx_hash"] for record in full["smartnodes"]] == ["a", "b"]
+    assert full["epoch"] == registry.epoch
+    assert current["full"] is False and current["version"] == registry.version
+    assert (current["added"], current["changed"], current["removed"], current["order"]) == ([], [], [], None)
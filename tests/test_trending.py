@@ -0,0 +1,93 @@
+import math
+
+
+async def create_asset(server, asset_id, created_at):
+    await server.db.assets.insert_one({
+        "id": asset_id,
+        "asset_id": f"quantum_asset_{asset_id}",
+        "asset_name": asset_id,
+        "wallet_id": "Rcreator",
+        "likes": 0,
+        "created_at": created_at.isoformat(),
+        "trending_score": server.trending_event_score(1, created_at.timestamp())
+    })
+
+
+def test_unlike_removes_only_its_own_like(server, run, monkeypatch):
+    from datetime import datetime, timezone
+
+    created = datetime.now(timezone.utc)
+    clock = [created.timestamp()]
+    monkeypatch.setattr(server.time, "time", lambda: clock[0])
+
+    async def scenario():
+        await create_asset(server, "a1", created)
+        await create_asset(server, "a2", created)
+        baseline = (await server.db.assets.find_one({"id": "a1"}))["trending_score"]
+
+        liked = await server.like_asset(server.AssetLike(asset_id="a1", wallet_id="Rfan"))
+        assert liked["action"] == "liked" and liked["likes"] == 1
+
+        # Unlike two half-lives later: the like's weight then is far larger than when it was added
+        clock[0] += 2 * server.TRENDING_HALF_LIFE
+        unliked = await server.like_asset(server.AssetLike(asset_id="a1", wallet_id="Rfan"))
+        assert unliked["action"] == "unliked" and unliked["likes"] == 0
+
+        asset = await server.db.assets.find_one({"id": "a1"})
+        assert math.isclose(asset["trending_score"], baseline, rel_tol=1e-9)
+
+        page = await server.get_trending_assets(limit=10)
+        return [entry["id"] for entry in page["assets"]]
+
+    assert sorted(run(scenario())) == ["a1", "a2"]
+
+
+def test_like_ranks_asset_above_unliked_peer(server, run):
+    from datetime import datetime, timezone
+
+    async def scenario():
+        created = datetime.now(timezone.utc)
+        await create_asset(server, "a1", created)
+        await create_asset(server, "a2", created)
+        await server.like_asset(server.AssetLike(asset_id="a2", wallet_id="Rfan"))
+        await server.record_asset_view("a1")
+
+        first = await server.get_trending_assets(limit=1)
+        second = await server.get_trending_assets(cursor=first["next_cursor"], limit=1)
+        return first["assets"][0]["id"], second["assets"][0]["id"], second["next_cursor"]
+
+    assert run(scenario()) == ("a2", "a1", None)
+
+
+def test_concurrent_toggles_keep_counter_in_step(server, run):
+    import asyncio
+    from datetime import datetime, timezone
+
+    async def scenario():
+        await create_asset(server, "a1", datetime.now(timezone.utc))
+        await asyncio.gather(*[
+            server.like_asset(server.AssetLike(asset_id="a1", wallet_id=f"R{i % 3}")) for i in range(7)
+        ])
+        likes = await server.db.asset_likes.count_documents({"asset_id": "a1", "liked": True})
+        asset = await server.db.assets.find_one({"id": "a1"})
+        return likes, asset["likes"]
+
+    records, counter = run(scenario())
+    assert records == counter
+
+
+def test_existing_like_records_unlike_after_migration(server, run):
+    from datetime import datetime, timezone
+
+    async def scenario():
+        created = datetime.now(timezone.utc)
+        await create_asset(server, "a1", created)
+        await server.like_asset(server.AssetLike(asset_id="a1", wallet_id="Rfan"))
+        # A record from when a like was the existence of its document
+        await server.db.asset_likes.update_one({"wallet_id": "Rfan"}, {"$unset": {"liked": ""}})
+        await server.migrate_legacy_asset_likes()
+        unliked = await server.like_asset(server.AssetLike(asset_id="a1", wallet_id="Rfan"))
+        relike = await server.like_asset(server.AssetLike(asset_id="a1", wallet_id="Rfan"))
+        return unliked["action"], relike["action"], relike["likes"]
+
+    assert run(scenario()) == ("unliked", "liked", 1)